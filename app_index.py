@@ -0,0 +1,260 @@
+# app_index.py
+import configparser
+import json
+import os
+import platform
+import re
+import shlex
+import time
+from collections import namedtuple
+from pathlib import Path
+
+INDEX_FILE = Path("app_index.json")
+
+DESKTOP_DIRS = [
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "applications"),
+    "/var/lib/flatpak/exports/share/applications",
+    "/var/lib/snapd/desktop/applications",
+]
+
+MAC_APP_DIRS = [
+    "/Applications",
+    "/System/Applications",
+    os.path.join(os.path.expanduser("~"), "Applications"),
+]
+
+# Programs that must never start from a spoken name: power, deletion,
+# disk, process killing, privilege and shell tools. Matched against the
+# normalized program name and every program in a launcher's argv.
+BLOCKED_PROGRAMS = frozenset({
+    "shutdown", "poweroff", "reboot", "halt", "init", "telinit", "systemctl", "loginctl", "logoff", "logout",
+    "rm", "rmdir", "del", "erase", "unlink", "shred", "srm", "wipe", "wipefs", "mv", "dd", "truncate",
+    "fdisk", "gdisk", "sfdisk", "cfdisk", "parted", "diskpart", "format", "cipher", "sdelete", "vssadmin",
+    "kill", "killall", "pkill", "skill", "xkill", "taskkill", "tskill",
+    "sudo", "su", "doas", "pkexec", "runas", "chmod", "chown", "chgrp", "passwd", "userdel", "usermod",
+    "sh", "bash", "zsh", "dash", "fish", "ksh", "csh", "tcsh", "cmd", "powershell", "pwsh",
+    "wscript", "cscript", "mshta", "rundll32", "regedit", "reg", "bcdedit", "wmic", "sc", "net", "netsh",
+})
+BLOCKED_PREFIXES = ("mkfs", "mke2fs", "mkswap")
+
+AppMatch = namedtuple("AppMatch", "name argv score")
+
+
+def normalize(name):
+    """Lowercase and drop everything but letters and digits ("V S Code" -> "vscode")."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def ngrams(name, n=3):
+    """Character n-grams of a normalized name, padded so short names still index."""
+    padded = f"^{name}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def is_blocked(program):
+    """True if program (a name or path) is a system or destructive tool."""
+    stem, ext = os.path.splitext(os.path.basename(program))
+    key = normalize(stem if ext.lower() in (".exe", ".com", ".bat", ".cmd", ".ps1") else os.path.basename(program))
+    return key in BLOCKED_PROGRAMS or key.startswith(BLOCKED_PREFIXES)
+
+
+def _scan_desktop_dir(directory):
+    """Return [name, argv] entries for the .desktop files in directory."""
+    entries = []
+    for file in os.listdir(directory):
+        if not file.endswith(".desktop"):
+            continue
+        parser = configparser.RawConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read(os.path.join(directory, file), encoding="utf-8")
+            section = parser["Desktop Entry"]
+        except (configparser.Error, KeyError, UnicodeDecodeError, OSError):
+            continue
+        if section.get("Type", "Application") != "Application" or section.get("NoDisplay") == "true":
+            continue
+        exec_line = section.get("Exec")
+        if not exec_line:
+            continue
+        try:
+            # Drop field codes like %U and %f
+            argv = [arg for arg in shlex.split(exec_line) if not arg.startswith("%")]
+        except ValueError:
+            continue
+        if not argv:
+            continue
+        for name in (section.get("Name"), file[:-len(".desktop")]):
+            if name:
+                entries.append([name, argv])
+    return entries
+
+
+def _scan_path_dir(directory):
+    """Return [name, argv] entries for the executables in directory."""
+    entries = []
+    extensions = None
+    if platform.system() == "Windows":
+        extensions = tuple(ext.lower() for ext in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";") if ext)
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                if not entry.is_file():
+                    continue
+                if extensions is not None:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() not in extensions:
+                        continue
+                    entries.append([stem, [entry.path]])
+                elif os.access(entry.path, os.X_OK):
+                    entries.append([entry.name, [entry.path]])
+            except OSError:
+                continue
+    return entries
+
+
+def _scan_mac_app_dir(directory):
+    """Return [name, argv] entries for the .app bundles in directory."""
+    return [[file[:-len(".app")], ["open", "-a", file[:-len(".app")]]]
+            for file in os.listdir(directory) if file.endswith(".app")]
+
+
+class AppIndex:
+    """
+    Index of installed applications with fuzzy name lookup.
+
+    Entries come from Linux .desktop files, macOS application folders and,
+    on Windows only, PATH executables; elsewhere PATH is mostly command line
+    and system tools. Anything in BLOCKED_PROGRAMS is left out. Scan results
+    are cached per directory in INDEX_FILE and a directory is only rescanned
+    when its mtime changes. Lookups go through a character trigram inverted
+    index, so misheard names like "fire fox" still resolve quickly; matches
+    scoring below ``min_score`` are ignored.
+    """
+    def __init__(self, index_file=INDEX_FILE, refresh_interval=60.0, min_score=0.6):
+        self.index_file = Path(index_file)
+        self.refresh_interval = refresh_interval
+        self.min_score = min_score
+        self._dirs = {}          # directory -> {"kind", "mtime", "entries"}
+        self._labels = []        # display name per entry id
+        self._names = []         # normalized name per entry id
+        self._argv = []          # argv per entry id
+        self._gram_counts = []   # trigram count per entry id
+        self._postings = {}      # trigram -> [entry id]
+        self._last_refresh = None
+
+    def _directories(self):
+        dirs = []
+        system = platform.system()
+        if system == "Linux":
+            dirs += [(d, "desktop") for d in DESKTOP_DIRS]
+        elif system == "Darwin":
+            dirs += [(d, "mac") for d in MAC_APP_DIRS]
+        elif system == "Windows":
+            dirs += [(d, "path") for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+        return dirs
+
+    def load(self):
+        """Load cached directory scans from disk."""
+        try:
+            with open(self.index_file, "r") as f:
+                self._dirs = json.load(f)
+        except (OSError, ValueError):
+            self._dirs = {}
+
+    def save(self):
+        try:
+            with open(self.index_file, "w") as f:
+                json.dump(self._dirs, f)
+        except OSError as e:
+            print(f"Error saving application index: {e}")
+
+    def refresh(self, force=False):
+        """Rescan directories whose mtime changed and rebuild the lookup index."""
+        now = time.monotonic()
+        if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+            return
+        if self._last_refresh is None:
+            self.load()
+        self._last_refresh = now
+
+        scanners = {"desktop": _scan_desktop_dir, "path": _scan_path_dir, "mac": _scan_mac_app_dir}
+        changed = False
+        current = {}
+        for directory, kind in self._directories():
+            if directory in current:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            cached = self._dirs.get(directory)
+            if cached and cached["mtime"] == mtime and cached["kind"] == kind:
+                current[directory] = cached
+                continue
+            try:
+                entries = scanners[kind](directory)
+            except OSError:
+                continue
+            current[directory] = {"kind": kind, "mtime": mtime, "entries": entries}
+            changed = True
+
+        stale = changed or set(current) != set(self._dirs)
+        if stale or not self._names:
+            self._dirs = current
+            self._build()
+        if stale:
+            self.save()
+
+    def _build(self):
+        """Rebuild the trigram inverted index; earlier directories win name clashes."""
+        self._labels, self._names, self._argv, self._gram_counts, self._postings = [], [], [], [], {}
+        seen = set()
+        for directory in self._dirs.values():
+            for name, argv in directory["entries"]:
+                key = normalize(name)
+                if not key or key in seen:
+                    continue
+                if is_blocked(name) or any(is_blocked(arg) for arg in argv if not arg.startswith("-")):
+                    continue
+                seen.add(key)
+                entry_id = len(self._names)
+                self._labels.append(name)
+                self._names.append(key)
+                self._argv.append(argv)
+                grams = ngrams(key)
+                self._gram_counts.append(len(grams))
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(entry_id)
+
+    def __len__(self):
+        return len(self._names)
+
+    def lookup(self, query):
+        """Return the argv of the best matching application, or None."""
+        match = self.match(query)
+        return match.argv if match else None
+
+    def match(self, query):
+        """Return the best matching application as an AppMatch, or None."""
+        self.refresh()
+        key = normalize(query)
+        if not key:
+            return None
+        grams = ngrams(key)
+        overlap = {}
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                overlap[entry_id] = overlap.get(entry_id, 0) + 1
+        best_key, best_id = None, None
+        for entry_id, common in overlap.items():
+            # Dice coefficient over the trigram sets; shorter names win ties
+            score = 2 * common / (len(grams) + self._gram_counts[entry_id])
+            key = (score, -len(self._names[entry_id]))
+            if score >= self.min_score and (best_key is None or key > best_key):
+                best_key, best_id = key, entry_id
+        if best_id is None:
+            return None
+        return AppMatch(self._labels[best_id], list(self._argv[best_id]), best_key[0])
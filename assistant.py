@@ -3,7 +3,18 @@ import os
 import pyttsx3
 import speech_recognition as sr
 from openai import OpenAI
-from commands import handle_command
+from commands import COMMAND_HANDLERS, handle_command
+from intents import IntentRegistry
+import gpt
+from microphone import MicrophoneStream
+from recognizers import create_backend
+from speculation import SpeculativeDispatcher
+from camera import CameraService
+from enrollment import enroll_directory
+from face_tracking import FacePipeline
+from faces import FaceStore, sharpest
+import utils
+from speech import PRIORITY_ALERT, PRIORITY_CHATTER, PhraseCache, SpeechWorker
 from dotenv import load_dotenv
 import platform
 import webbrowser
@@ -40,6 +51,33 @@ client = None
 if API_KEY:
     client = OpenAI(api_key=API_KEY)
 
+# Handlers for intents that need assistant state, registered with
+# @INTENT_HANDLERS.handles(...) on Assistant methods.
+INTENT_HANDLERS = IntentRegistry()
+
+OFFLINE_RESPONSE = "I'm currently operating in offline mode. For advanced queries, please provide an OpenAI API key."
+
+# Intents whose response is prefixed with a cinematic acknowledgement
+ACKNOWLEDGED_INTENTS = {"play_music", "set_alarm"}
+
+# Fixed replies pre-rendered to audio so they play without synthesis delay
+CANNED_PHRASES = (
+    "Understood, sir.",
+    "I didn't catch that, sir.",
+    "Music paused, sir.",
+    "Resuming music, sir.",
+    "Music stopped, sir.",
+    "Alarm! Time is up, sir.",
+    "All alarms canceled, sir.",
+    "Threat neutralized. Systems secure.",
+    "Security mode activated. All systems monitoring for threats, sir.",
+    "Security mode deactivated, sir.",
+    "Opening web browser, sir.",
+    "You're welcome, sir. Always at your service.",
+    "All systems operating within normal parameters, sir.",
+    OFFLINE_RESPONSE,
+)
+
 class DroneController:
     """Class to control drones or RC cars"""
     def __init__(self):
@@ -97,90 +135,102 @@ class DroneController:
         return self.send_command("LAND")
 
 class FaceRecognition:
-    def __init__(self):
-        self.known_faces = {}
+    def __init__(self, camera, samples=5, burst=15):
+        self.camera = camera
+        self.samples = samples
+        self.burst = burst
+        self.store = FaceStore()
+        # One-shot recognition detects at full resolution so small faces are found
+        self.pipeline = FacePipeline(self.store, scale=1.0)
         self.face_data_file = "face_data.dat"
-        self.load_face_data()
-        
-    def load_face_data(self):
         if os.path.exists(self.face_data_file):
-            try:
-                with open(self.face_data_file, 'rb') as f:
-                    self.known_faces = pickle.load(f)
-            except:
-                self.known_faces = {}
+            self.import_legacy_face_data()
+        # Large galleries get their ANN index built off the UI thread
+        threading.Thread(target=self.gallery.build_index, name="jarvis-face-index", daemon=True).start()
+
+    @property
+    def gallery(self):
+        return self.store.gallery
+
+    def import_legacy_face_data(self):
+        """One-time move of the old pickled face_data.dat into the face store."""
+        try:
+            with open(self.face_data_file, 'rb') as f:
+                known_faces = pickle.load(f)
+            for name, encoding in known_faces.items():
+                self.store.set(name, encoding)
+            self.store.compact()
+            os.replace(self.face_data_file, self.face_data_file + ".migrated")
+        except Exception as e:
+            print(f"Face data import error: {e}")
     
-    def save_face_data(self):
-        with open(self.face_data_file, 'wb') as f:
-            pickle.dump(self.known_faces, f)
+    def _camera_failure(self):
+        if self.camera.error is not None:
+            return "Camera not available, sir."
+        return "Could not capture image, sir."
     
     def recognize_face(self):
-        video_capture = cv2.VideoCapture(0)
-        
-        if not video_capture.isOpened():
-            return "Camera not available, sir."
-        
-        # Capture single frame
-        ret, frame = video_capture.read()
+        # Latest frame from the shared camera
+        with self.camera:
+            _, frame = self.camera.read()
         
-        if not ret:
-            video_capture.release()
-            return "Could not capture image, sir."
+        if frame is None:
+            return self._camera_failure()
         
-        # Find all face locations and encodings
-        face_locations = face_recognition.face_locations(frame)
-        face_encodings = face_recognition.face_encodings(frame, face_locations)
+        # Detect on the RGB frame, encode and match every face at once
+        faces = self.pipeline.detect(frame)
         
-        if not face_encodings:
-            video_capture.release()
+        if not faces:
             return "No faces detected, sir."
         
-        recognized_names = []
-        
-        for face_encoding in face_encodings:
-            # Compare with known faces
-            for name, known_encoding in self.known_faces.items():
-                match = face_recognition.compare_faces([known_encoding], face_encoding)
-                if match[0]:
-                    recognized_names.append(name)
-                    break
-        
-        video_capture.release()
+        recognized_names = [
+            f"{face.name} ({face.confidence:.0%})"
+            for face in faces
+            if face.name is not None
+        ]
         
         if recognized_names:
             return f"I see {', '.join(recognized_names)}, sir."
         return "I see an unknown person, sir."
     
     def register_face(self, name):
-        video_capture = cv2.VideoCapture(0)
-        
-        if not video_capture.isOpened():
-            return "Camera not available, sir."
-        
-        # Capture single frame
-        ret, frame = video_capture.read()
+        # Capture a burst of consecutive frames
+        with self.camera:
+            frames = self.camera.frames(self.burst)
         
-        if not ret:
-            video_capture.release()
-            return "Could not capture image, sir."
+        if not frames:
+            return self._camera_failure()
         
-        # Find face encodings
-        face_encodings = face_recognition.face_encodings(frame)
+        # Encode the sharpest frames, one sample each
+        encodings = []
+        for i in sharpest(np.stack(frames), self.samples):
+            face_encodings = face_recognition.face_encodings(cv2.cvtColor(frames[i], cv2.COLOR_BGR2RGB))
+            if face_encodings:
+                encodings.append(face_encodings[0])
         
-        if not face_encodings:
-            video_capture.release()
+        if not encodings:
             return "No faces detected, sir."
         
-        # Save first face found
-        self.known_faces[name] = face_encodings[0]
-        self.save_face_data()
-        
-        video_capture.release()
-        return f"Face registered for {name}, sir."
+        self.store.set_samples(name, encodings)
+        return f"Face registered for {name} from {len(encodings)} samples, sir."
+    
+    def enroll_directory(self, directory, workers=None):
+        """Bulk-register the photos under directory/<name>/ across all cores."""
+        if not os.path.isdir(directory):
+            return f"No photo folder at {directory}, sir."
+        report = enroll_directory(self.store, directory, workers)
+        print(f"[Faces] {report.summary()}")
+        return f"{report.summary()}, sir."
 
 class MusicPlayer:
     def __init__(self):
-        pygame.mixer.init()
+        # No audio device (e.g. headless): keep the player but refuse to play
+        self.available = True
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Music player error: {e}")
+            self.available = False
         self.playlist = []
         self.current_index = 0
         self.playing = False
@@ -209,6 +259,8 @@ class MusicPlayer:
                     break
     
     def play_music(self, query=""):
+        if not self.available:
+            return "Audio output is not available, sir."
         if not self.playlist:
             return "No music found in your music directories, sir."
             
@@ -281,32 +333,27 @@ class MusicPlayer:
 class Assistant:
     """
     Core assistant logic: TTS, STT, custom commands, GPT fallback, and mic toggle.
+
+    ``microphone``, ``speech`` and ``camera`` replace the device-backed
+    defaults, e.g. to run headless; they are started here like the defaults.
     """
-    def __init__(self, gui=None):
-        # Text‑to‑Speech engine
-        self.engine = pyttsx3.init()
-        rate = self.engine.getProperty("rate")
-        self.engine.setProperty("rate", rate - 20)
-        
-        # Try to set a deeper voice
-        try:
-            voices = self.engine.getProperty('voices')
-            # Prefer male voice if available
-            for voice in voices:
-                if "male" in voice.name.lower():
-                    self.engine.setProperty('voice', voice.id)
-                    break
-            # If no male voice, use first available
-            if not self.engine.getProperty('voice'):
-                self.engine.setProperty('voice', voices[0].id)
-        except Exception as e:
-            print(f"Voice setting error: {e}")
+    def __init__(self, gui=None, settings=None, microphone=None, speech=None, camera=None):
+        if settings is None:
+            settings = gui.settings if gui is not None else utils.load_settings()
 
-        # Speech recognizer
-        self.recognizer = sr.Recognizer()
+        # Text‑to‑Speech engine, owned by the speech worker thread
+        self.speech = speech or SpeechWorker(self._create_engine, PhraseCache())
+        self.speech.start()
+
+        # Speech recognizer backend chosen in settings (google, vosk or file)
+        self.recognizer = create_backend(settings)
 
         # Mic toggle flag
         self.mic_enabled = True
+
+        # Microphone kept open with a running noise estimate
+        self.microphone = microphone or MicrophoneStream()
+        self.microphone.start()
         
         # Music player
         self.music_player = MusicPlayer()
@@ -349,8 +396,15 @@ class Assistant:
             ]
         }
         
+        # Render canned replies to audio in the background once per voice
+        self.speech.prerender(CANNED_PHRASES + tuple(
+            phrase for phrases in self.responses.values() for phrase in phrases))
+
+        # Camera shared by face recognition and the surveillance view
+        self.camera = camera or CameraService(settings.get("camera_index", 0))
+
         # Face recognition system
-        self.face_recognition = FaceRecognition()
+        self.face_recognition = FaceRecognition(self.camera)
         
         # Screen control
         self.original_brightness = self.get_display_brightness()
@@ -362,9 +416,27 @@ class Assistant:
         # Drone controller
         self.drone_controller = DroneController()
 
+        # Cache of GPT answers to repeated questions
+        self.response_cache = gpt.ResponseCache()
+
+        # Recent GPT exchanges sent along as context for follow-up questions
+        self.memory = gpt.ConversationMemory()
+
+        # Cheap local intents run on partial transcripts while the user is
+        # still speaking; the value undoes side effects if the final differs
+        self.speculator = SpeculativeDispatcher(handle_command, self.dispatch, {
+            "time": None,
+            "date": None,
+            "thanks": None,
+            "jarvis_status": None,
+            "pause_music": self._music_undo,
+            "resume_music": self._music_undo,
+        })
+
     from typing import Optional
 
-    def cinematic_speak(self, text: str, category: Optional[str] = None):
+    def cinematic_speak(self, text: str, category: Optional[str] = None,
+                        priority: int = PRIORITY_CHATTER):
         """Speak with cinematic flair and visual effects"""
         # Select random cinematic response if category provided
         if category and category in self.responses:
@@ -377,7 +449,7 @@ class Assistant:
             pass
         
         # Speak with enhanced effects
-        self.speak(text)
+        self.speak(text, priority, wait=True)
         
         # Add subtle sound effect after speaking
         try:
@@ -385,32 +457,74 @@ class Assistant:
         except:
             pass
 
+    @staticmethod
+    def _create_engine():
+        """Create and configure the pyttsx3 engine (runs on the speech thread)."""
+        engine = pyttsx3.init()
+        rate = engine.getProperty("rate")
+        engine.setProperty("rate", rate - 20)
+        
+        # Try to set a deeper voice
+        try:
+            voices = engine.getProperty('voices')
+            # Prefer male voice if available
+            for voice in voices:
+                if "male" in voice.name.lower():
+                    engine.setProperty('voice', voice.id)
+                    break
+            # If no male voice, use first available
+            if not engine.getProperty('voice'):
+                engine.setProperty('voice', voices[0].id)
+        except Exception as e:
+            print(f"Voice setting error: {e}")
+        return engine
+
     def toggle_mic(self) -> bool:
         """
         Toggle the microphone on/off.
         Returns the new state (True=on, False=off).
         """
         self.mic_enabled = not self.mic_enabled
+        if self.mic_enabled:
+            self.microphone.start()
+        else:
+            self.microphone.stop()
         return self.mic_enabled
 
-    def speak(self, text: str):
-        """Speak the given text out loud with JARVIS-like processing effect."""
+    def speak(self, text: str, priority: int = PRIORITY_CHATTER,
+              response_id: Optional[int] = None, wait: bool = False):
+        """
+        Queue text on the speech worker. Alerts (PRIORITY_ALERT) preempt
+        chatter; chatter from an older response_id than the newest one is
+        dropped. With wait=True, block until it was spoken or dropped.
+        """
         print(f"J.A.R.V.I.S.: {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+        done = self.speech.say(text, priority, response_id)
+        if wait:
+            done.wait()
+
+    @INTENT_HANDLERS.handles("stop_talking")
+    def stop_speaking(self):
+        """Cut off the current chatter and drop anything queued behind it."""
+        self.speech.interrupt()
+        return "Understood, sir."
 
-    def listen(self, timeout: int = 5) -> str:
+    def listen(self, timeout: int = 5, audio: Optional[bytes] = None, on_partial=None) -> str:
         """
         Listen to the microphone and return recognized text.
+        Audio is recognized while it is captured; on_partial(text) receives
+        the partial transcripts. If audio (PCM that followed the wake word)
+        is given, recognize that instead of capturing a new utterance.
         If mic is disabled or recognition fails, returns an empty string.
         """
         if not self.mic_enabled:
             return ""
         try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                audio = self.recognizer.listen(source, phrase_time_limit=timeout)
-                return self.recognizer.recognize_google(audio) # type: ignore
+            sample_rate = self.microphone.endpointer.sample_rate
+            if audio is not None:
+                return self.recognizer.recognize(audio, sample_rate, on_partial=on_partial)
+            return self.recognizer.recognize_stream(
+                self.microphone.stream(max_phrase=timeout), sample_rate, on_partial)
         except sr.UnknownValueError:
             return ""
         except sr.RequestError as e:
@@ -420,6 +534,38 @@ class Assistant:
             print(f"Microphone error: {e}")
             return ""
 
+    def voice_command(self, timeout: int = 5, audio: Optional[bytes] = None, on_partial=None):
+        """
+        Listen for a command while speculatively answering cheap local
+        intents from the partial transcripts. Returns (text, response), where
+        response is the committed speculative answer, or None if the text
+        still has to go through process_input.
+        """
+        def partial(text):
+            self.speculator.update(text)
+            if on_partial is not None:
+                on_partial(text)
+
+        text = self.listen(timeout, audio, partial)
+        intent = None
+        if text and self._greeting(text) is None:
+            intent = handle_command(text)
+        return text, self.speculator.resolve(intent)
+
+    def _music_undo(self):
+        """Capture the pause state so a speculative pause/resume can be reverted."""
+        player = self.music_player
+        was_paused = player.paused
+
+        def undo():
+            if player.paused != was_paused:
+                if was_paused:
+                    player.pause_music()
+                else:
+                    player.resume_music()
+        return undo
+
+    @INTENT_HANDLERS.handles("calculate")
     def solve_math_problem(self, problem):
         """Solve mathematical problems using sympy"""
         try:
@@ -444,154 +590,200 @@ class Assistant:
             except Exception as e:
                 return f"Could not solve the problem: {str(e)}, sir."
 
-    def process_input(self, text: str) -> str:
+    def process_input(self, text: str, use_cache: bool = True) -> str:
         """
         Handle a user message: run custom commands first;
         otherwise, query OpenAI and return its response.
+        Pass use_cache=False to skip the response cache for this request.
         """
         text = text.strip()
         if not text:
             return "I didn't catch that, sir."
-            
-        ltext = text.lower()
-        
-        # Handle greetings with cinematic responses
-        if any(greeting in ltext for greeting in ["good morning", "morning jarvis"]):
-            return random.choice(self.responses["greeting_morning"])
-        
-        if any(greeting in ltext for greeting in ["good evening", "evening jarvis"]):
-            return random.choice(self.responses["greeting_evening"])
 
-        # 1) Custom commands
-        cmd_resp = handle_command(text)
-        if cmd_resp is not None:
-            # Handle special commands that need processing
-            if cmd_resp.startswith("play_music:"):
-                query = cmd_resp.split(":", 1)[1]
-                return random.choice(self.responses["acknowledgement"]) + " " + self.play_music(query)
-            elif cmd_resp.startswith("set_alarm:"):
-                time_str = cmd_resp.split(":", 1)[1]
-                return random.choice(self.responses["acknowledgement"]) + " " + self.set_alarm(time_str)
-            elif cmd_resp == "pause_music":
-                return self.pause_music()
-            elif cmd_resp == "resume_music":
-                return self.resume_music()
-            elif cmd_resp == "stop_music":
-                return self.stop_music()
-            elif cmd_resp == "flip_coin":
-                return self.flip_coin()
-            elif cmd_resp == "roll_dice":
-                return self.roll_dice()
-            elif cmd_resp == "next_track":
-                return self.next_track()
-            elif cmd_resp == "previous_track":
-                return self.previous_track()
-            elif cmd_resp == "activate_hologram":
-                return self.activate_hologram()
-            elif cmd_resp == "deactivate_hologram":
-                return self.deactivate_hologram()
-            elif cmd_resp == "activate_security_mode":
-                return self.activate_security_mode()
-            elif cmd_resp == "deactivate_security_mode":
-                return self.deactivate_security_mode()
-            elif cmd_resp == "get_weather":
-                return self.get_weather()
-            elif cmd_resp == "get_news":
-                return self.get_news()
-            elif cmd_resp == "analyze_object":
-                return self.analyze_object()
-            elif cmd_resp == "activate_defense_systems":
-                return self.activate_defense_systems()
-            elif cmd_resp.startswith("send_email:"):
-                parts = cmd_resp.split(":", 1)[1].split("|")
-                if len(parts) == 3:
-                    return self.send_email(parts[0], parts[1], parts[2])
-            elif cmd_resp == "recognize_face":
-                return self.face_recognition.recognize_face()
-            elif cmd_resp.startswith("register_face:"):
-                name = cmd_resp.split(":", 1)[1]
-                return self.face_recognition.register_face(name)
-            elif cmd_resp == "dim_screen":
-                return self.set_display_brightness(30)
-            elif cmd_resp == "brighten_screen":
-                return self.set_display_brightness(80)
-            elif cmd_resp == "reset_brightness":
-                return self.reset_display_brightness()
-            elif cmd_resp == "system_health":
-                return self.system_health_check()
-            elif cmd_resp == "tell_joke":
-                return self.tell_joke()
-            elif cmd_resp == "flip_switch":
-                return self.flip_switch()
-            elif cmd_resp.startswith("play_game:"):
-                game_name = cmd_resp.split(":", 1)[1]
-                return self.play_game(game_name)
-            elif cmd_resp == "system_scan":
-                return self.system_scan()
-            elif cmd_resp == "activate_surveillance":
-                return "Surveillance mode activated through GUI, sir."
-            elif cmd_resp == "deactivate_surveillance":
-                return "Surveillance mode deactivated through GUI, sir."
-            elif cmd_resp.startswith("calculate:"):
-                problem = cmd_resp.split(":", 1)[1]
-                return self.solve_math_problem(problem)
-            elif cmd_resp == "connect_drone":
-                return self.drone_controller.connect()
-            elif cmd_resp == "disconnect_drone":
-                return self.drone_controller.disconnect()
-            elif cmd_resp == "takeoff_drone":
-                return self.drone_controller.takeoff()
-            elif cmd_resp == "land_drone":
-                return self.drone_controller.land()
-            elif cmd_resp.startswith("move_drone:"):
-                direction = cmd_resp.split(":", 1)[1]
-                if direction == "forward":
-                    return self.drone_controller.move_forward()
-                elif direction == "backward":
-                    return self.drone_controller.move_backward()
-                elif direction == "left":
-                    return self.drone_controller.turn_left()
-                elif direction == "right":
-                    return self.drone_controller.turn_right()
-            else:
-                return cmd_resp
+        local = self._local_response(text)
+        if local is not None:
+            return local
 
         # 2) Fallback to GPT if API key is available
         if client:
+            messages = self.memory.build(text)
+            cache_key = self.response_cache.key(messages)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self._remember(text, cached)
+                    return cached
             try:
-                resp = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": text}]
-                )
-                content = resp.choices[0].message.content
-                return content.strip() if content is not None else "No response received from OpenAI."
+                content = gpt.complete(client, messages)
+                if content:
+                    self.response_cache.put(cache_key, content)
+                    self._remember(text, content)
+                return content or "No response received from OpenAI."
             except Exception as e:
                 print(f"[OpenAI Error] {e}")
                 return "Apologies, sir. I'm having trouble reaching the main systems."
         else:
-            return "I'm currently operating in offline mode. For advanced queries, please provide an OpenAI API key."
+            return OFFLINE_RESPONSE
+
+    def stream_input(self, text: str, use_cache: bool = True):
+        """
+        Like process_input, but yield the response in fragments as it arrives.
+        Local commands and cached answers yield their whole response at once;
+        GPT answers are streamed token by token.
+        """
+        text = text.strip()
+        if not text:
+            yield "I didn't catch that, sir."
+            return
+
+        local = self._local_response(text)
+        if local is not None:
+            yield local
+            return
+
+        if not client:
+            yield OFFLINE_RESPONSE
+            return
+        messages = self.memory.build(text)
+        cache_key = self.response_cache.key(messages)
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._remember(text, cached)
+                yield cached
+                return
+        fragments = []
+        try:
+            for fragment in gpt.stream_completion(client, messages):
+                fragments.append(fragment)
+                yield fragment
+        except Exception as e:
+            print(f"[OpenAI Error] {e}")
+            yield ("" if not fragments else " ") + "Apologies, sir. I'm having trouble reaching the main systems."
+            return
+        content = "".join(fragments).strip()
+        if content:
+            self.response_cache.put(cache_key, content)
+            self._remember(text, content)
+        else:
+            yield "No response received from OpenAI."
+
+    def _remember(self, text, response):
+        """Add a GPT exchange to the conversation memory."""
+        self.memory.add("user", text)
+        self.memory.add("assistant", response)
+
+    def _greeting(self, text):
+        """Response category for a greeting, or None."""
+        ltext = text.lower()
+        if any(greeting in ltext for greeting in ["good morning", "morning jarvis"]):
+            return "greeting_morning"
+        if any(greeting in ltext for greeting in ["good evening", "evening jarvis"]):
+            return "greeting_evening"
+        return None
+
+    def _local_response(self, text):
+        """Answer greetings and custom commands; None means ask GPT."""
+        # Handle greetings with cinematic responses
+        greeting = self._greeting(text)
+        if greeting is not None:
+            return random.choice(self.responses[greeting])
+
+        # 1) Custom commands
+        intent = handle_command(text)
+        if intent is not None:
+            return self.dispatch(intent)
+        return None
+
+    def dispatch(self, intent):
+        """Run the handler registered for intent and return its response, or None."""
+        if intent.name in INTENT_HANDLERS:
+            response = INTENT_HANDLERS.dispatch(intent, self)
+            if response is not None and intent.name in ACKNOWLEDGED_INTENTS:
+                response = random.choice(self.responses["acknowledgement"]) + " " + response
+            return response
+        if intent.name in COMMAND_HANDLERS:
+            return COMMAND_HANDLERS.dispatch(intent)
+        return None
+
+    # Face recognition methods
+    @INTENT_HANDLERS.handles("recognize_face")
+    def recognize_face(self):
+        return self.face_recognition.recognize_face()
+
+    @INTENT_HANDLERS.handles("register_face")
+    def register_face(self, name="User"):
+        return self.face_recognition.register_face(name)
+
+    @INTENT_HANDLERS.handles("enroll_faces")
+    def enroll_faces(self, directory="faces"):
+        return self.face_recognition.enroll_directory(directory)
+
+    # Surveillance is driven by the GUI panel
+    @INTENT_HANDLERS.handles("activate_surveillance")
+    def activate_surveillance(self):
+        return "Surveillance mode activated through GUI, sir."
+
+    @INTENT_HANDLERS.handles("deactivate_surveillance")
+    def deactivate_surveillance(self):
+        return "Surveillance mode deactivated through GUI, sir."
+
+    # Drone control methods
+    @INTENT_HANDLERS.handles("connect_drone")
+    def connect_drone(self):
+        return self.drone_controller.connect()
+
+    @INTENT_HANDLERS.handles("disconnect_drone")
+    def disconnect_drone(self):
+        return self.drone_controller.disconnect()
+
+    @INTENT_HANDLERS.handles("takeoff_drone")
+    def takeoff_drone(self):
+        return self.drone_controller.takeoff()
+
+    @INTENT_HANDLERS.handles("land_drone")
+    def land_drone(self):
+        return self.drone_controller.land()
+
+    @INTENT_HANDLERS.handles("move_drone")
+    def move_drone(self, direction):
+        moves = {
+            "forward": self.drone_controller.move_forward,
+            "backward": self.drone_controller.move_backward,
+            "left": self.drone_controller.turn_left,
+            "right": self.drone_controller.turn_right,
+        }
+        move = moves.get(direction)
+        return move() if move else None
 
     # Music control methods
+    @INTENT_HANDLERS.handles("play_music")
     def play_music(self, query=""):
         return self.music_player.play_music(query)
         
+    @INTENT_HANDLERS.handles("pause_music")
     def pause_music(self):
         return self.music_player.pause_music()
         
+    @INTENT_HANDLERS.handles("resume_music")
     def resume_music(self):
         return self.music_player.resume_music()
         
+    @INTENT_HANDLERS.handles("stop_music")
     def stop_music(self):
         return self.music_player.stop_music()
         
+    @INTENT_HANDLERS.handles("next_track")
     def next_track(self):
         return self.music_player.next_track()
         
+    @INTENT_HANDLERS.handles("previous_track")
     def previous_track(self):
         return self.music_player.previous_track()
 
     # Alarm system
-    def set_alarm(self, time_str):
+    @INTENT_HANDLERS.handles("set_alarm")
+    def set_alarm(self, time_str=""):
         """Set an alarm at specified time"""
         try:
             # Parse time (handle both HH:MM and HH:MM AM/PM)
@@ -625,7 +817,7 @@ class Assistant:
             time.sleep(30)
             
         if alarm_id in self.active_alarms:
-            self.speak("Alarm! Time is up, sir.")
+            self.speak("Alarm! Time is up, sir.", PRIORITY_ALERT)
             # Play alarm sound
             try:
                 for _ in range(5):
@@ -646,11 +838,13 @@ class Assistant:
         return "No active alarms to cancel, sir."
 
     # Fun utilities
+    @INTENT_HANDLERS.handles("flip_coin")
     def flip_coin(self):
         """Flip a virtual coin"""
         result = random.choice(["Heads", "Tails"])
         return f"It's {result}, sir."
 
+    @INTENT_HANDLERS.handles("roll_dice")
     def roll_dice(self):
         """Roll virtual dice"""
         return f"You rolled a {random.randint(1, 6)}, sir."
@@ -678,6 +872,7 @@ class Assistant:
         return info
         
     # ===== CINEMATIC FEATURES =====
+    @INTENT_HANDLERS.handles("activate_hologram")
     def activate_hologram(self):
         """Activate holographic display"""
         if not self.hologram_active:
@@ -688,6 +883,7 @@ class Assistant:
             return "Holographic display activated, sir."
         return "Hologram is already active, sir."
 
+    @INTENT_HANDLERS.handles("deactivate_hologram")
     def deactivate_hologram(self):
         """Deactivate holographic display"""
         if self.hologram_active:
@@ -726,6 +922,7 @@ class Assistant:
                 
             time.sleep(0.1)
 
+    @INTENT_HANDLERS.handles("activate_security_mode")
     def activate_security_mode(self):
         """Activate advanced security monitoring"""
         if not self.security_mode:
@@ -737,6 +934,7 @@ class Assistant:
             return "Security mode activated. All systems monitoring for threats, sir."
         return "Security mode is already active, sir."
 
+    @INTENT_HANDLERS.handles("deactivate_security_mode")
     def deactivate_security_mode(self):
         """Deactivate security monitoring"""
         if self.security_mode:
@@ -751,7 +949,7 @@ class Assistant:
             # Simulate occasional security alerts
             if random.random() < 0.05:  # 5% chance of alert
                 alert = random.choice(self.responses["security_alert"])
-                self.cinematic_speak(alert)
+                self.cinematic_speak(alert, priority=PRIORITY_ALERT)
                 
                 # Visual alert in GUI
                 if self.gui:
@@ -759,7 +957,7 @@ class Assistant:
                     
                 # Simulate threat neutralization
                 time.sleep(2)
-                self.cinematic_speak("Threat neutralized. Systems secure.", "confirmation")
+                self.cinematic_speak("Threat neutralized. Systems secure.", "confirmation", PRIORITY_ALERT)
                 
             time.sleep(1)
 
@@ -798,11 +996,21 @@ class Assistant:
         except Exception as e:
             return f"Failed to adjust brightness: {str(e)}"
             
+    @INTENT_HANDLERS.handles("dim_screen")
+    def dim_screen(self):
+        return self.set_display_brightness(30)
+
+    @INTENT_HANDLERS.handles("brighten_screen")
+    def brighten_screen(self):
+        return self.set_display_brightness(80)
+
+    @INTENT_HANDLERS.handles("reset_brightness")
     def reset_display_brightness(self):
         """Reset brightness to original level"""
         return self.set_display_brightness(self.original_brightness)
 
     # New features
+    @INTENT_HANDLERS.handles("system_health")
     def system_health_check(self):
         """Check system health and report issues"""
         alerts = []
@@ -827,6 +1035,7 @@ class Assistant:
             return "System alerts: " + "; ".join(alerts) + ", sir."
         return "All systems operating within normal parameters, sir."
     
+    @INTENT_HANDLERS.handles("tell_joke")
     def tell_joke(self):
         """Tell a random joke"""
         jokes = [
@@ -838,6 +1047,7 @@ class Assistant:
         ]
         return random.choice(jokes)
     
+    @INTENT_HANDLERS.handles("flip_switch")
     def flip_switch(self):
         """Simulate a switch flipping with sound effect"""
         try:
@@ -846,7 +1056,8 @@ class Assistant:
         except:
             return "Task completed, sir."
     
-    def play_game(self, game_name):
+    @INTENT_HANDLERS.handles("play_game")
+    def play_game(self, game_name=""):
         """Play simple games"""
         game_name = game_name.lower()
         
@@ -879,6 +1090,7 @@ class Assistant:
         
         return "I don't know that game, sir. Try 'rock paper scissors'."
     
+    @INTENT_HANDLERS.handles("system_scan")
     def system_scan(self):
         """Simulate a full system scan"""
         scan_steps = [
@@ -898,6 +1110,7 @@ class Assistant:
         
         return " ".join(scan_steps) + ". " + result
 
+    @INTENT_HANDLERS.handles("get_weather")
     def get_weather(self):
         """Get current weather information"""
         try:
@@ -915,6 +1128,7 @@ class Assistant:
         except:
             return "Weather service unavailable, sir."
 
+    @INTENT_HANDLERS.handles("get_news")
     def get_news(self):
         """Get top news headlines"""
         try:
@@ -930,6 +1144,7 @@ class Assistant:
         except:
             return "News service unavailable, sir."
 
+    @INTENT_HANDLERS.handles("analyze_object")
     def analyze_object(self):
         """Simulate object analysis like in the movies"""
         analysis = [
@@ -941,6 +1156,7 @@ class Assistant:
         ]
         return "Analysis complete, sir: " + "; ".join(analysis)
 
+    @INTENT_HANDLERS.handles("activate_defense_systems")
     def activate_defense_systems(self):
         """Simulate defense system activation"""
         sequence = [
@@ -951,8 +1167,11 @@ class Assistant:
         ]
         return "Defense systems activated, sir: " + " | ".join(sequence)
 
+    @INTENT_HANDLERS.handles("send_email")
     def send_email(self, to_address, subject, body):
         """Send an email (dummy implementation)"""
+        if not (to_address and subject and body):
+            return "Please specify recipient, subject and body, sir."
         # You can implement actual email sending here using smtplib if needed.
         # For now, just simulate success.
         return f"Email sent to {to_address} with subject '{subject}', sir."
\ No newline at end of file
@@ -0,0 +1,51 @@
+# benchmarks/bench_face_pipeline.py
+"""
+Per-stage cost of continuous face recognition on the live camera.
+
+Runs FacePipeline over the same stretch of camera frames for each
+combination of detection scale and detection interval, and prints the mean
+and p95 milliseconds of every stage along with the detection count. Use it
+to pick settings that fit the frame budget (33 ms at 30 fps).
+Run with: python benchmarks/bench_face_pipeline.py --frames 150
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera import CameraService  # noqa: E402
+from face_tracking import STAGES, FacePipeline  # noqa: E402
+from faces import FaceStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.5, 0.25])
+    parser.add_argument("--every", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    camera = CameraService(args.camera)
+    with camera:
+        frames = camera.frames(args.frames)
+    if not frames:
+        raise SystemExit(f"No frames from camera {args.camera}: {camera.error}")
+    store = FaceStore()
+
+    header = " ".join(f"{stage:>13s}" for stage in STAGES)
+    print(f"{'scale':>5s} {'every':>5s} {'detects':>7s} {header}")
+    for scale in args.scales:
+        for every in args.every:
+            pipeline = FacePipeline(store, scale=scale, detect_every=every)
+            for frame in frames:
+                pipeline.process(frame)
+            stats = pipeline.stats()
+            cells = " ".join(f"{stats[stage]['mean']:6.1f}/{stats[stage]['p95']:6.1f}" for stage in STAGES)
+            print(f"{scale:5.2f} {every:5d} {stats['detections']:7d} {cells}")
+    print("cells are mean/p95 ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_faces.py
+"""
+Face matching latency against gallery size.
+
+Compares the old per-identity loop (one compare_faces-style distance per
+known face, first match wins) with FaceGallery.match, which scores every
+probe against the whole (N, 128) matrix at once, and with the same gallery
+searched through its IVF index. Encodings are random unit vectors; the
+probes are noisy copies of gallery entries. recall is the share of probes
+the index matched to the same name as the exact search.
+Run with: python benchmarks/bench_faces.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from faces import DEFAULT_TOLERANCE, ENCODING_DIM, FaceGallery, IVFIndex  # noqa: E402
+
+
+def random_encodings(rng, count):
+    enc = rng.normal(size=(count, ENCODING_DIM)).astype(np.float32)
+    return enc / np.linalg.norm(enc, axis=1, keepdims=True)
+
+
+def loop_match(known_faces, probes):
+    """The original recognize_face loop."""
+    names = []
+    for probe in probes:
+        for name, known in known_faces.items():
+            if np.linalg.norm(known - probe) <= DEFAULT_TOLERANCE:
+                names.append(name)
+                break
+    return names
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'gallery':>8s} {'loop ms':>10s} {'batched ms':>11s} {'speedup':>8s} "
+          f"{'build s':>8s} {'ann ms':>8s} {'recall':>7s}")
+    for size in (10, 100, 1000, 10000, 100000):
+        encodings = random_encodings(rng, size)
+        gallery = FaceGallery(index_threshold=float("inf"))
+        for i, encoding in enumerate(encodings):
+            gallery.add(f"person{i}", encoding)
+        known_faces = gallery.to_dict()
+        # Four faces in frame, each a noisy view of someone known
+        probes = encodings[rng.integers(0, size, 4)] + rng.normal(0, 0.02, (4, ENCODING_DIM)).astype(np.float32)
+
+        repeat = max(1, 2000 // size)
+        batched = timed(lambda: gallery.match(probes), repeat * 10)
+        loop = timed(lambda: loop_match(known_faces, probes), repeat) if size <= 10000 else float("nan")
+
+        build, ann, recall = float("nan"), float("nan"), float("nan")
+        if size >= 10000:
+            start = time.perf_counter()
+            gallery.index = IVFIndex(gallery.encodings)
+            build = time.perf_counter() - start
+            gallery.index_threshold = 0
+            ann = timed(lambda: gallery.match(probes), repeat * 10)
+            exact = FaceGallery.from_matrix(gallery.names, gallery.encodings)
+            exact.index_threshold = float("inf")
+            many = encodings[rng.integers(0, size, 400)] + rng.normal(0, 0.02, (400, ENCODING_DIM)).astype(np.float32)
+            recall = np.mean([a[0] == e[0] for a, e in zip(gallery.match(many), exact.match(many))])
+        print(f"{size:8d} {loop * 1000:10.3f} {batched * 1000:11.3f} {loop / batched:8.1f} "
+              f"{build:8.2f} {ann * 1000:8.3f} {recall:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_router.py
+"""
+Micro-benchmark for the compiled intent router.
+
+Grows a synthetic command table from tens to thousands of trigger phrases and
+reports the per-utterance matching cost next to a linear ``in`` chain like the
+one handle_command used to walk. Run with: python benchmarks/bench_router.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intents import IntentRouter  # noqa: E402
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+    "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey",
+    "xray", "yankee", "zulu", "open", "play", "music", "system", "status",
+]
+
+UTTERANCES = [
+    "jarvis what is the status of the system",
+    "please play some music from my alpha playlist",
+    "open the bravo charlie application for me right now",
+    "this sentence does not trigger anything at all sir",
+]
+
+
+def make_phrases(count, rng):
+    phrases = set()
+    while len(phrases) < count:
+        phrases.add(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + f" cmd{len(phrases)}")
+    return sorted(phrases)
+
+
+def time_per_call(func, utterances, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in utterances:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(utterances)) * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'phrases':>8} {'router us/utt':>14} {'linear us/utt':>14}")
+    for size in (10, 100, 1000, 5000, 20000):
+        phrases = make_phrases(size, rng)
+        router = IntentRouter()
+        for i, phrase in enumerate(phrases):
+            router.add(f"intent_{i}", phrase)
+        router.compile()
+
+        def linear(text, phrases=phrases):
+            ltext = text.lower()
+            for phrase in phrases:
+                if phrase in ltext:
+                    return phrase
+            return None
+
+        routed = time_per_call(router.match, UTTERANCES, 2000)
+        scanned = time_per_call(linear, UTTERANCES, max(1, 200000 // size))
+        print(f"{size:>8} {routed:>14.2f} {scanned:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
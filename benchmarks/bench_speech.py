@@ -0,0 +1,55 @@
+# benchmarks/bench_speech.py
+"""
+Time to first audio for whole-text vs. sentence-pipelined speech.
+
+For answers of increasing length, measures how long pyttsx3 takes to render
+the whole text (what the listener waits for when it is synthesized as one
+blob) and then speaks it through SpeechWorker with sentence pipelining,
+printing the per-sentence synthesis, wait and playback timings.
+Run with: python benchmarks/bench_speech.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+import pyttsx3  # noqa: E402
+
+from speech import SpeechWorker  # noqa: E402
+
+SENTENCE = "The reactor output is stable and every subsystem reports nominal values."
+
+
+def render_seconds(text):
+    engine = pyttsx3.init()
+    path = os.path.join(tempfile.mkdtemp(), "whole.wav")
+    start = time.perf_counter()
+    engine.save_to_file(text, path)
+    engine.runAndWait()
+    return time.perf_counter() - start
+
+
+def main():
+    pygame.mixer.init()
+    worker = SpeechWorker(pyttsx3.init)
+    worker.start()
+    for count in (1, 4, 16):
+        text = " ".join([SENTENCE] * count)
+        whole = render_seconds(text)
+        worker.sentence_timings.clear()
+        worker.say(text).wait()
+        timings = list(worker.sentence_timings)
+        first = timings[0]["wait"] if timings else float("nan")
+        print(f"{count:3d} sentences: whole render {whole * 1000:8.1f} ms, "
+              f"pipelined first audio {first * 1000:8.1f} ms")
+        for t in timings:
+            print(f"    #{t['sentence']:<3d} synth {t['synth'] * 1000:7.1f} ms  "
+                  f"wait {t['wait'] * 1000:7.1f} ms  play {t['play'] * 1000:7.1f} ms")
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
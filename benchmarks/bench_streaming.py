@@ -0,0 +1,51 @@
+# benchmarks/bench_streaming.py
+"""
+Time-to-first-sentence of streamed vs. blocking GPT responses.
+
+Starts the fake OpenAI-compatible server, then measures when the first
+fragment and the first complete sentence (the point where speech can start)
+become available, compared with waiting for the whole completion.
+Run with: python benchmarks/bench_streaming.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI  # noqa: E402
+
+import gpt  # noqa: E402
+from fake_openai_server import serve  # noqa: E402
+
+
+def main():
+    server = serve()
+    client = OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+    messages = [{"role": "user", "content": "explain recursion"}]
+
+    start = time.perf_counter()
+    gpt.complete(client, messages)
+    blocking = time.perf_counter() - start
+
+    splitter = gpt.SentenceSplitter()
+    first_fragment = first_sentence = None
+    start = time.perf_counter()
+    for fragment in gpt.stream_completion(client, messages):
+        if first_fragment is None:
+            first_fragment = time.perf_counter() - start
+        if splitter.feed(fragment) and first_sentence is None:
+            first_sentence = time.perf_counter() - start
+    streamed = time.perf_counter() - start
+    if first_sentence is None:
+        first_sentence = streamed
+
+    print(f"blocking: full response after  {blocking * 1000:8.1f} ms")
+    print(f"stream:   first fragment after {first_fragment * 1000:8.1f} ms")
+    print(f"stream:   first sentence after {first_sentence * 1000:8.1f} ms")
+    print(f"stream:   full response after  {streamed * 1000:8.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_wakeword.py
+"""
+CPU cost of the hands-free wake-word loop, replayed from WAV files.
+
+Feeds recorded 16 kHz mono WAV files through the same energy gate
+(Endpointer) and keyword spotter the microphone thread uses, 30 ms at a
+time, and reports detections and CPU time per second of audio. Idle
+recordings show the always-on cost; recordings containing "Jarvis" show
+the detection rate.
+Run with: python benchmarks/bench_wakeword.py recordings/*.wav --templates wake_templates
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from microphone import SAMPLE_RATE, Endpointer  # noqa: E402
+from wakeword import WAKE_TEMPLATE_DIR, KeywordSpotter, WakeWordDetector, read_wav  # noqa: E402
+
+
+def replay(path, spotter, cpu_budget):
+    samples, rate = read_wav(path)
+    if rate != SAMPLE_RATE:
+        raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz, got {rate} Hz")
+    endpointer = Endpointer()
+    wakes = []
+    detector = WakeWordDetector(spotter, wakes.append, cpu_budget=cpu_budget)
+    pcm = samples.tobytes()
+    step = endpointer.frame_bytes
+    start = time.process_time()
+    for offset in range(0, len(pcm) - step + 1, step):
+        audio = endpointer.feed(pcm[offset:offset + step], detector.max_segment)
+        if audio is not None:
+            detector(audio)
+    cpu = time.process_time() - start
+    return len(samples) / rate, cpu, detector.stats(), wakes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--templates", default=WAKE_TEMPLATE_DIR)
+    parser.add_argument("--cpu-budget", type=float, default=0.05)
+    args = parser.parse_args()
+
+    spotter = KeywordSpotter(args.templates)
+    if not spotter:
+        raise SystemExit(f"No keyword recordings in {args.templates}")
+    print(f"{len(spotter.templates)} templates, threshold {spotter.threshold:.2f}")
+
+    total_audio = total_cpu = 0.0
+    for path in args.wavs:
+        seconds, cpu, stats, wakes = replay(path, spotter, args.cpu_budget)
+        total_audio += seconds
+        total_cpu += cpu
+        with_command = sum(1 for w in wakes if w is not None)
+        print(f"{os.path.basename(path):30s} {seconds:7.1f} s audio  cpu {cpu * 1000:8.1f} ms "
+              f"({cpu / seconds * 100:5.2f}% of a core)  segments {stats['segments']:3d}  "
+              f"spotted {stats['spotted']:3d}  skipped {stats['skipped']:3d}  "
+              f"wakes {stats['detections']:3d} ({with_command} with command)")
+    print(f"{'total':30s} {total_audio:7.1f} s audio  cpu {total_cpu * 1000:8.1f} ms "
+          f"({total_cpu / total_audio * 100:5.2f}% of a core)")
+
+
+if __name__ == "__main__":
+    main()
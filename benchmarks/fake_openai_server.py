@@ -0,0 +1,126 @@
+# benchmarks/fake_openai_server.py
+"""
+Minimal OpenAI-compatible chat completions server for local runs.
+
+Answers POST /v1/chat/completions with a canned reply, either as one JSON body
+or as a server-sent event stream with a fixed delay per token. Point the
+assistant at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any
+OPENAI_API_KEY. Run with: python benchmarks/fake_openai_server.py --port 8765
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Certainly, sir. Recursion is when a function calls itself to solve a smaller "
+    "version of the same problem. Each call works on a simpler input until it "
+    "reaches a base case that can be answered directly. The results are then "
+    "combined on the way back up. It is a natural fit for trees, nested data and "
+    "divide-and-conquer algorithms."
+)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    reply = DEFAULT_REPLY
+    token_delay = 0.03
+    first_token_delay = 0.3
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        type(self).requests.append(body)
+        model = body.get("model", "fake-model")
+        if body.get("stream"):
+            self._stream(model)
+        else:
+            self._complete(model)
+
+    def _complete(self, model):
+        # Simulate the server generating every token before answering
+        time.sleep(self.first_token_delay + self.token_delay * len(self._tokens()))
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        time.sleep(self.first_token_delay)
+        for token in self._tokens():
+            self._event(model, {"content": token}, None)
+            time.sleep(self.token_delay)
+        self._event(model, {}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _event(self, model, delta, finish_reason):
+        chunk = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+        self.wfile.flush()
+
+    def _tokens(self):
+        return re.findall(r"\S+\s*", self.reply)
+
+
+def serve(port=0, reply=DEFAULT_REPLY, token_delay=0.03, first_token_delay=0.3):
+    """Start the server on a background thread and return it; server.server_port has the port."""
+    handler = type("Handler", (FakeOpenAIHandler,), {
+        "reply": reply,
+        "token_delay": token_delay,
+        "first_token_delay": first_token_delay,
+        "requests": [],
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    args = parser.parse_args()
+    server = serve(args.port, token_delay=args.token_delay, first_token_delay=args.first_token_delay)
+    print(f"Fake OpenAI server on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/voice_harness.py
+"""
+Headless end-to-end run of the voice path with a latency breakdown.
+
+Plays a directory of 16 kHz mono WAV utterances into the assistant's
+microphone stream in place of a device, then runs the real endpointing,
+recognition, dispatch (speculative or process_input) and speech synthesis
+stages. Speech is rendered to a scratch file instead of the speakers, the
+camera is a stand-in that never opens and pygame uses its dummy audio
+driver, so no audio or video device is needed.
+Per-stage p50/p95/p99 latencies are printed at the end:
+
+  endpoint   end of the utterance's audio -> endpointer closes it
+  recognize  last audio chunk -> final transcript
+  dispatch   final transcript -> response text
+  tts        response text -> speech fully synthesized
+  total      end of the utterance's audio -> speech synthesized
+
+With --backend file (the default), each name.wav needs a name.txt transcript.
+Run with: python benchmarks/voice_harness.py recordings/ --speed 4
+"""
+import argparse
+import glob
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+
+import utils  # noqa: E402
+from assistant import Assistant  # noqa: E402
+from camera import CameraService  # noqa: E402
+from microphone import SAMPLE_RATE, MicrophoneStream  # noqa: E402
+from speech import SpeechWorker  # noqa: E402
+from wakeword import read_wav  # noqa: E402
+
+STAGES = ("endpoint", "recognize", "dispatch", "tts", "total")
+
+
+class WavSource:
+    """
+    Stands in for sr.Microphone: serves queued PCM in real time (scaled by
+    ``speed``) and digital silence in between.
+    """
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self._pending = queue.Queue()
+        self._current = b""
+        self._on_end = None
+        self.stream = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def play(self, pcm):
+        """Queue pcm; returns an Event and a list that receives the time its audio ended."""
+        ended, stamp = threading.Event(), []
+        self._pending.put((pcm, ended, stamp))
+        return ended, stamp
+
+    def read(self, frames):
+        time.sleep(frames / SAMPLE_RATE / self.speed)
+        size = frames * 2
+        if not self._current:
+            try:
+                self._current, ended, stamp = self._pending.get_nowait()
+                self._on_end = (ended, stamp)
+            except queue.Empty:
+                return b"\0" * size
+        chunk, self._current = self._current[:size], self._current[size:]
+        if not self._current and self._on_end is not None:
+            ended, stamp = self._on_end
+            stamp.append(time.perf_counter())
+            ended.set()
+            self._on_end = None
+        return chunk + b"\0" * (size - len(chunk))
+
+
+class NullSinkEngine:
+    """Wraps a pyttsx3 engine so speech is synthesized into a scratch file instead of played."""
+    def __init__(self, engine):
+        self._engine = engine
+        self._path = os.path.join(tempfile.mkdtemp(prefix="jarvis-null-sink-"), "speech.wav")
+
+    def say(self, text, name=None):
+        self._engine.save_to_file(text, self._path, name)
+
+    def __getattr__(self, attr):
+        return getattr(self._engine, attr)
+
+
+class NoCamera:
+    """Stands in for cv2.VideoCapture on machines without a camera."""
+    def isOpened(self):
+        return False
+
+    def release(self):
+        pass
+
+
+def percentiles(values):
+    if not values:
+        return "      -        -        -"
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return f"{p50:8.1f} {p95:8.1f} {p99:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav_dir")
+    parser.add_argument("--backend", default="file", choices=("file", "vosk", "google"))
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed relative to real time")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.wav_dir, "*.wav")))
+    if not paths:
+        raise SystemExit(f"No WAV files in {args.wav_dir}")
+
+    settings = utils.load_settings()
+    settings.update(speech_backend=args.backend, transcripts_dir=args.wav_dir)
+    # Route capture, speech and the camera through the harness instead of real devices
+    source = WavSource(args.speed)
+    assistant = Assistant(
+        settings=settings,
+        microphone=MicrophoneStream(source_factory=lambda: source),
+        speech=SpeechWorker(lambda: NullSinkEngine(Assistant._create_engine()), pipeline_sentences=False),
+        camera=CameraService(source_factory=NoCamera),
+    )
+
+    results = {stage: [] for stage in STAGES}
+    listener = ThreadPoolExecutor(max_workers=1)
+    for _ in range(args.repeat):
+        for path in paths:
+            samples, rate = read_wav(path)
+            if rate != SAMPLE_RATE:
+                print(f"skipping {path}: {rate} Hz")
+                continue
+            future = listener.submit(assistant.voice_command, 10)
+            # Wait until the capture is armed so the utterance is not missed
+            while not assistant.microphone.listening.wait(0.005) and not future.done():
+                pass
+            ended, stamp = source.play(samples.tobytes())
+            text, response = future.result()
+            heard = time.perf_counter()
+            ended.wait()
+            audio_end = stamp[0]
+            recognized = assistant.recognizer.timings[-1]["latency"] if assistant.recognizer.timings else 0.0
+
+            start = time.perf_counter()
+            if response is None:
+                response = assistant.process_input(text)
+            dispatched = time.perf_counter()
+            assistant.speech.say(response).wait()
+            spoken = time.perf_counter()
+
+            results["endpoint"].append(max(0.0, heard - recognized - audio_end))
+            results["recognize"].append(recognized)
+            results["dispatch"].append(dispatched - start)
+            results["tts"].append(spoken - dispatched)
+            results["total"].append(spoken - audio_end)
+            print(f"{os.path.basename(path):24s} {text!r:40.40s} -> {response[:50]!r}")
+
+    print(f"\n{'stage':10s} {'n':>4s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for stage in STAGES:
+        print(f"{stage:10s} {len(results[stage]):4d} {percentiles(results[stage])}")
+    print(f"speculative commits: {assistant.speculator.committed}, "
+          f"rollbacks: {assistant.speculator.rolled_back}")
+    assistant.microphone.stop()
+    assistant.speech.stop()
+    listener.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# camera.py
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class CameraService:
+    """
+    One shared owner of the camera device.
+
+    Consumers ``acquire`` the service (or use it as a context manager) and
+    ``release`` it when done; the device is opened on a capture thread for
+    the first consumer and closed ``linger`` seconds after the last one
+    leaves, so back-to-back commands do not pay for reopening it. The
+    capture thread reads into two preallocated buffers and swaps them, so
+    ``read`` always returns the latest frame without allocating per frame.
+    The first ``warmup_frames`` after opening are dropped while auto
+    exposure settles.
+    """
+    def __init__(self, device_index=0, linger=2.0, warmup_frames=5, source_factory=None):
+        self.device_index = device_index
+        self.linger = linger
+        self.warmup_frames = warmup_frames
+        self.source_factory = source_factory or (lambda: cv2.VideoCapture(self.device_index))
+        self.error = None
+        self.frame_id = 0  # number of frames published since the service was created
+        self.frames_read = 0
+        self._refs = 0
+        self._released_at = 0.0
+        self._front = None
+        self._back = None
+        self._thread = None
+        self._closed = None  # set once the last capture thread let go of the device
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def acquire(self):
+        with self._cond:
+            self._refs += 1
+            if self._thread is None:
+                self.error = None
+                closed = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._closed, closed),
+                                                name="jarvis-camera", daemon=True)
+                self._closed = closed
+                self._thread.start()
+
+    def release(self):
+        with self._cond:
+            self._refs = max(0, self._refs - 1)
+            if self._refs == 0:
+                self._released_at = time.monotonic()
+
+    @property
+    def users(self):
+        return self._refs
+
+    def is_open(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def read(self, timeout=2.0, after=None, out=None):
+        """
+        Copy of the latest frame, or None if the camera failed or no frame
+        arrived within timeout. With ``after`` (a frame_id), waits for a frame
+        newer than that one. ``out`` receives the copy instead of a new array.
+        Returns (frame_id, frame).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._front is None or (after is not None and self.frame_id <= after):
+                remaining = deadline - time.monotonic()
+                if self.error is not None or remaining <= 0:
+                    return self.frame_id, None
+                self._cond.wait(remaining)
+            if out is None or out.shape != self._front.shape:
+                out = self._front.copy()
+            else:
+                np.copyto(out, self._front)
+            return self.frame_id, out
+
+    def frames(self, count, timeout=2.0):
+        """Up to count consecutive distinct frames."""
+        frames = []
+        frame_id = None
+        for _ in range(count):
+            frame_id, frame = self.read(timeout, after=frame_id)
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    def _idle(self):
+        return self._refs == 0 and time.monotonic() - self._released_at >= self.linger
+
+    def _run(self, previous_closed, closed):
+        # A closing capture thread must let go of the device before reopening it
+        if previous_closed is not None:
+            previous_closed.wait()
+        capture = None
+        try:
+            capture = self.source_factory()
+            if not capture.isOpened():
+                raise RuntimeError(f"camera {self.device_index} could not be opened")
+            dropped = 0
+            while True:
+                with self._cond:
+                    if self._idle():
+                        self._thread = None
+                        self._front = self._back = None
+                        break
+                ret, frame = capture.read(self._back) if self._back is not None else capture.read()
+                if not ret:
+                    raise RuntimeError("camera stopped delivering frames")
+                self.frames_read += 1
+                if dropped < self.warmup_frames:
+                    dropped += 1
+                    self._back = frame  # not published yet, so reusable for the next read
+                    continue
+                with self._cond:
+                    # A new array on the first frames, or if the resolution changed
+                    self._back = frame
+                    self._front, self._back = self._back, self._front
+                    self.frame_id += 1
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+            print(f"Camera error: {e}")
+            with self._cond:
+                self._thread = None
+                self._front = self._back = None
+                self._cond.notify_all()
+        finally:
+            if capture is not None:
+                capture.release()
+            closed.set()
+
+
+class PreviewStream:
+    """
+    Display-ready frames for a UI, prepared off the UI thread.
+
+    A worker takes each new camera frame (at most ``fps`` per second),
+    shrinks it straight to ``size`` with cv2.INTER_AREA and converts it to
+    RGB, all into preallocated buffers, then publishes it to a single
+    latest-frame slot. The UI pulls with ``latest``, which never blocks and
+    returns nothing when there is no newer frame, so its cost per tick stays
+    a small copy whatever the camera latency.
+    """
+    def __init__(self, camera, size=(320, 240), fps=15.0):
+        self.camera = camera
+        self.size = size  # (width, height)
+        self.fps = fps
+        self.frame_id = 0
+        self.frames_prepared = 0
+        self.prepare_seconds = 0.0
+        self._source = None
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._back = np.empty_like(self._small)
+        self._front = np.empty_like(self._small)
+        self._lock = threading.Lock()
+        self._stop = None
+
+    def is_running(self):
+        return self._stop is not None
+
+    def start(self):
+        if self._stop is not None:
+            return
+        self.camera.acquire()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), name="jarvis-preview", daemon=True).start()
+
+    def stop(self):
+        if self._stop is None:
+            return
+        self._stop.set()
+        self._stop = None
+        self.camera.release()
+
+    def latest(self, after=None, out=None):
+        """
+        (frame_id, RGB frame) of the newest prepared frame, copied into out
+        when given; frame is None if there is nothing newer than after.
+        """
+        with self._lock:
+            if self.frame_id == 0 or (after is not None and self.frame_id <= after):
+                return self.frame_id, None
+            if out is None:
+                out = self._front.copy()
+            else:
+                np.copyto(out, self._front)
+            return self.frame_id, out
+
+    def _run(self, stop):
+        interval = 1.0 / self.fps
+        camera_id = None
+        while not stop.is_set():
+            started = time.monotonic()
+            camera_id, frame = self.camera.read(timeout=1.0, after=camera_id, out=self._source)
+            if frame is None:
+                stop.wait(0.5 if self.camera.error is not None else 0.0)
+                continue
+            self._source = frame
+            prepare_start = time.monotonic()
+            cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=self._back)
+            with self._lock:
+                self._front, self._back = self._back, self._front
+                self.frame_id += 1
+            self.frames_prepared += 1
+            self.prepare_seconds += time.monotonic() - prepare_start
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
@@ -4,353 +4,247 @@ import platform
 import webbrowser
 from datetime import datetime
 import urllib.parse
-import subprocess
 import re
 import pyautogui
 import random
+from intents import IntentRegistry, IntentRouter
+from launcher import AppLauncher
 
-# Dictionary of common applications with their platform-specific commands
-APP_COMMANDS = {
-    "chrome": {
-        "Windows": "start chrome",
-        "Darwin": "open -a 'Google Chrome'",
-        "Linux": "google-chrome"
-    },
-    "firefox": {
-        "Windows": "start firefox",
-        "Darwin": "open -a Firefox",
-        "Linux": "firefox"
-    },
-    "word": {
-        "Windows": "start winword",
-        "Darwin": "open -a 'Microsoft Word'",
-        "Linux": "libreoffice --writer"
-    },
-    "excel": {
-        "Windows": "start excel",
-        "Darwin": "open -a 'Microsoft Excel'",
-        "Linux": "libreoffice --calc"
-    },
-    "powerpoint": {
-        "Windows": "start powerpnt",
-        "Darwin": "open -a 'Microsoft PowerPoint'",
-        "Linux": "libreoffice --impress"
-    },
-    "outlook": {
-        "Windows": "start outlook",
-        "Darwin": "open -a 'Microsoft Outlook'",
-        "Linux": "thunderbird"
-    },
-    "spotify": {
-        "Windows": "start spotify",
-        "Darwin": "open -a Spotify",
-        "Linux": "spotify"
-    },
-    "vscode": {
-        "Windows": "code",
-        "Darwin": "open -a 'Visual Studio Code'",
-        "Linux": "code"
-    },
-    "terminal": {
-        "Windows": "start cmd",
-        "Darwin": "open -a Terminal",
-        "Linux": "gnome-terminal"
-    }
-}
+# Launches and tracks applications for the open/close commands
+LAUNCHER = AppLauncher()
 
-def handle_command(text):
-    """Detect and handle custom commands in user input."""
-    if text is None:
-        return None
-    ltext = text.lower()
+# ─── Local command handlers ─────────────────────────────────────────────────────
+# Intents that need no assistant state are answered here; the rest are handled
+# by the assistant's own registry.
+COMMAND_HANDLERS = IntentRegistry()
 
-    # Time query
-    if "time" in ltext:
-        now = datetime.now().strftime("%I:%M %p")
-        return f"Sir, the current time is {now}."
+@COMMAND_HANDLERS.handles("time")
+def _time():
+    now = datetime.now().strftime("%I:%M %p")
+    return f"Sir, the current time is {now}."
 
-    # Date query
-    if "date" in ltext:
-        today = datetime.now().strftime("%B %d, %Y")
-        return f"Today's date is {today}, sir."
+@COMMAND_HANDLERS.handles("date")
+def _date():
+    today = datetime.now().strftime("%B %d, %Y")
+    return f"Today's date is {today}, sir."
 
-    # Open Notepad (Windows only)
-    if "notepad" in ltext:
-        if platform.system() == "Windows":
-            os.system("notepad")
-            return "Opening Notepad, sir."
-        else:
-            return "Notepad is only available on Windows systems, sir."
+@COMMAND_HANDLERS.handles("open_notepad")
+def _open_notepad():
+    if platform.system() == "Windows":
+        return LAUNCHER.launch("notepad")
+    else:
+        return "Notepad is only available on Windows systems, sir."
 
-    # Open Calculator
-    if "calculator" in ltext or "calc" in ltext:
-        if platform.system() == "Windows":
-            os.system("calc")
-            return "Opening Calculator, sir."
-        elif platform.system() == "Darwin":  # macOS
-            os.system("open -a Calculator")
-            return "Opening Calculator, sir."
-        else:
-            return "Calculator is not supported on this OS, sir."
+@COMMAND_HANDLERS.handles("open_calculator")
+def _open_calculator():
+    return LAUNCHER.launch("calculator")
+
+@COMMAND_HANDLERS.handles("web_search")
+def _web_search(query):
+    url = f"https://www.google.com/search?q={urllib.parse.quote_plus(query)}"
+    webbrowser.open(url)
+    return f"Searching for '{query}' on the web, sir."
+
+@COMMAND_HANDLERS.handles("system_info")
+def _system_info():
+    uname = platform.uname()
+    return (
+        f"System Information:\n"
+        f"System: {uname.system}\n"
+        f"Node Name: {uname.node}\n"
+        f"Release: {uname.release}\n"
+        f"Version: {uname.version}\n"
+        f"Machine: {uname.machine}\n"
+        f"Processor: {uname.processor}"
+    )
+
+@COMMAND_HANDLERS.handles("open_browser")
+def _open_browser():
+    webbrowser.open("https://www.google.com")
+    return "Opening web browser, sir."
+
+@COMMAND_HANDLERS.handles("shutdown_request")
+def _shutdown_request():
+    return "System shutdown command received. Confirm with 'shutdown confirm'."
+
+@COMMAND_HANDLERS.handles("shutdown_confirm")
+def _shutdown_confirm():
+    if platform.system() == "Windows":
+        os.system("shutdown /s /t 1")
+    else:
+        os.system("shutdown -h now")
+    return "Shutting down system..."
+
+@COMMAND_HANDLERS.handles("thanks")
+def _thanks():
+    return "You're welcome, sir. Always at your service."
+
+@COMMAND_HANDLERS.handles("good_morning")
+def _good_morning():
+    return "Good morning, sir. How may I assist you today?"
+
+@COMMAND_HANDLERS.handles("good_night")
+def _good_night():
+    return "Good night, sir. Do you require any assistance before I enter standby mode?"
+
+@COMMAND_HANDLERS.handles("open_app")
+def _open_app(app_name):
+    return LAUNCHER.launch(app_name)
+
+@COMMAND_HANDLERS.handles("close_app")
+def _close_app(app_name):
+    return LAUNCHER.close(app_name)
+
+@COMMAND_HANDLERS.handles("list_apps")
+def _list_apps():
+    running = LAUNCHER.running()
+    if not running:
+        return "No tracked applications are running, sir."
+    return "Running applications: " + ", ".join(sorted(running)) + ", sir."
 
-    # Web search (triggered by "search <query>")
-    if ltext.startswith("search "):
-        query = ltext.split("search ", 1)[1]
-        url = f"https://www.google.com/search?q={urllib.parse.quote_plus(query)}"
-        webbrowser.open(url)
-        return f"Searching for '{query}' on the web, sir."
+@COMMAND_HANDLERS.handles("jarvis_status")
+def _jarvis_status():
+    return "Running all systems at peak efficiency, sir. All protocols nominal."
 
-    # System commands
-    if "system info" in ltext:
-        uname = platform.uname()
-        return (
-            f"System Information:\n"
-            f"System: {uname.system}\n"
-            f"Node Name: {uname.node}\n"
-            f"Release: {uname.release}\n"
-            f"Version: {uname.version}\n"
-            f"Machine: {uname.machine}\n"
-            f"Processor: {uname.processor}"
-        )
-    
-    if "open browser" in ltext:
-        webbrowser.open("https://www.google.com")
-        return "Opening web browser, sir."
-    
-    if "shutdown" in ltext and "system" in ltext:
-        return "System shutdown command received. Confirm with 'shutdown confirm'."
-    
-    if "shutdown confirm" in ltext:
+@COMMAND_HANDLERS.handles("initiate_protocol")
+def _initiate_protocol():
+    protocols = [
+        "House Party Protocol",
+        "Clean Slate Protocol",
+        "Iron Legion Protocol",
+        "Veronica Protocol"
+    ]
+    return f"Initiating {random.choice(protocols)}, sir."
+
+@COMMAND_HANDLERS.handles("take_screenshot")
+def _take_screenshot():
+    try:
+        screenshot = pyautogui.screenshot()
+        screenshot.save("screenshot.png")
+        return "Screenshot captured and saved, sir."
+    except Exception as e:
+        return f"Failed to capture screenshot: {str(e)}"
+
+@COMMAND_HANDLERS.handles("lock_system")
+def _lock_system():
+    try:
         if platform.system() == "Windows":
-            os.system("shutdown /s /t 1")
-        else:
-            os.system("shutdown -h now")
-        return "Shutting down system..."
-    
-    # JARVIS-specific commands
-    if "jarvis" in ltext and ("thank" in ltext or "thanks" in ltext):
-        return "You're welcome, sir. Always at your service."
-    
-    if "jarvis" in ltext and ("good" in ltext and "morning" in ltext):
-        return "Good morning, sir. How may I assist you today?"
-        
-    if "jarvis" in ltext and ("good" in ltext and "night" in ltext):
-        return "Good night, sir. Do you require any assistance before I enter standby mode?"
+            os.system("rundll32.exe user32.dll,LockWorkStation")
+        elif platform.system() == "Darwin":
+            os.system("/System/Library/CoreServices/Menu\\ Extras/User.menu/Contents/Resources/CGSession -suspend")
+        else:  # Linux
+            os.system("gnome-screensaver-command -l")
+        return "System locked, sir."
+    except Exception as e:
+        return f"Failed to lock system: {str(e)}"
+
+# ─── Slot parsers ───────────────────────────────────────────────────────────────
+def _parse_alarm(intent):
+    match = re.search(r'(\d{1,2}:\d{2})', intent.text)
+    return {"time_str": match.group(1) if match else ""}
 
-    # Open any application
-    if "open " in ltext:
-        # Extract application name
-        app_name = ltext.split("open ", 1)[1].strip()
-        
-        # Check if it's a known application
-        if app_name in APP_COMMANDS:
-            cmd = APP_COMMANDS[app_name].get(platform.system())
-            if cmd:
-                os.system(cmd)
-                return f"Opening {app_name}, sir."
-            else:
-                return f"Sorry sir, {app_name} is not supported on this platform."
-        
-        # Try to open as a general application
-        try:
-            if platform.system() == "Windows":
-                os.system(f"start {app_name}")
-            elif platform.system() == "Darwin":
-                os.system(f"open -a '{app_name}'")
-            else:  # Linux
-                os.system(f"{app_name} &")
-            return f"Opening {app_name}, sir."
-        except Exception as e:
-            return f"Failed to open {app_name}: {str(e)}"
+def _parse_email(intent):
+    # Simplified parsing: "send email to <recipient> subject <subject> body <body>"
+    match = re.search(r"\bto (.+?) subject (.+?) body (.+)", intent.tail)
+    if not match:
+        return {"to_address": "", "subject": "", "body": ""}
+    to_address, subject, body = (part.strip() for part in match.groups())
+    return {"to_address": to_address, "subject": subject, "body": body}
 
-    # Music commands
-    if "play music" in ltext or "start music" in ltext:
-        query = ltext.split("music", 1)[1].strip() if "music" in ltext else ""
-        return "play_music:" + query
-        
-    if "pause music" in ltext:
-        return "pause_music"
-        
-    if "resume music" in ltext or "continue music" in ltext:
-        return "resume_music"
-        
-    if "stop music" in ltext:
-        return "stop_music"
-        
-    # Alarm commands
-    if "set alarm" in ltext:
-        # Extract time (HH:MM format)
-        match = re.search(r'(\d{1,2}:\d{2})', text)
-        if match:
-            time_str = match.group(1)
-            return "set_alarm:" + time_str
-        else:
-            return "Please specify time in HH:MM format, sir."
-        
-    # Fun commands
-    if "flip a coin" in ltext:
-        return "flip_coin"
-        
-    if "roll a dice" in ltext or "roll dice" in ltext:
-        return "roll_dice"
-        
-    # Camera command
-    if "open camera" in ltext:
-        return open_camera()
-        
-    # ===== CINEMATIC COMMANDS =====
-    if "activate hologram" in ltext:
-        return "activate_hologram"
-        
-    if "deactivate hologram" in ltext:
-        return "deactivate_hologram"
-        
-    if "security mode" in ltext and "activate" in ltext:
-        return "activate_security_mode"
-        
-    if "security mode" in ltext and ("deactivate" in ltext or "stand down" in ltext):
-        return "deactivate_security_mode"
-        
-    if "send email" in ltext:
-        # Simplified parsing
-        parts = ltext.split("send email")[1].split(" to ")
-        if len(parts) > 1:
-            recipient = parts[1].split(" subject ")[0].strip()
-            subject = parts[1].split(" subject ")[1].split(" body ")[0].strip()
-            body = parts[1].split(" body ")[1].strip()
-            return f"send_email:{recipient}|{subject}|{body}"
-        return "Please specify recipient, subject and body, sir."
-        
-    if "weather" in ltext:
-        return "get_weather"
-        
-    if "news" in ltext:
-        return "get_news"
-        
-    if "analyze" in ltext:
-        return "analyze_object"
-        
-    if "activate defense" in ltext or "activate weapons" in ltext:
-        return "activate_defense_systems"
-        
-    if "jarvis" in ltext and "status" in ltext:
-        return "Running all systems at peak efficiency, sir. All protocols nominal."
-        
-    if "initiate protocol" in ltext:
-        protocols = [
-            "House Party Protocol",
-            "Clean Slate Protocol",
-            "Iron Legion Protocol",
-            "Veronica Protocol"
-        ]
-        return f"Initiating {random.choice(protocols)}, sir."
-        
-    # Screen capture command
-    if "take screenshot" in ltext:
-        try:
-            screenshot = pyautogui.screenshot()
-            screenshot.save("screenshot.png")
-            return "Screenshot captured and saved, sir."
-        except Exception as e:
-            return f"Failed to capture screenshot: {str(e)}"
-            
-    # Lock computer command
-    if "lock system" in ltext:
-        try:
-            if platform.system() == "Windows":
-                os.system("rundll32.exe user32.dll,LockWorkStation")
-            elif platform.system() == "Darwin":
-                os.system("/System/Library/CoreServices/Menu\\ Extras/User.menu/Contents/Resources/CGSession -suspend")
-            else:  # Linux
-                os.system("gnome-screensaver-command -l")
-            return "System locked, sir."
-        except Exception as e:
-            return f"Failed to lock system: {str(e)}"
+def _parse_face_name(intent):
+    match = re.search(r"\bas\s+(.+)", intent.tail)
+    return {"name": match.group(1).strip() if match else "User"}
 
-    # Face recognition commands
-    if "who is this" in ltext or "recognize face" in ltext:
-        return "recognize_face"
-        
-    if "remember this face" in ltext:
-        name = ltext.split("as", 1)[1].strip() if "as" in ltext else "User"
-        return f"register_face:{name}"
-        
-    # Screen control commands
-    if "dim screen" in ltext or "lower brightness" in ltext:
-        return "dim_screen"
-        
-    if "brighten screen" in ltext or "increase brightness" in ltext:
-        return "brighten_screen"
-        
-    if "reset brightness" in ltext:
-        return "reset_brightness"
-        
-    # System health commands
-    if "system health" in ltext or "system status" in ltext:
-        return "system_health"
-        
-    # Entertainment commands
-    if "tell me a joke" in ltext:
-        return "tell_joke"
-        
-    if "flip a switch" in ltext:
-        return "flip_switch"
-        
-    if "play game" in ltext:
-        game_name = ltext.split("game", 1)[1].strip() if "game" in ltext else ""
-        return f"play_game:{game_name}"
-        
-    if "system scan" in ltext:
-        return "system_scan"
-        
-    # Camera surveillance command
-    if "surveillance mode" in ltext:
-        if "activate" in ltext:
-            return "activate_surveillance"
-        elif "deactivate" in ltext:
-            return "deactivate_surveillance"
-            
-    # Math commands
-    if "calculate" in ltext or "what is" in ltext and ("+" in text or "-" in text or "*" in text or "/" in text or "math" in ltext):
-        # Extract expression
-        expression = ltext.split("calculate", 1)[1].strip() if "calculate" in ltext else ltext.split("what is", 1)[1].strip()
-        return f"calculate:{expression}"
-        
-    # Drone control commands
-    if "drone" in ltext or "car" in ltext:
-        if "connect" in ltext:
-            return "connect_drone"
-        elif "disconnect" in ltext:
-            return "disconnect_drone"
-        elif "take off" in ltext:
-            return "takeoff_drone"
-        elif "land" in ltext:
-            return "land_drone"
-        elif "move forward" in ltext:
-            return "move_drone:forward"
-        elif "move backward" in ltext:
-            return "move_drone:backward"
-        elif "turn left" in ltext:
-            return "move_drone:left"
-        elif "turn right" in ltext:
-            return "move_drone:right"
-            
-    return None
+def _parse_enroll_directory(intent):
+    # Paths are case-sensitive, so take them from the original text
+    tail = intent.text[intent.end:].strip().lstrip(":_,").strip()
+    tail = re.sub(r"^from\s+", "", tail, flags=re.IGNORECASE)
+    return {"directory": tail or "faces"}
+
+def _is_math_question(text):
+    ltext = text.lower()
+    return "+" in text or "-" in text or "*" in text or "/" in text or "math" in ltext
 
+def _followed_by_word(trigger):
+    pattern = re.compile(rf"\b{trigger}\s+\S")
+    return lambda text: pattern.search(text.lower()) is not None
+
+# ─── Command table ──────────────────────────────────────────────────────────────
+# Every trigger is compiled once into a single word-level automaton. Rules that
+# need several words (e.g. "security mode" + "activate") list one group per
+# word; when several rules match, the most specific one wins.
+ROUTER = IntentRouter()
+ROUTER.add("time", "time")
+ROUTER.add("date", "date")
+ROUTER.add("open_notepad", "notepad")
+ROUTER.add("open_calculator", ["calculator", "calc"])
+ROUTER.add("web_search", "search", anchored=True, slots=lambda i: {"query": i.tail})
+ROUTER.add("system_info", "system info")
+ROUTER.add("open_browser", "open browser")
+ROUTER.add("shutdown_request", "shutdown", "system")
+ROUTER.add("shutdown_confirm", "shutdown confirm")
+ROUTER.add("thanks", "jarvis", ["thank", "thanks"])
+ROUTER.add("good_morning", "jarvis", "good", "morning")
+ROUTER.add("good_night", "jarvis", "good", "night")
+ROUTER.add("open_app", "open", guard=_followed_by_word("open"), slots=lambda i: {"app_name": i.tail})
+ROUTER.add("close_app", "close", guard=_followed_by_word("close"), slots=lambda i: {"app_name": i.tail})
+ROUTER.add("list_apps", ["list running apps", "list running applications", "running apps"])
+ROUTER.add("play_music", ["play music", "start music"], slots=lambda i: {"query": i.tail})
+ROUTER.add("pause_music", "pause music")
+ROUTER.add("resume_music", ["resume music", "continue music"])
+ROUTER.add("stop_music", "stop music")
+ROUTER.add("stop_talking", ["stop talking", "stop speaking", "be quiet", "shut up"])
+ROUTER.add("next_track", "next track")
+ROUTER.add("previous_track", "previous track")
+ROUTER.add("set_alarm", "set alarm", slots=_parse_alarm)
+ROUTER.add("flip_coin", "flip a coin")
+ROUTER.add("roll_dice", ["roll a dice", "roll dice"])
+ROUTER.add("open_camera", "open camera")
+ROUTER.add("activate_hologram", "activate hologram")
+ROUTER.add("deactivate_hologram", "deactivate hologram")
+ROUTER.add("activate_security_mode", "security mode", "activate")
+ROUTER.add("deactivate_security_mode", "security mode", ["deactivate", "stand down"])
+ROUTER.add("send_email", "send email", slots=_parse_email)
+ROUTER.add("get_weather", "weather")
+ROUTER.add("get_news", "news")
+ROUTER.add("analyze_object", "analyze")
+ROUTER.add("activate_defense_systems", ["activate defense", "activate weapons"])
+ROUTER.add("jarvis_status", "jarvis", "status")
+ROUTER.add("initiate_protocol", "initiate protocol")
+ROUTER.add("take_screenshot", "take screenshot")
+ROUTER.add("lock_system", "lock system")
+ROUTER.add("recognize_face", ["who is this", "recognize face"])
+ROUTER.add("register_face", "remember this face", slots=_parse_face_name)
+ROUTER.add("enroll_faces", "enroll faces", slots=_parse_enroll_directory)
+ROUTER.add("dim_screen", ["dim screen", "lower brightness"])
+ROUTER.add("brighten_screen", ["brighten screen", "increase brightness"])
+ROUTER.add("reset_brightness", "reset brightness")
+ROUTER.add("system_health", ["system health", "system status"])
+ROUTER.add("tell_joke", "tell me a joke")
+ROUTER.add("flip_switch", "flip a switch")
+ROUTER.add("play_game", "play game", slots=lambda i: {"game_name": i.tail})
+ROUTER.add("system_scan", "system scan")
+ROUTER.add("activate_surveillance", "surveillance mode", "activate")
+ROUTER.add("deactivate_surveillance", "surveillance mode", "deactivate")
+ROUTER.add("calculate", "calculate", slots=lambda i: {"problem": i.tail})
+ROUTER.add("calculate", "what is", guard=_is_math_question, slots=lambda i: {"problem": i.tail})
+ROUTER.add("connect_drone", ["drone", "car"], "connect")
+ROUTER.add("disconnect_drone", ["drone", "car"], "disconnect")
+ROUTER.add("takeoff_drone", ["drone", "car"], "take off")
+ROUTER.add("land_drone", ["drone", "car"], "land")
+ROUTER.add("move_drone", ["drone", "car"], "move forward", slots=lambda i: {"direction": "forward"})
+ROUTER.add("move_drone", ["drone", "car"], "move backward", slots=lambda i: {"direction": "backward"})
+ROUTER.add("move_drone", ["drone", "car"], "turn left", slots=lambda i: {"direction": "left"})
+ROUTER.add("move_drone", ["drone", "car"], "turn right", slots=lambda i: {"direction": "right"})
+ROUTER.compile()
+
+def handle_command(text):
+    """Match user input against the command table and return an Intent, or None."""
+    if text is None:
+        return None
+    return ROUTER.match(text)
+
+@COMMAND_HANDLERS.handles("open_camera")
 def open_camera():
     """Open camera application"""
-    system = platform.system()
-    try:
-        if system == "Windows":
-            os.system("start microsoft.windows.camera:")
-            return "Opening camera, sir."
-        elif system == "Darwin":  # macOS
-            os.system("open /System/Applications/Photo Booth.app")
-            return "Opening camera, sir."
-        elif system == "Linux":
-            os.system("cheese &")
-            return "Opening camera, sir."
-        else:
-            return "Camera not supported on this OS, sir."
-    except Exception as e:
-        return f"Failed to open camera: {str(e)}"
\ No newline at end of file
+    return LAUNCHER.launch("camera")
\ No newline at end of file
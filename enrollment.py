@@ -0,0 +1,131 @@
+# enrollment.py
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+
+import face_recognition
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+# Photos are shrunk to this longest side before detection; a face in a
+# phone photo is still hundreds of pixels wide at this size
+MAX_IMAGE_SIDE = 1600
+
+
+@dataclass
+class EnrollmentReport:
+    enrolled: int = 0
+    people: set = field(default_factory=set)
+    duplicates: int = 0  # already enrolled (or repeated in this batch), by content hash
+    no_face: int = 0
+    several_faces: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def images_per_second(self):
+        processed = self.enrolled + self.no_face + self.several_faces + self.failed
+        return processed / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        text = (f"Enrolled {self.enrolled} images of {len(self.people)} people in {self.seconds:.1f} s "
+                f"({self.images_per_second:.1f} images/s)")
+        skipped = [(self.duplicates, "already enrolled"), (self.no_face, "without a face"),
+                   (self.several_faces, "with several faces"), (self.failed, "unreadable")]
+        skipped = [f"{count} {reason}" for count, reason in skipped if count]
+        return text + (f"; skipped {', '.join(skipped)}" if skipped else "")
+
+
+def find_images(root):
+    """(name, path) for every image under root/<name>/, in a stable order."""
+    images = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        for folder, _, files in os.walk(entry.path):
+            for file in sorted(files):
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append((entry.name, os.path.join(folder, file)))
+    return images
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def encode_image(path, max_side=MAX_IMAGE_SIDE, model="hog"):
+    """
+    Runs in a pool worker: the encoding of the only face in the image, or
+    the string "none" / "several" / "error: ..." when there is not exactly one.
+    """
+    try:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            image.thumbnail((max_side, max_side))
+            pixels = np.asarray(image)
+        locations = face_recognition.face_locations(pixels, model=model)
+        if not locations:
+            return "none"
+        if len(locations) > 1:
+            return "several"
+        return face_recognition.face_encodings(pixels, locations)[0]
+    except Exception as e:
+        return f"error: {e}"
+
+
+def enroll_directory(store, root, workers=None, max_side=MAX_IMAGE_SIDE, model="hog"):
+    """
+    Encode every image under root/<name>/ across a process pool and add the
+    results to store in one transaction. Files whose content hash is already
+    enrolled are skipped. Returns an EnrollmentReport.
+    """
+    report = EnrollmentReport()
+    start = time.perf_counter()
+    pending, digests = [], set(store.sources)
+    for name, path in find_images(root):
+        try:
+            digest = file_digest(path)
+        except OSError as e:
+            print(f"Enrollment read error: {path}: {e}")
+            report.failed += 1
+            continue
+        if digest in digests:
+            report.duplicates += 1
+            continue
+        digests.add(digest)
+        pending.append((name, path, digest))
+
+    entries, sources = [], []
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        encode = partial(encode_image, max_side=max_side, model=model)
+        paths = [path for _, path, _ in pending]
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            results = pool.map(encode, paths, chunksize=max(1, len(paths) // (workers * 4)))
+            for (name, path, digest), result in zip(pending, results):
+                if isinstance(result, str):
+                    if result == "none":
+                        report.no_face += 1
+                    elif result == "several":
+                        report.several_faces += 1
+                    else:
+                        print(f"Enrollment error: {path}: {result[len('error: '):]}")
+                        report.failed += 1
+                    continue
+                entries.append((name, result))
+                sources.append((digest, name))
+                report.people.add(name)
+
+    store.add_many(entries, sources)
+    report.enrolled = len(entries)
+    report.seconds = time.perf_counter() - start
+    return report
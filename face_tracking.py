@@ -0,0 +1,170 @@
+# face_tracking.py
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import cv2
+import dlib
+import face_recognition
+import numpy as np
+
+from faces import DEFAULT_TOLERANCE
+
+STAGES = ("convert", "detect", "encode", "match", "track", "total")
+
+
+@dataclass
+class TrackedFace:
+    track_id: int
+    box: tuple  # (top, right, bottom, left) in full-resolution pixels
+    name: Optional[str] = None
+    distance: float = float("inf")
+    confidence: float = 0.0
+    quality: float = 0.0  # tracker peak-to-sidelobe ratio; 0 right after detection
+    tracker: object = field(default=None, repr=False)
+
+
+def _area(box):
+    return (box[1] - box[3]) * (box[2] - box[0])
+
+
+def _iou(a, b):
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    union = _area(a) + _area(b) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FacePipeline:
+    """
+    Continuous face recognition over camera frames.
+
+    Each BGR frame is converted to RGB once and shrunk by ``scale`` for
+    detection; detected boxes are mapped back up and encoded at full
+    resolution. Between detections every face is followed by a dlib
+    correlation tracker on the small frame. Detection and encoding run every
+    ``detect_every`` frames (also while nobody is in view), or sooner when a
+    tracker's peak-to-sidelobe ratio drops below ``min_quality`` (the track
+    was lost). New detections take over the track id of the box they overlap
+    most, so ids are stable.
+    Per-frame stage times in milliseconds are kept in ``timings``.
+    """
+    def __init__(self, store, scale=0.25, detect_every=10, min_quality=7.0,
+                 model="hog", upsample=1, tolerance=DEFAULT_TOLERANCE):
+        self.store = store
+        self.scale = scale
+        self.detect_every = detect_every
+        self.min_quality = min_quality
+        self.model = model
+        self.upsample = upsample
+        self.tolerance = tolerance
+        self.faces = []
+        self.frames = 0
+        self.detections = 0
+        self.timings = deque(maxlen=300)  # {stage: ms} per frame
+        self._ids = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        self.faces = []
+        self._since_detection = self.detect_every  # detect on the next frame
+
+    def prepare(self, frame):
+        """Full-resolution RGB and the downscaled copy used for detection and tracking."""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.scale == 1:
+            return rgb, rgb
+        return rgb, cv2.resize(rgb, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def process(self, frame):
+        """Track or detect faces in one BGR frame; returns the current TrackedFace list."""
+        timing = dict.fromkeys(STAGES, 0.0)
+        start = time.perf_counter()
+        rgb, small = self.prepare(frame)
+        timing["convert"] = (time.perf_counter() - start) * 1000
+
+        due = self._since_detection >= self.detect_every
+        lost = False
+        if self.faces and not due:
+            lost = not self._track(small, timing)
+        if due or lost:
+            self.faces = self._detect(rgb, small, timing, self.faces)
+            self.detections += 1
+            self._since_detection = 0
+        self._since_detection += 1
+        self.frames += 1
+
+        timing["total"] = (time.perf_counter() - start) * 1000
+        self.timings.append(timing)
+        return self.faces
+
+    def detect(self, frame):
+        """One-shot detection and recognition of a BGR frame; leaves the tracks alone and starts no trackers."""
+        rgb, small = self.prepare(frame)
+        return self._detect(rgb, small, dict.fromkeys(STAGES, 0.0), [], track=False)
+
+    def _track(self, small, timing):
+        """Advance every tracker; False if any track was lost."""
+        start = time.perf_counter()
+        ok = True
+        height, width = small.shape[:2]
+        for face in self.faces:
+            face.quality = face.tracker.update(small)
+            pos = face.tracker.get_position()
+            left, top = max(0.0, pos.left()), max(0.0, pos.top())
+            right, bottom = min(float(width), pos.right()), min(float(height), pos.bottom())
+            face.box = self._upscale((top, right, bottom, left))
+            if face.quality < self.min_quality:
+                ok = False
+        timing["track"] = (time.perf_counter() - start) * 1000
+        return ok
+
+    def _detect(self, rgb, small, timing, previous, track=True):
+        start = time.perf_counter()
+        small_boxes = face_recognition.face_locations(small, self.upsample, self.model)
+        boxes = [self._upscale(box, rgb.shape) for box in small_boxes]
+        timing["detect"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        encodings = face_recognition.face_encodings(rgb, boxes) if boxes else []
+        timing["encode"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        matches = self.store.gallery.match(encodings, self.tolerance) if encodings else []
+        timing["match"] = (time.perf_counter() - start) * 1000
+
+        previous = list(previous)
+        faces = []
+        for small_box, box, (name, distance, confidence) in zip(small_boxes, boxes, matches):
+            best = max(previous, key=lambda face: _iou(face.box, box), default=None)
+            if best is not None and _iou(best.box, box) > 0.3:
+                previous.remove(best)
+                track_id = best.track_id
+            else:
+                track_id = next(self._ids)
+            tracker = None
+            if track:
+                top, right, bottom, left = small_box
+                tracker = dlib.correlation_tracker()
+                tracker.start_track(small, dlib.rectangle(left, top, right, bottom))
+            faces.append(TrackedFace(track_id, box, name, distance, confidence, 0.0, tracker))
+        return faces
+
+    def _upscale(self, box, shape=None):
+        top, right, bottom, left = (int(round(v / self.scale)) for v in box)
+        if shape is not None:
+            top, left = max(0, top), max(0, left)
+            bottom, right = min(shape[0], bottom), min(shape[1], right)
+        return top, right, bottom, left
+
+    def stats(self):
+        """Mean and p95 milliseconds per stage over the recent frames, plus frame and detection counts."""
+        stats = {"frames": self.frames, "detections": self.detections}
+        if self.timings:
+            for stage in STAGES:
+                values = np.array([timing[stage] for timing in self.timings])
+                stats[stage] = {"mean": float(values.mean()), "p95": float(np.percentile(values, 95))}
+        return stats
@@ -0,0 +1,477 @@
+# faces.py
+import glob
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+ENCODING_DIM = 128
+
+FACE_STORE_DIR = "face_gallery"
+
+_JOURNAL_MAGIC = b"JFJ1"
+_JOURNAL_HEADER = struct.Struct("<4sI")  # magic, generation
+_RECORD_HEADER = struct.Struct("<cHd")   # op, name length, timestamp
+# Record ops: b"A" add (payload: encoding), b"D" delete, b"S" enrolled source
+# (payload: sha256 digest), b"B"/b"C" begin/commit of a multi-record transaction
+_DIGEST_SIZE = 32
+
+# Same default as face_recognition.compare_faces
+DEFAULT_TOLERANCE = 0.6
+
+# Galleries at least this large are matched through an IVFIndex
+INDEX_THRESHOLD = 20000
+
+
+def sharpness(frames):
+    """
+    Variance of the Laplacian of each frame in a burst, computed for the
+    whole stack at once. frames is (F, H, W) grayscale or (F, H, W, 3) BGR.
+    Higher is sharper; motion blur and defocus both lower it.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    if frames.ndim == 4:
+        frames = frames @ np.array([0.114, 0.587, 0.299], dtype=np.float32)
+    laplacian = (frames[:, :-2, 1:-1] + frames[:, 2:, 1:-1] + frames[:, 1:-1, :-2]
+                 + frames[:, 1:-1, 2:] - 4.0 * frames[:, 1:-1, 1:-1])
+    return laplacian.reshape(len(frames), -1).var(axis=1)
+
+
+def sharpest(frames, count):
+    """Indices of the count sharpest frames, sharpest first."""
+    scores = sharpness(frames)
+    return [int(i) for i in np.argsort(scores)[::-1][:count]]
+
+
+def _sq_distances(probes, vectors, sq_norms):
+    sq = sq_norms[None, :] + np.einsum("ij,ij->i", probes, probes)[:, None] - 2.0 * (probes @ vectors.T)
+    return np.maximum(sq, 0.0, out=sq)
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index over face encodings (inverted file).
+
+    The rows are split into ``lists`` cells by k-means (about sqrt(N) cells,
+    trained on a sample). A query ranks the cell centroids and scans only the
+    rows of the ``probes`` nearest cells, so it touches roughly
+    N * probes / lists rows instead of all N. Rows are stored grouped by cell
+    so each cell is one contiguous slice.
+    """
+    def __init__(self, encodings, lists=None, probes=8, iterations=8, seed=0):
+        encodings = np.asarray(encodings, dtype=np.float32)
+        self.count = len(encodings)
+        lists = min(self.count, lists or max(1, int(np.sqrt(self.count))))
+        self.probes = min(probes, lists)
+        rng = np.random.default_rng(seed)
+        sample = min(self.count, lists * 64)
+        train = np.ascontiguousarray(encodings[np.sort(rng.choice(self.count, sample, replace=False))])
+        centroids = train[rng.choice(sample, lists, replace=False)].copy()
+        for _ in range(iterations):
+            centroids = self._update(train, self._assign(train, centroids), centroids)
+        self.centroids = centroids
+        self._centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+
+        assign = self._assign(encodings, centroids)
+        self.rows = np.argsort(assign, kind="stable")
+        self.vectors = np.ascontiguousarray(encodings[self.rows])
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=lists))))
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk=16384):
+        norms = np.einsum("ij,ij->i", centroids, centroids)
+        return np.concatenate([
+            _sq_distances(vectors[i:i + chunk], centroids, norms).argmin(axis=1)
+            for i in range(0, len(vectors), chunk)
+        ])
+
+    @staticmethod
+    def _update(train, assign, centroids):
+        counts = np.bincount(assign, minlength=len(centroids))
+        order = np.argsort(assign, kind="stable")
+        starts = np.cumsum(counts) - counts
+        filled = counts > 0  # empty cells keep their old centroid
+        centroids = centroids.copy()
+        centroids[filled] = np.add.reduceat(train[order], starts[filled]) / counts[filled, None]
+        return centroids
+
+    def search(self, probes):
+        """Nearest indexed row and its distance for each probe; row -1 if the probed cells are empty."""
+        probes = np.asarray(probes, dtype=np.float32)
+        cell_dist = _sq_distances(probes, self.centroids, self._centroid_norms)
+        if self.probes < len(self.centroids):
+            cells = np.argpartition(cell_dist, self.probes - 1, axis=1)[:, :self.probes]
+        else:
+            cells = np.broadcast_to(np.arange(len(self.centroids)), cell_dist.shape)
+        rows = np.full(len(probes), -1)
+        best = np.full(len(probes), np.inf, dtype=np.float32)
+        for i, probe in enumerate(probes):
+            candidates = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in cells[i]])
+            if not len(candidates):
+                continue
+            sq = _sq_distances(probe[None, :], self.vectors[candidates], self.sq_norms[candidates])[0]
+            j = sq.argmin()
+            rows[i] = self.rows[candidates[j]]
+            best[i] = np.sqrt(sq[j])
+        return rows, best
+
+
+class FaceGallery:
+    """
+    Known face encodings held as one contiguous (N, 128) float32 matrix.
+
+    Row i belongs to ``names[i]``. Squared row norms are kept alongside so
+    matching every probe against every row is a single matrix product.
+    Rows live in a buffer that grows by doubling, so adding is amortized O(1).
+    The buffer may start as a read-only memory map (see ``from_matrix``);
+    it is copied into memory on the first change.
+
+    A name may own several rows (one per sample); a probe matches the name
+    of its nearest row. Galleries of ``index_threshold`` rows or more are
+    searched through an IVFIndex. Rows added after the index was built are
+    searched exactly until they make up a tenth of the index, which then
+    gets rebuilt; removing a name drops the index.
+    """
+    def __init__(self, dim=ENCODING_DIM, index_threshold=INDEX_THRESHOLD):
+        self.dim = dim
+        self.names = []
+        self.index_threshold = index_threshold
+        self.index = None
+        self._version = 0  # bumped whenever existing rows move
+        self._data = np.empty((16, dim), dtype=np.float32)
+        self._sq_norms = np.empty(16, dtype=np.float32)
+
+    @classmethod
+    def from_matrix(cls, names, matrix):
+        """Gallery over an existing (N, dim) matrix without copying it."""
+        gallery = cls(matrix.shape[1])
+        gallery.names = list(names)
+        gallery._data = matrix
+        gallery._sq_norms = None  # computed on first match
+        return gallery
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    @property
+    def encodings(self):
+        return self._data[:len(self.names)]
+
+    def add(self, name, encoding):
+        """Append one encoding for name."""
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        count = len(self.names)
+        if count == len(self._data) or not self._data.flags.writeable:
+            self._grow(max(16, count * 2))
+        self._data[count] = encoding
+        if self._sq_norms is not None:
+            self._sq_norms[count] = encoding @ encoding
+        self.names.append(name)
+
+    def set(self, name, encoding):
+        """Replace every encoding of name with this one."""
+        self.remove(name)
+        self.add(name, encoding)
+
+    def samples(self, name):
+        """All encodings stored for name, shape (k, dim)."""
+        return self.encodings[[i for i, n in enumerate(self.names) if n == name]]
+
+    def remove(self, name):
+        keep = [i for i, n in enumerate(self.names) if n != name]
+        if len(keep) == len(self.names):
+            return
+        self.index = None
+        self._version += 1
+        self._data = self._data[keep]
+        if self._sq_norms is not None:
+            self._sq_norms = self._sq_norms[keep]
+        self.names = [self.names[i] for i in keep]
+
+    def _grow(self, capacity):
+        count = len(self.names)
+        data = np.empty((capacity, self.dim), dtype=np.float32)
+        data[:count] = self.encodings
+        if self._sq_norms is not None:
+            sq_norms = np.empty(capacity, dtype=np.float32)
+            sq_norms[:count] = self._sq_norms[:count]
+            self._sq_norms = sq_norms
+        self._data = data
+
+    def _norms(self):
+        count = len(self.names)
+        if self._sq_norms is None:
+            sq_norms = np.empty(len(self._data), dtype=np.float32)
+            sq_norms[:count] = np.einsum("ij,ij->i", self.encodings, self.encodings)
+            self._sq_norms = sq_norms
+        return self._sq_norms[:count]
+
+    def distances(self, probes):
+        """Euclidean distances, shape (len(probes), len(self)), from one matrix product."""
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.dim)
+        sq = (self._norms()[None, :] + np.einsum("ij,ij->i", probes, probes)[:, None]
+              - 2.0 * (probes @ self.encodings.T))
+        return np.sqrt(np.maximum(sq, 0.0, out=sq), out=sq)
+
+    def build_index(self):
+        """(Re)build the IVF index if the gallery is large enough; safe to run on a background thread."""
+        count, version = len(self.names), self._version
+        if count < self.index_threshold:
+            return
+        index = IVFIndex(self.encodings[:count])
+        if version == self._version:
+            self.index = index
+
+    def _nearest(self, probes):
+        count = len(self.names)
+        if count >= self.index_threshold and (self.index is None or count - self.index.count > self.index.count // 10):
+            self.build_index()
+        if self.index is None:
+            dist = self.distances(probes)
+            nearest = dist.argmin(axis=1)
+            return nearest, dist[np.arange(len(probes)), nearest]
+        nearest, best = self.index.search(probes)
+        start = self.index.count
+        if start < count:
+            # Rows added since the index was built
+            tail = np.sqrt(_sq_distances(probes, self.encodings[start:], self._norms()[start:]))
+            tail_nearest = tail.argmin(axis=1)
+            tail_best = tail[np.arange(len(probes)), tail_nearest]
+            closer = tail_best < best
+            nearest = np.where(closer, start + tail_nearest, nearest)
+            best = np.where(closer, tail_best, best)
+        return nearest, best
+
+    def match(self, probes, tolerance=DEFAULT_TOLERANCE):
+        """
+        Nearest known face for each probe encoding.
+
+        Returns one (name, distance, confidence) per probe. name is None when
+        the nearest face is farther than tolerance. confidence falls linearly
+        from 1 at distance 0 to 0 at the tolerance.
+        """
+        probes = np.asarray(probes, dtype=np.float32).reshape(-1, self.dim)
+        if not len(self.names):
+            return [(None, float("inf"), 0.0) for _ in range(len(probes))]
+        nearest, best = self._nearest(probes)
+        confidence = np.clip(1.0 - best / tolerance, 0.0, 1.0)
+        return [
+            (self.names[i] if i >= 0 and d <= tolerance else None, float(d), float(c))
+            for i, d, c in zip(nearest, best, confidence)
+        ]
+
+    def to_dict(self):
+        """name -> encoding, keeping the last encoding of each name."""
+        return {name: self._data[i].copy() for i, name in enumerate(self.names)}
+
+
+class FaceStore:
+    """
+    On-disk face gallery without pickle.
+
+    ``directory`` holds a compacted snapshot, written only by ``compact``:
+    ``encodings-<generation>.npy`` is opened as a memory map, so startup does
+    not read the matrix. ``index.json`` holds the row names, their add times
+    and the current generation, plus the content hashes of enrolled image
+    files (``sources``). New registrations and deletions are appended to
+    ``journal.bin`` as fixed-layout records and replayed on load; a change of
+    several records is written between begin and commit markers with one
+    fsync and is dropped on load unless the commit made it to disk. Once the
+    journal holds ``compact_every`` records it is folded into a new
+    snapshot. The journal header carries the generation it applies to, so a
+    journal left over from an interrupted compaction is ignored.
+    """
+    def __init__(self, directory=FACE_STORE_DIR, compact_every=256, dim=ENCODING_DIM):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.dim = dim
+        self.generation = 0
+        self.added = []  # add time of each gallery row
+        self.sources = {}  # sha256 hex of an enrolled file -> name
+        self.journal_records = 0
+        self.gallery = FaceGallery(dim)
+        os.makedirs(directory, exist_ok=True)
+        self.load()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.directory, "journal.bin")
+
+    def _encodings_path(self, generation):
+        return os.path.join(self.directory, f"encodings-{generation}.npy")
+
+    # ─── Loading ───────────────────────────────────────────────────────────────
+    def load(self):
+        names, self.added, self.generation, self.sources = [], [], 0, {}
+        matrix = np.empty((0, self.dim), dtype=np.float32)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            self.generation = index["generation"]
+            names, self.added = index["names"], index["added"]
+            self.sources = index.get("sources", {})
+            if names:
+                matrix = np.load(self._encodings_path(self.generation), mmap_mode="r")
+        self.gallery = FaceGallery.from_matrix(names, matrix)
+        self.journal_records = self._replay()
+
+    def _replay(self):
+        """Apply the journal to the gallery; returns the number of records applied."""
+        if not os.path.exists(self.journal_path):
+            self._reset_journal()
+            return 0
+        applied = 0
+        payload_sizes = {b"A": self.dim * 4, b"S": _DIGEST_SIZE}
+        with open(self.journal_path, "rb") as f:
+            header = f.read(_JOURNAL_HEADER.size)
+            if len(header) < _JOURNAL_HEADER.size:
+                magic, generation = None, None
+            else:
+                magic, generation = _JOURNAL_HEADER.unpack(header)
+            if magic != _JOURNAL_MAGIC or generation != self.generation:
+                f.close()
+                self._reset_journal()
+                return 0
+            valid_end = f.tell()
+            pending = None  # records of an open transaction
+            while True:
+                head = f.read(_RECORD_HEADER.size)
+                if len(head) < _RECORD_HEADER.size:
+                    break
+                op, name_len, added = _RECORD_HEADER.unpack(head)
+                name = f.read(name_len)
+                size = payload_sizes.get(op, 0)
+                payload = f.read(size)
+                if len(name) < name_len or len(payload) < size:
+                    break
+                if op == b"B":
+                    pending = []
+                    continue
+                if op == b"C":
+                    records, pending = pending or [], None
+                else:
+                    records = [(op, name.decode("utf-8"), added, payload)]
+                    if pending is not None:
+                        pending.extend(records)
+                        continue
+                for record in records:
+                    self._apply(*record)
+                applied += len(records)
+                valid_end = f.tell()
+        # Drop a record torn by a crash mid-write, or a transaction that never committed
+        if valid_end < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid_end)
+        return applied
+
+    def _reset_journal(self):
+        with open(self.journal_path, "wb") as f:
+            f.write(_JOURNAL_HEADER.pack(_JOURNAL_MAGIC, self.generation))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ─── Changes ───────────────────────────────────────────────────────────────
+    def add(self, name, encoding):
+        """Append an encoding for name: one journal record, O(1)."""
+        self._commit([self._add_record(name, encoding)])
+
+    def remove(self, name):
+        self._commit([(b"D", name, time.time(), b"")])
+
+    def set(self, name, encoding):
+        """Replace every encoding of name with this one."""
+        self.set_samples(name, [encoding])
+
+    def set_samples(self, name, encodings):
+        """Replace every encoding of name with these samples, in one transaction."""
+        self._commit([(b"D", name, time.time(), b"")] + [self._add_record(name, e) for e in encodings])
+
+    def add_many(self, entries, sources=()):
+        """
+        Append (name, encoding) entries and record (sha256 hex, name) sources
+        in one transaction: after a crash either all of them are there or none.
+        """
+        records = [self._add_record(name, encoding) for name, encoding in entries]
+        added = time.time()
+        records += [(b"S", name, added, bytes.fromhex(digest)) for digest, name in sources]
+        self._commit(records)
+
+    def _add_record(self, name, encoding):
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        return b"A", name, time.time(), encoding.tobytes()
+
+    def _apply(self, op, name, added, payload):
+        if op == b"A":
+            self.gallery.add(name, np.frombuffer(payload, dtype=np.float32))
+            self.added.append(added)
+        elif op == b"D":
+            self.added = [a for a, n in zip(self.added, self.gallery.names) if n != name]
+            self.gallery.remove(name)
+            self.sources = {digest: n for digest, n in self.sources.items() if n != name}
+        elif op == b"S":
+            self.sources[payload.hex()] = name
+
+    def _commit(self, records):
+        if not records:
+            return
+        data = [self._pack(*record) for record in records]
+        if len(records) > 1:
+            data = [self._pack(b"B", "", 0.0)] + data + [self._pack(b"C", "", 0.0)]
+        with open(self.journal_path, "ab") as f:
+            f.write(b"".join(data))
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self._apply(*record)
+        self.journal_records += len(records)
+        self._maybe_compact()
+
+    @staticmethod
+    def _pack(op, name, added, payload=b""):
+        encoded = name.encode("utf-8")
+        return _RECORD_HEADER.pack(op, len(encoded), added) + encoded + payload
+
+    def _maybe_compact(self):
+        if self.journal_records >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write the gallery as a new snapshot generation and start an empty journal."""
+        generation = self.generation + 1
+        encodings_path = self._encodings_path(generation)
+        np.save(encodings_path, np.ascontiguousarray(self.gallery.encodings))
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "names": self.gallery.names, "added": self.added,
+                       "sources": self.sources}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+        self.generation = generation
+        self._reset_journal()
+        self.journal_records = 0
+        # Reopen the snapshot as a memory map instead of keeping the copy; rows keep their order
+        index = self.gallery.index
+        self.gallery = FaceGallery.from_matrix(self.gallery.names, np.load(encodings_path, mmap_mode="r"))
+        self.gallery.index = index
+        self._remove_stale_snapshots()
+
+    def _remove_stale_snapshots(self):
+        current = self._encodings_path(self.generation)
+        for path in glob.glob(os.path.join(self.directory, "encodings-*.npy")):
+            if os.path.abspath(path) != os.path.abspath(current):
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Still mapped (Windows locks it); retried after the next compaction
+                    pass
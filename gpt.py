@@ -0,0 +1,283 @@
+# gpt.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Handle tiktoken import
+try:
+    import tiktoken # type: ignore
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+CACHE_FILE = "response_cache.db"
+
+# Tokens added per message by the chat format on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# A sentence ends at ., ! or ? (optionally closed by a quote or bracket)
+# followed by whitespace, or at a line break.
+SENTENCE_END = re.compile(r"""(?<=[.!?])["')\]]*\s+|\n+""")
+
+# Opening of the system note that stands in for dropped conversation turns
+SUMMARY_PREFIX = "Earlier the user asked about: "
+
+# Words that point back at the conversation ("what about it", "why?"); a
+# prompt without any of them is answered the same whatever came before
+FOLLOW_UP_WORDS = frozenset({
+    "it", "its", "it's", "this", "that", "these", "those", "they", "them", "their", "he", "him",
+    "his", "she", "her", "there", "then", "also", "else", "more", "again", "above", "previous",
+    "earlier", "same", "another", "other", "former", "latter", "and", "or", "but", "so",
+})
+
+
+def complete(client, messages, model=DEFAULT_MODEL):
+    """Return the full completion text for messages."""
+    resp = client.chat.completions.create(model=model, messages=messages)
+    content = resp.choices[0].message.content
+    return content.strip() if content is not None else ""
+
+
+def stream_completion(client, messages, model=DEFAULT_MODEL):
+    """Yield completion text fragments as the API streams them."""
+    stream = client.chat.completions.create(model=model, messages=messages, stream=True)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and hands back each sentence once it is complete."""
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text):
+        """Add text and return the list of sentences it completed."""
+        self._pending += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._pending):
+            sentence = self._pending[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._pending = self._pending[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever text is left over once the stream has ended."""
+        rest, self._pending = self._pending.strip(), ""
+        return rest
+
+
+def is_follow_up(text):
+    """True if text likely depends on earlier turns; very short prompts count too."""
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    if len(words) < 3 or (words[1] == "about" and words[0] in ("what", "how")):
+        return True
+    return any(word in FOLLOW_UP_WORDS for word in words)
+
+
+def normalize_prompt(text):
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", text.lower()).strip().rstrip(" ?!.")
+
+
+class ResponseCache:
+    """
+    Persistent cache of GPT responses in SQLite.
+
+    Keys combine the normalized prompt, the model and a hash of the earlier
+    conversation messages, so the same follow-up in a different context is a
+    different entry. Prompts that do not refer back (see ``is_follow_up``)
+    are keyed on the system prompt alone, so a repeated question still hits
+    after unrelated exchanges. Entries expire after ``ttl`` seconds and the least
+    recently used ones are evicted beyond ``max_entries``.
+    """
+    def __init__(self, path=CACHE_FILE, max_entries=1000, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def key(self, messages, model=DEFAULT_MODEL):
+        """Cache key for a request: model, context hash and normalized prompt."""
+        *context, prompt = messages
+        if not is_follow_up(prompt["content"]):
+            context = [m for m in context if m["role"] == "system" and not m["content"].startswith(SUMMARY_PREFIX)]
+        context_hash = hashlib.sha256(json.dumps(context, sort_keys=True).encode()).hexdigest()
+        raw = json.dumps([model, context_hash, normalize_prompt(prompt["content"])])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        """Store response under key, evicting the least recently used entries over the cap."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when available, else roughly four characters per token."""
+    def __init__(self, model=DEFAULT_MODEL):
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def __call__(self, text):
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return max(1, (len(text) + 3) // 4)
+
+
+class ConversationMemory:
+    """
+    Bounded conversation history for the GPT fallback.
+
+    Turns live in a ring buffer of ``max_turns`` with their token counts
+    computed once when added. ``build`` assembles the newest turns that fit in
+    ``token_budget`` together with the new prompt; older turns are replaced by
+    a short note of what the user asked earlier, so request size stays
+    constant however long the session runs.
+    """
+    def __init__(self, token_budget=1500, max_turns=40, summary_tokens=80,
+                 system_prompt=None, model=DEFAULT_MODEL):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.system_prompt = system_prompt
+        self.count_tokens = TokenCounter(model)
+        self._turns = deque(maxlen=max_turns)  # (role, content, tokens)
+        self.total_tokens = 0
+
+    def __len__(self):
+        return len(self._turns)
+
+    def add(self, role, content):
+        """Record a turn, dropping the oldest one when the buffer is full."""
+        if len(self._turns) == self._turns.maxlen:
+            self.total_tokens -= self._turns[0][2]
+        tokens = self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        self._turns.append((role, content, tokens))
+        self.total_tokens += tokens
+
+    def clear(self):
+        self._turns.clear()
+        self.total_tokens = 0
+
+    def build(self, prompt):
+        """Return the message list for prompt, kept within the token budget."""
+        head = []
+        budget = self.token_budget - self.count_tokens(prompt) - MESSAGE_OVERHEAD_TOKENS
+        if self.system_prompt:
+            head.append({"role": "system", "content": self.system_prompt})
+            budget -= self.count_tokens(self.system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+        kept = []
+        if self.total_tokens <= budget:
+            kept = list(self._turns)
+            dropped = []
+        else:
+            budget -= self.summary_tokens
+            used = 0
+            index = len(self._turns)
+            for role, content, tokens in reversed(self._turns):
+                if used + tokens > budget:
+                    break
+                used += tokens
+                index -= 1
+            # Never start the kept history with an orphaned assistant reply
+            if index < len(self._turns) and self._turns[index][0] == "assistant":
+                index += 1
+            turns = list(self._turns)
+            dropped, kept = turns[:index], turns[index:]
+
+        summary = self._summarize(dropped)
+        if summary:
+            head.append({"role": "system", "content": summary})
+        return head + [{"role": role, "content": content} for role, content, _ in kept] + \
+            [{"role": "user", "content": prompt}]
+
+    def _summarize(self, turns):
+        """Short note of the user's earlier questions that fits in summary_tokens."""
+        questions = [content for role, content, _ in turns if role == "user"]
+        if not questions:
+            return ""
+        summary = SUMMARY_PREFIX
+        used = self.count_tokens(summary)
+        topics = []
+        for question in reversed(questions):
+            topic = question if len(question) <= 80 else question[:77] + "..."
+            cost = self.count_tokens(topic) + 1
+            if used + cost > self.summary_tokens:
+                break
+            topics.insert(0, topic)
+            used += cost
+        if not topics:
+            return ""
+        return summary + "; ".join(topics)
@@ -1,14 +1,19 @@
 import tkinter as tk
 import customtkinter as ctk
-import threading
+import queue
 import speech_recognition as sr
 from assistant import Assistant
+from camera import PreviewStream
+from pipeline import RequestPipeline
+from recorder import ClipRecorder
+from surveillance import SurveillanceMonitor
+from wakeword import WAKE_TEMPLATE_DIR, KeywordSpotter, WakeWordDetector
 import random
 import math
 import platform
 from PIL import Image, ImageTk
 import time
-import cv2
+import numpy as np
 
 # JARVIS Color Scheme
 JARVIS_COLORS = {
@@ -172,8 +177,9 @@ class RadarCanvas(tk.Canvas):
         self.after_id = self.after(30, self.scan)
 
 class SystemMonitor(ctk.CTkFrame):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, assistant=None, **kwargs):
         super().__init__(master, **kwargs)
+        self.assistant = assistant
         self.configure(fg_color=JARVIS_COLORS["medium_bg"], corner_radius=10)
         self.grid_columnconfigure(0, weight=1)
         
@@ -226,6 +232,15 @@ class SystemMonitor(ctk.CTkFrame):
             text_color=JARVIS_COLORS["text"]
         )
         self.net_label.grid(row=5, column=0, padx=10, pady=2, sticky="w")
+
+        self.cache_label = ctk.CTkLabel(
+            self, 
+            text="GPT Cache: Checking...",
+            font=("Segoe UI", 10),
+            text_color=JARVIS_COLORS["text"]
+        )
+        self.cache_label.grid(row=6, column=0, padx=10, pady=2, sticky="w")
+        self.update_cache_stats()
         
         # Start monitoring if psutil is available
         if PSUTIL_AVAILABLE:
@@ -237,6 +252,22 @@ class SystemMonitor(ctk.CTkFrame):
             self.disk_label.configure(text="Disk: Install psutil for monitoring")
             self.net_label.configure(text="Network: Install psutil for monitoring")
     
+    def update_cache_stats(self):
+        if self.assistant is None:
+            self.cache_label.configure(text="GPT Cache: Unavailable")
+            return
+        try:
+            stats = self.assistant.response_cache.stats()
+            self.cache_label.configure(
+                text=f"GPT Cache: {stats['hits']} hits / {stats['misses']} misses "
+                     f"({stats['hit_rate']:.0%}, {stats['entries']} entries)"
+            )
+        except Exception as e:
+            print(f"Cache monitoring error: {e}")
+
+        # Update every 2 seconds
+        self.after(2000, self.update_cache_stats)
+
     def update_monitor(self):
         if not PSUTIL_AVAILABLE:
             return
@@ -270,48 +301,76 @@ class SystemMonitor(ctk.CTkFrame):
         self.after(2000, self.update_monitor)
 
 class SurveillanceViewer(ctk.CTkFrame):
-    def __init__(self, master, assistant, **kwargs):
+    def __init__(self, master, assistant, on_event=None, recorder=None, fps=15, size=(320, 240), **kwargs):
         super().__init__(master, **kwargs)
         self.configure(fg_color=JARVIS_COLORS["dark_bg"])
         self.assistant = assistant
         self.active = False
+        self.fps = fps
         self.camera_label = ctk.CTkLabel(self, text="")
         self.camera_label.pack(padx=10, pady=10)
+        # Frames are resized and converted on a worker; the Tk side only
+        # copies the newest one into this buffer and pastes it
+        self.preview = PreviewStream(assistant.camera, size, fps)
+        self._display = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._shown_id = None
+        self._camera_img = None
+        self.frames_shown = 0
+        self.ticks_skipped = 0  # display ticks with no newer frame
+        self.on_event = on_event
+        # Footage around motion and sightings is saved when a recorder is given
+        self.recorder = recorder
+        # Motion-gated recognition; events arrive on the monitor thread
+        self.monitor = SurveillanceMonitor(assistant.camera, assistant.face_recognition.store,
+                                           self._handle_event)
+        
+    def _handle_event(self, event):
+        if self.recorder is not None and event.kind in ("motion_start", "person_seen"):
+            self.recorder.trigger(event.kind)
+        if self.on_event is not None:
+            self.on_event(event)
         
     def start_surveillance(self):
-        self.active = True
-        self.update_camera()
+        if not self.active:
+            self.active = True
+            self.assistant.camera.acquire()
+            if self.recorder is not None:
+                self.recorder.start()
+            self.monitor.start()
+            self.preview.start()
+            self.update_camera()
         
     def stop_surveillance(self):
-        self.active = False
+        if self.active:
+            self.active = False
+            self.preview.stop()
+            self.monitor.stop()
+            if self.recorder is not None:
+                self.recorder.stop()
+            self.assistant.camera.release()
         
     def update_camera(self):
         if not self.active:
             return
             
-        # Capture camera frame
-        cap = cv2.VideoCapture(0)
-        ret, frame = cap.read()
-        cap.release()
-        
-        if ret:
-            # Convert to PIL format
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Newest display-ready frame; nothing to do if it was already shown
+        frame_id, frame = self.preview.latest(after=self._shown_id, out=self._display)
+        
+        if frame is not None:
+            self._shown_id = frame_id
+            self.frames_shown += 1
             pil_img = Image.fromarray(frame)
-            
-            # Resize for display
-            width, height = 320, 240
-            pil_img = pil_img.resize((width, height), Image.Resampling.LANCZOS)
-            
-            # Convert to Tkinter format
-            tk_img = ImageTk.PhotoImage(image=pil_img)
-            
-            # Update label
-            self.camera_label.configure(image=tk_img)
-            self._camera_img = tk_img  # Keep a reference to avoid garbage collection
+            if self._camera_img is None:
+                self._camera_img = ImageTk.PhotoImage(image=pil_img)  # Keep a reference to avoid garbage collection
+                self.camera_label.configure(image=self._camera_img)
+            else:
+                # Reuse the Tk image instead of building a new one per frame
+                self._camera_img.paste(pil_img)
+        else:
+            self.ticks_skipped += 1
             
         # Schedule next update
-        self.after(1000, self.update_camera)
+        self.after(max(1, int(1000 / self.fps)), self.update_camera)
 
 class ChatGUI(ctk.CTk):
     def __init__(self, settings):
@@ -339,6 +398,7 @@ class ChatGUI(ctk.CTk):
         # Voice visualization
         self.voice_visualization = []
         self.listening = False
+        self._showing_partial = False
         
         # Security alert state
         self.security_alert_active = False
@@ -346,6 +406,22 @@ class ChatGUI(ctk.CTk):
         # Surveillance system
         self.surveillance_mode = False
         self.surveillance_viewer = None
+
+        # Request pipeline: one event loop thread owns the assistant work and
+        # reports GUI updates through a queue drained on the Tk thread
+        self._ui_events = queue.Queue()
+        self.pipeline = RequestPipeline(
+            self.assistant,
+            lambda *event: self._ui_events.put(event),
+            stream=self.settings.get("stream_responses", True)
+        )
+        self.pipeline.start()
+        self._drain_ui_events()
+
+        # Hands-free activation by saying "Jarvis"
+        self.wake_detector = None
+        if self.settings.get("wake_word", False):
+            self._start_wake_word()
         
         # Build UI
         self._build_title_bar()
@@ -423,11 +499,17 @@ class ChatGUI(ctk.CTk):
         self.radar.pack(pady=10)
         
         # System monitor
-        self.sys_monitor = SystemMonitor(left_frame)
+        self.sys_monitor = SystemMonitor(left_frame, assistant=self.assistant)
         self.sys_monitor.pack(fill="both", expand=True)
         
         # Add surveillance panel
-        self.surveillance_viewer = SurveillanceViewer(left_frame, self.assistant)
+        recorder = None
+        if self.settings.get("record_clips", True):
+            recorder = ClipRecorder(self.assistant.camera, self.settings.get("clip_dir", "surveillance_clips"),
+                                    max_bytes=self.settings.get("clip_max_mb", 500) * 1024 * 1024)
+        self.surveillance_viewer = SurveillanceViewer(
+            left_frame, self.assistant, on_event=lambda event: self._ui_events.put(("surveillance", event)),
+            recorder=recorder, fps=self.settings.get("surveillance_fps", 15))
         self.surveillance_viewer.pack(fill="both", expand=True, pady=10)
         
         # Right panel - Chat interface
@@ -700,7 +782,7 @@ class ChatGUI(ctk.CTk):
             return
         self.entry.delete(0,"end")
         self._append(f"You: {msg}\n", "user")
-        threading.Thread(target=self._get_response, args=(msg,)).start()
+        self.pipeline.submit_text(msg)
     
     def on_voice(self):
         if not self.assistant.mic_enabled:
@@ -710,7 +792,7 @@ class ChatGUI(ctk.CTk):
         # Start visualization animation
         self.listening = True
         self._animate_voice()
-        threading.Thread(target=self._voice_thread).start()
+        self.pipeline.submit_listen()
     
     def _animate_voice(self):
         if not self.listening:
@@ -724,27 +806,68 @@ class ChatGUI(ctk.CTk):
         # Continue animation
         self.after(100, self._animate_voice)
     
-    def _voice_thread(self):
-        # Change button to indicate recording
-        self.voice_icon.configure(text="●", fg="#ff0000")
-        
-        # Get voice input
-        text = self.assistant.listen()
-        
-        # Reset button
-        self.voice_icon.configure(text="●", fg=JARVIS_COLORS["accent"])
-        self.listening = False
-        
-        if text:
-            self.on_send(text)
+    def _start_wake_word(self):
+        spotter = KeywordSpotter(self.settings.get("wake_templates", WAKE_TEMPLATE_DIR))
+        if not spotter:
+            print("Wake word disabled: no keyword recordings found.")
+            return
+        self.wake_detector = WakeWordDetector(
+            spotter,
+            self.pipeline.submit_listen,
+            cpu_budget=self.settings.get("wake_cpu_budget", 0.05)
+        )
+        self.assistant.microphone.on_utterance = self.wake_detector
+
+    def _set_voice_state(self, recording):
+        if recording:
+            # Change button to indicate recording
+            self.voice_icon.configure(text="●", fg="#ff0000")
         else:
-            self._append("Could not understand audio.\n", "system")
-    
-    def _get_response(self, message):
-        resp = self.assistant.process_input(message)
-        self._append(f"J.A.R.V.I.S.: {resp}\n\n", "jarvis")
-        # Speak the response
-        threading.Thread(target=self.assistant.speak, args=(resp,)).start()
+            # Reset button
+            self.voice_icon.configure(text="●", fg=JARVIS_COLORS["accent"])
+            self.listening = False
+            if self._showing_partial:
+                self.entry.delete(0, "end")
+                self._showing_partial = False
+
+    def _show_partial(self, text):
+        """Show the transcript so far in the entry box while the user speaks."""
+        self.entry.delete(0, "end")
+        self.entry.insert(0, text)
+        self._showing_partial = True
+
+    def _show_surveillance_event(self, event):
+        stamp = time.strftime("%H:%M:%S", time.localtime(event.time))
+        if event.kind == "motion_start":
+            text = "Motion detected"
+        elif event.kind == "motion_stop":
+            text = f"Motion ended after {event.duration:.0f} s"
+        elif event.name is not None:
+            text = f"{event.name} seen ({event.confidence:.0%})"
+        else:
+            text = "Unknown person seen"
+        self._append(f"[{stamp}] Surveillance: {text}\n", "system")
+
+    def _drain_ui_events(self):
+        """Apply GUI updates reported by the pipeline, in order, on the Tk thread."""
+        handlers = {
+            "append": self._append,
+            "voice_state": self._set_voice_state,
+            "partial": self._show_partial,
+            "surveillance": self._show_surveillance_event,
+        }
+        try:
+            while True:
+                event, *args = self._ui_events.get_nowait()
+                handlers[event](*args)
+        except queue.Empty:
+            pass
+        self.after(30, self._drain_ui_events)
+
+    def destroy(self):
+        self.pipeline.stop()
+        self.assistant.speech.stop()
+        super().destroy()
     
     def _append(self, text, tag=None):
         self.chatbox.configure(state="normal")
@@ -757,26 +880,26 @@ class ChatGUI(ctk.CTk):
     
     # Music control methods
     def play_music(self):
-        threading.Thread(target=self._execute_command, args=("play_music:",)).start()
+        self.pipeline.submit_intent("play_music")
         
     def pause_music(self):
-        threading.Thread(target=self._execute_command, args=("pause_music",)).start()
+        self.pipeline.submit_intent("pause_music")
         
     def stop_music(self):
-        threading.Thread(target=self._execute_command, args=("stop_music",)).start()
+        self.pipeline.submit_intent("stop_music")
         
     def next_track(self):
-        threading.Thread(target=self._execute_command, args=("next_track",)).start()
+        self.pipeline.submit_intent("next_track")
         
     def previous_track(self):
-        threading.Thread(target=self._execute_command, args=("previous_track",)).start()
+        self.pipeline.submit_intent("previous_track")
         
     # Security control methods
     def activate_security(self):
-        threading.Thread(target=self._execute_command, args=("activate_security_mode",)).start()
+        self.pipeline.submit_intent("activate_security_mode")
         
     def deactivate_security(self):
-        threading.Thread(target=self._execute_command, args=("deactivate_security_mode",)).start()
+        self.pipeline.submit_intent("deactivate_security_mode")
         
     def toggle_surveillance(self):
         if not self.surveillance_mode:
@@ -788,11 +911,6 @@ class ChatGUI(ctk.CTk):
             self.surveillance_viewer.stop_surveillance() # type: ignore
             self._append("Surveillance mode deactivated, sir.\n", "system")
         
-    def _execute_command(self, command):
-        resp = self.assistant.process_input(command)
-        self._append(f"J.A.R.V.I.S.: {resp}\n\n", "jarvis")
-        self.assistant.speak(resp)
-    
     # System commands
     def show_system_info(self):
         uname = platform.uname()
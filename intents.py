@@ -0,0 +1,226 @@
+# intents.py
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+# Words are the unit of matching, so "time" never fires inside "sometimes"
+# and "car" never fires inside "card".
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text):
+    """Split lowercased text into (token, start, end) tuples."""
+    return [(m.group(0), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text.lower())]
+
+
+@dataclass
+class Intent:
+    """A recognized command: intent name, parsed slots and the matched span."""
+    name: str
+    slots: dict = field(default_factory=dict)
+    text: str = ""
+    start: int = 0
+    end: int = 0
+
+    @property
+    def tail(self) -> str:
+        """Lowercased input following the trigger phrase."""
+        return self.text.lower()[self.end:].strip().lstrip(":_,").strip()
+
+
+@dataclass
+class _Rule:
+    name: str
+    groups: tuple
+    order: int
+    priority: int = 0
+    anchored: bool = False
+    guard: Optional[Callable] = None
+    slots: Optional[Callable] = None
+
+
+class IntentRouter:
+    """
+    Compiled multi-phrase matcher for command triggers.
+
+    Every trigger phrase is registered into one Aho-Corasick automaton over
+    word tokens, so matching is a single pass over the utterance regardless of
+    how many phrases are registered. A rule is a list of phrase groups; it
+    matches when each group has at least one phrase present. Conflicts are
+    resolved by explicit priority, then by the number of matched words (more
+    specific wins), then by registration order.
+    """
+    def __init__(self):
+        self._phrases = {}       # phrase tuple -> phrase id
+        self._phrase_len = []    # phrase id -> token count
+        self._phrase_rules = []  # phrase id -> [(rule index, group index)]
+        self._rules = []
+        self._compiled = False
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def add(self, name, *groups, priority=0, anchored=False, guard=None, slots=None):
+        """
+        Register a rule. Each positional argument is a phrase or a list of
+        alternative phrases; all groups must match. ``anchored`` requires the
+        first group to start the utterance, ``guard(text)`` is an extra
+        predicate and ``slots(intent)`` returns the parsed slot dict.
+        """
+        if not groups:
+            raise ValueError(f"Rule '{name}' needs at least one trigger phrase")
+        rule_index = len(self._rules)
+        group_ids = []
+        for group_index, group in enumerate(groups):
+            alternatives = [group] if isinstance(group, str) else list(group)
+            ids = []
+            for phrase in alternatives:
+                pid = self._phrase_id(phrase)
+                self._phrase_rules[pid].append((rule_index, group_index))
+                ids.append(pid)
+            group_ids.append(tuple(ids))
+        self._rules.append(_Rule(name, tuple(group_ids), rule_index, priority,
+                                 anchored, guard, slots))
+        self._compiled = False
+
+    def _phrase_id(self, phrase):
+        key = tuple(token for token, _, _ in tokenize(phrase))
+        if not key:
+            raise ValueError(f"Trigger phrase '{phrase}' contains no words")
+        if key not in self._phrases:
+            self._phrases[key] = len(self._phrase_len)
+            self._phrase_len.append(len(key))
+            self._phrase_rules.append([])
+        return self._phrases[key]
+
+    def compile(self):
+        """Build the goto/failure/output tables of the automaton."""
+        goto = [{}]
+        output = [[]]
+        for phrase, pid in self._phrases.items():
+            state = 0
+            for token in phrase:
+                nxt = goto[state].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][token] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pid)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(token, 0)
+                output[nxt] = output[nxt] + output[fail[nxt]]
+
+        self._goto, self._fail, self._output = goto, fail, output
+        self._compiled = True
+
+    def _scan(self, tokens):
+        """Return {phrase id: (first token index, last token index)} for the first hit of each phrase."""
+        if not self._compiled:
+            self.compile()
+        goto, fail, output = self._goto, self._fail, self._output
+        hits = {}
+        state = 0
+        for i, (token, _, _) in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for pid in output[state]:
+                if pid not in hits:
+                    hits[pid] = (i - self._phrase_len[pid] + 1, i)
+        return hits
+
+    def match(self, text) -> Optional[Intent]:
+        """Return the best matching Intent for text, or None."""
+        if not text:
+            return None
+        tokens = tokenize(text)
+        hits = self._scan(tokens)
+        if not hits:
+            return None
+
+        satisfied = {}
+        for pid in hits:
+            for rule_index, group_index in self._phrase_rules[pid]:
+                groups = satisfied.setdefault(rule_index, {})
+                best = groups.get(group_index)
+                if best is None or self._phrase_len[pid] > self._phrase_len[best]:
+                    groups[group_index] = pid
+
+        best_key = None
+        best_intent = None
+        for rule_index, groups in satisfied.items():
+            rule = self._rules[rule_index]
+            if len(groups) != len(rule.groups):
+                continue
+            first, last = hits[groups[0]]
+            if rule.anchored and first != 0:
+                continue
+            if rule.guard is not None and not rule.guard(text):
+                continue
+            specificity = sum(self._phrase_len[pid] for pid in groups.values())
+            key = (rule.priority, specificity, -rule.order)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_intent = (rule, tokens[first][1], tokens[last][2])
+
+        if best_intent is None:
+            return None
+        rule, start, end = best_intent
+        intent = Intent(rule.name, text=text, start=start, end=end)
+        if rule.slots is not None:
+            intent.slots = rule.slots(intent) or {}
+        return intent
+
+
+class IntentRegistry:
+    """
+    Maps intent names to handler callables.
+
+    Handlers register themselves with the ``handles`` decorator and are called
+    with the intent's slots as keyword arguments, so dispatch is a single dict
+    lookup. Call counts and cumulative handling time are kept per intent.
+    """
+    def __init__(self):
+        self._handlers = {}
+        self.stats = {}
+
+    def __contains__(self, name):
+        return name in self._handlers
+
+    def register(self, name, handler):
+        """Register handler for the intent name."""
+        if name in self._handlers:
+            raise ValueError(f"Intent '{name}' already has a handler")
+        self._handlers[name] = handler
+
+    def handles(self, *names):
+        """Decorator registering the wrapped callable for the given intent names."""
+        def decorator(handler):
+            for name in names:
+                self.register(name, handler)
+            return handler
+        return decorator
+
+    def dispatch(self, intent, *args):
+        """Call the handler for intent with ``args`` followed by its slots."""
+        handler = self._handlers[intent.name]
+        start = time.perf_counter()
+        try:
+            return handler(*args, **intent.slots)
+        finally:
+            stats = self.stats.setdefault(intent.name, {"calls": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - start
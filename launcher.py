@@ -0,0 +1,283 @@
+# launcher.py
+import os
+import platform
+import shutil
+import subprocess
+import time
+
+from app_index import AppIndex, is_blocked, normalize
+
+# Handle psutil import
+try:
+    import psutil # type: ignore
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Dictionary of common applications with their platform-specific argv lists.
+# "process" lists the process names used to report the app as running, since
+# "start" and "open -a" hand the launch off to another process. Names shared
+# with other programs (cmd, electron, soffice.bin) are left out.
+APP_COMMANDS = {
+    "chrome": {
+        "Windows": ["cmd", "/c", "start", "", "chrome"],
+        "Darwin": ["open", "-a", "Google Chrome"],
+        "Linux": ["google-chrome"],
+        "process": ["chrome", "google chrome", "google-chrome"]
+    },
+    "firefox": {
+        "Windows": ["cmd", "/c", "start", "", "firefox"],
+        "Darwin": ["open", "-a", "Firefox"],
+        "Linux": ["firefox"],
+        "process": ["firefox"]
+    },
+    "word": {
+        "Windows": ["cmd", "/c", "start", "", "winword"],
+        "Darwin": ["open", "-a", "Microsoft Word"],
+        "Linux": ["libreoffice", "--writer"],
+        "process": ["winword", "microsoft word"]
+    },
+    "excel": {
+        "Windows": ["cmd", "/c", "start", "", "excel"],
+        "Darwin": ["open", "-a", "Microsoft Excel"],
+        "Linux": ["libreoffice", "--calc"],
+        "process": ["excel", "microsoft excel"]
+    },
+    "powerpoint": {
+        "Windows": ["cmd", "/c", "start", "", "powerpnt"],
+        "Darwin": ["open", "-a", "Microsoft PowerPoint"],
+        "Linux": ["libreoffice", "--impress"],
+        "process": ["powerpnt", "microsoft powerpoint"]
+    },
+    "outlook": {
+        "Windows": ["cmd", "/c", "start", "", "outlook"],
+        "Darwin": ["open", "-a", "Microsoft Outlook"],
+        "Linux": ["thunderbird"],
+        "process": ["outlook", "microsoft outlook", "thunderbird"]
+    },
+    "spotify": {
+        "Windows": ["cmd", "/c", "start", "", "spotify"],
+        "Darwin": ["open", "-a", "Spotify"],
+        "Linux": ["spotify"],
+        "process": ["spotify"]
+    },
+    "vscode": {
+        "Windows": ["code"],
+        "Darwin": ["open", "-a", "Visual Studio Code"],
+        "Linux": ["code"],
+        "process": ["code"]
+    },
+    "terminal": {
+        "Windows": ["cmd", "/c", "start", "cmd"],
+        "Darwin": ["open", "-a", "Terminal"],
+        "Linux": ["gnome-terminal"],
+        "process": ["terminal", "gnome-terminal-server"]
+    },
+    "notepad": {
+        "Windows": ["notepad"],
+        "process": ["notepad"]
+    },
+    "calculator": {
+        "Windows": ["calc"],
+        "Darwin": ["open", "-a", "Calculator"],
+        "process": ["calc", "calculator", "calculatorapp"]
+    },
+    "camera": {
+        "Windows": ["cmd", "/c", "start", "", "microsoft.windows.camera:"],
+        "Darwin": ["open", "/System/Applications/Photo Booth.app"],
+        "Linux": ["cheese"],
+        "process": ["windowscamera", "photo booth", "cheese"]
+    }
+}
+
+
+def _process_name(name):
+    """Normalize a process name for comparison ("Chrome.exe" -> "chrome")."""
+    name = name.lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessTable:
+    """
+    Cached pid -> process name table.
+
+    Each refresh only looks up names for pids that appeared since the last
+    refresh and drops pids that went away, and refreshes are rate limited, so
+    repeated "list running apps" queries stay cheap.
+    """
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._names = {}
+        self._last_refresh = 0.0
+
+    def refresh(self, force=False):
+        if not PSUTIL_AVAILABLE:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.min_interval:
+            return
+        pids = set(psutil.pids())
+        for pid in set(self._names) - pids:
+            del self._names[pid]
+        for pid in pids - set(self._names):
+            try:
+                self._names[pid] = _process_name(psutil.Process(pid).name())
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        self._last_refresh = now
+
+    def find(self, names):
+        """Return pids whose process name is one of names."""
+        self.refresh()
+        wanted = {_process_name(name) for name in names}
+        return [pid for pid, name in self._names.items() if name in wanted]
+
+    def forget(self, pid):
+        self._names.pop(pid, None)
+
+
+class AppLauncher:
+    """
+    Launches applications without a shell and keeps track of what it started.
+
+    Fuzzy matches from the application index scoring below ``confirm_score``
+    are not started; the user is asked to repeat the exact name instead.
+    """
+    def __init__(self, app_commands=None, app_index=None, confirm_score=0.85):
+        self.app_commands = APP_COMMANDS if app_commands is None else app_commands
+        self.app_index = AppIndex() if app_index is None else app_index
+        self.confirm_score = confirm_score
+        self._aliases = {normalize(name): name for name in self.app_commands}
+        self.system = platform.system()
+        self.process_table = ProcessTable()
+        self._launched = {}  # app name -> [subprocess.Popen]
+
+    def resolve(self, app_name):
+        """Return the argv list used to start app_name on this platform, or None."""
+        argv, _ = self._resolve(app_name)
+        return argv
+
+    def _resolve(self, app_name):
+        """(argv or None, name to suggest when a fuzzy match needs confirmation)."""
+        app_name = self._aliases.get(normalize(app_name), app_name)
+        if app_name in self.app_commands:
+            argv = self.app_commands[app_name].get(self.system)
+            return (list(argv) if argv else None), None
+
+        # Installed applications, matched fuzzily against misheard names
+        match = self.app_index.match(app_name)
+        if match:
+            if match.score >= self.confirm_score:
+                return match.argv, None
+            return None, match.name
+
+        if is_blocked(app_name):
+            return None, None
+        return self._fallback(app_name), None
+
+    def _fallback(self, app_name):
+        """Treat the name as an application on this system."""
+        if self.system == "Windows":
+            path = shutil.which(app_name) or shutil.which(app_name.replace(" ", ""))
+            return [path] if path else None
+        if self.system == "Darwin":
+            return ["open", "-a", app_name]
+        for candidate in (app_name, app_name.replace(" ", "-"), app_name.replace(" ", "")):
+            path = shutil.which(candidate)
+            if path:
+                return [path]
+        return None
+
+    def spawn(self, argv):
+        """Start argv detached from the assistant and return the Popen handle."""
+        kwargs = {
+            "stdin": subprocess.DEVNULL,
+            "stdout": subprocess.DEVNULL,
+            "stderr": subprocess.DEVNULL,
+            "close_fds": True,
+        }
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        return subprocess.Popen(argv, **kwargs)
+
+    def launch(self, app_name):
+        """Start app_name and return immediately with a spoken response."""
+        app_name = self._aliases.get(normalize(app_name), app_name)
+        argv, suggestion = self._resolve(app_name)
+        if argv is None:
+            if app_name in self.app_commands:
+                return f"Sorry sir, {app_name} is not supported on this platform."
+            if suggestion:
+                return f"Did you mean {suggestion}, sir? Say 'open {suggestion}' to start it."
+            if self.system == "Windows" and not is_blocked(app_name):
+                return self._start_registered(app_name)
+            return f"I couldn't find an application called {app_name}, sir."
+        try:
+            proc = self.spawn(argv)
+        except OSError as e:
+            return f"Failed to open {app_name}: {str(e)}"
+        self._launched.setdefault(app_name, []).append(proc)
+        return f"Opening {app_name}, sir."
+
+    def _start_registered(self, app_name):
+        """Open a Windows app registered under App Paths (not on PATH), without a shell."""
+        try:
+            os.startfile(app_name)
+        except OSError:
+            return f"I couldn't find an application called {app_name}, sir."
+        return f"Opening {app_name}, sir."
+
+    def _prune(self):
+        """Drop handles of launched processes that have exited."""
+        for app_name in list(self._launched):
+            alive = [proc for proc in self._launched[app_name] if proc.poll() is None]
+            if alive:
+                self._launched[app_name] = alive
+            else:
+                del self._launched[app_name]
+
+    def _process_names(self, app_name):
+        names = list(self.app_commands.get(app_name, {}).get("process", []))
+        return names or [app_name]
+
+    def running(self):
+        """Return {app name: [pid, ...]} for known or launched apps that are running."""
+        self._prune()
+        running = {name: [proc.pid for proc in procs] for name, procs in self._launched.items()}
+        if PSUTIL_AVAILABLE:
+            for app_name in self.app_commands:
+                pids = self.process_table.find(self._process_names(app_name))
+                if pids:
+                    running.setdefault(app_name, [])
+                    running[app_name].extend(pid for pid in pids if pid not in running[app_name])
+        return running
+
+    def close(self, app_name):
+        """
+        Terminate the instances of app_name started by this launcher, with
+        their child processes. Processes started some other way are left
+        alone, however their names match.
+        """
+        app_name = self._aliases.get(normalize(app_name), app_name)
+        self._prune()
+        closed = 0
+        for proc in self._launched.pop(app_name, []):
+            children = []
+            if PSUTIL_AVAILABLE:
+                try:
+                    children = psutil.Process(proc.pid).children(recursive=True)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            proc.terminate()
+            for child in children:
+                try:
+                    child.terminate()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            closed += 1
+
+        if closed:
+            return f"Closed {app_name}, sir."
+        if PSUTIL_AVAILABLE and self.process_table.find(self._process_names(app_name)):
+            return f"{app_name} was not opened by me, sir, so I'll leave it running."
+        return f"{app_name} is not running, sir."
@@ -0,0 +1,279 @@
+# microphone.py
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+# Handle webrtcvad import
+try:
+    import webrtcvad  # type: ignore
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+
+
+def frame_energy(frame):
+    """RMS energy of a 16-bit PCM frame."""
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+class Endpointer:
+    """
+    Cuts utterances out of a stream of PCM frames.
+
+    Frames count as speech when their energy clears the ambient noise level by
+    ``threshold_ratio`` (and webrtcvad agrees, when installed). The noise
+    level is an exponential average over non-speech frames, so it keeps
+    tracking the room between commands. An utterance starts after
+    ``start_ms`` of speech, keeps ``pre_roll_ms`` of audio from before that
+    and ends after ``end_silence_ms`` of silence or at ``max_phrase`` seconds.
+    """
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=30, threshold_ratio=2.5,
+                 min_energy=150.0, noise_alpha=0.05, start_ms=90, end_silence_ms=600,
+                 pre_roll_ms=300, calibration_ms=500, vad_mode=2):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * SAMPLE_WIDTH
+        self.threshold_ratio = threshold_ratio
+        self.min_energy = min_energy
+        self.noise_alpha = noise_alpha
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.noise = None
+        self.frames_seen = 0
+        self.calibrated = threading.Event()
+        self._ring = deque(maxlen=max(1, pre_roll_ms // frame_ms) + self.start_frames)
+        self._vad = webrtcvad.Vad(vad_mode) if WEBRTCVAD_AVAILABLE else None
+        self.reset()
+
+    @property
+    def threshold(self):
+        return max(self.min_energy, (self.noise or 0.0) * self.threshold_ratio)
+
+    @property
+    def in_utterance(self):
+        return self._utterance is not None
+
+    def utterance_frames(self):
+        """Frames of the utterance in progress (empty when there is none)."""
+        return self._utterance or []
+
+    def reset(self):
+        """Forget any partial utterance; the noise estimate is kept."""
+        self._voiced = 0
+        self._silent = 0
+        self._utterance = None
+
+    def is_speech(self, frame, energy):
+        if energy < self.threshold:
+            return False
+        if self._vad is not None and len(frame) == self.frame_bytes:
+            return self._vad.is_speech(frame, self.sample_rate)
+        return True
+
+    def feed(self, frame, max_phrase=None):
+        """
+        Process one frame. Returns the utterance bytes once one has ended,
+        otherwise None.
+        """
+        energy = frame_energy(frame)
+        self.frames_seen += 1
+        if not self.calibrated.is_set():
+            # Seed the noise estimate from the first frames after opening
+            self.noise = energy if self.noise is None else (self.noise + energy) / 2
+            if self.frames_seen >= self.calibration_frames:
+                self.calibrated.set()
+            self._ring.append(frame)
+            return None
+
+        speech = self.is_speech(frame, energy)
+        if not speech and self._utterance is None:
+            self.noise += self.noise_alpha * (energy - self.noise)
+
+        if self._utterance is None:
+            self._ring.append(frame)
+            self._voiced = self._voiced + 1 if speech else 0
+            if self._voiced >= self.start_frames:
+                self._utterance = list(self._ring)
+                self._silent = 0
+            return None
+
+        self._utterance.append(frame)
+        self._silent = 0 if speech else self._silent + 1
+        too_long = max_phrase is not None and \
+            len(self._utterance) * self.frame_ms >= max_phrase * 1000
+        if self._silent >= self.end_frames or too_long:
+            # Trim the trailing silence, keeping a little for the recognizer
+            keep = len(self._utterance) - max(0, self._silent - self.start_frames)
+            audio = b"".join(self._utterance[:keep])
+            self._ring.clear()
+            self.reset()
+            return audio
+        return None
+
+
+class _CaptureRequest:
+    def __init__(self, max_phrase, chunks=None):
+        self.max_phrase = max_phrase
+        self.chunks = chunks  # queue receiving frames as they arrive, when streaming
+        self.sent = 0
+        self.done = threading.Event()
+        self.audio = None
+
+
+class MicrophoneStream:
+    """
+    Keeps the microphone open on a background thread.
+
+    Frames are read continuously into the endpointer, which keeps the noise
+    estimate current, so ``capture`` returns as soon as the speaker stops
+    instead of reopening the device and recalibrating for every command.
+    Between captures, utterances are handed to ``on_utterance(pcm)`` if set
+    (the wake-word detector), otherwise discarded. ``listening`` is set
+    while ``capture`` or ``stream`` is armed and waiting for an utterance.
+    ``source_factory`` can replace the sr.Microphone device, e.g. with
+    recorded audio.
+    """
+    def __init__(self, endpointer=None, device_index=None, on_utterance=None,
+                 max_background_phrase=6, source_factory=None):
+        self.endpointer = endpointer or Endpointer()
+        self.device_index = device_index
+        self.source_factory = source_factory or self._open_microphone
+        self.on_utterance = on_utterance
+        self.max_background_phrase = max_background_phrase
+        self._lock = threading.Lock()
+        self._request = None  # _CaptureRequest while capture() or stream() waits
+        self.listening = threading.Event()
+        self._running = False
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        self._running = True
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="jarvis-mic", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def capture(self, start_timeout=10, max_phrase=5):
+        """
+        Wait for the next utterance and return it as sr.AudioData, or None if
+        nobody spoke within start_timeout seconds or the microphone failed.
+        """
+        request = self._begin(_CaptureRequest(max_phrase))
+        if request is None:
+            return None
+        try:
+            if not request.done.wait(start_timeout):
+                with self._lock:
+                    speaking = self.endpointer.in_utterance
+                if speaking:
+                    # The phrase began before the deadline; let it finish
+                    request.done.wait(max_phrase + 1)
+        finally:
+            self._end()
+        if request.audio is None:
+            return None
+        return sr.AudioData(request.audio, self.endpointer.sample_rate, SAMPLE_WIDTH)
+
+    def stream(self, start_timeout=10, max_phrase=5):
+        """
+        Yield the PCM frames of the next utterance while it is being spoken,
+        starting with the pre-roll. Ends when the endpointer closes the
+        utterance; yields nothing if nobody spoke within start_timeout.
+        """
+        request = self._begin(_CaptureRequest(max_phrase, queue.Queue()))
+        if request is None:
+            return
+        try:
+            timeout = start_timeout
+            while True:
+                try:
+                    frame = request.chunks.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if frame is None:
+                    return
+                yield frame
+                timeout = max_phrase + 1
+        finally:
+            self._end()
+
+    def _begin(self, request):
+        if not self.is_running():
+            self.start()
+        if not self.endpointer.calibrated.wait(2) and not self.is_running():
+            return None
+        with self._lock:
+            self.endpointer.reset()
+            self._request = request
+            self.listening.set()
+        return request
+
+    def _end(self):
+        with self._lock:
+            self._request = None
+            self.listening.clear()
+            self.endpointer.reset()
+
+    def _deliver(self, request, audio):
+        """Forward new utterance frames and the finished utterance (mic thread, lock held)."""
+        if request.chunks is not None:
+            frames = self.endpointer.utterance_frames()
+            for frame in frames[request.sent:]:
+                request.chunks.put(frame)
+            request.sent = len(frames)
+        if audio is not None:
+            request.audio = audio
+            request.done.set()
+            if request.chunks is not None:
+                request.chunks.put(None)
+
+    def _open_microphone(self):
+        return sr.Microphone(device_index=self.device_index,
+                             sample_rate=self.endpointer.sample_rate,
+                             chunk_size=self.endpointer.frame_bytes // SAMPLE_WIDTH)
+
+    def _run(self):
+        frames = self.endpointer.frame_bytes // SAMPLE_WIDTH
+        try:
+            with self.source_factory() as source:
+                while self._running:
+                    frame = source.stream.read(frames)
+                    listener = self.on_utterance
+                    with self._lock:
+                        request = self._request
+                        if request is None and listener is None:
+                            # Only the noise estimate matters between commands
+                            self.endpointer.feed(frame)
+                            self.endpointer.reset()
+                            continue
+                        limit = request.max_phrase if request else self.max_background_phrase
+                        audio = self.endpointer.feed(frame, limit)
+                        if request is not None:
+                            self._deliver(request, audio)
+                            continue
+                    if audio is not None:
+                        listener(audio)
+        except Exception as e:
+            self.error = e
+            print(f"Microphone error: {e}")
+            with self._lock:
+                if self._request is not None:
+                    self._request.done.set()
+                    if self._request.chunks is not None:
+                        self._request.chunks.put(None)
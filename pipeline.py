@@ -0,0 +1,218 @@
+# pipeline.py
+import asyncio
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from gpt import SentenceSplitter
+from intents import Intent
+
+
+@dataclass
+class Request:
+    """A unit of work for the pipeline: typed text, a button intent or a voice capture."""
+    kind: str
+    payload: object = None
+    key: str = None
+    seq: int = 0
+    cancelled: bool = field(default=False, compare=False)
+
+    def describe(self):
+        if self.kind == "text":
+            return f'"{self.payload}"'
+        if self.kind == "intent":
+            return self.payload.name.replace("_", " ")
+        return "voice command"
+
+
+class RequestPipeline:
+    """
+    Runs the assistant on one asyncio event loop thread.
+
+    Requests wait in a bounded queue and are handled one at a time in
+    submission order, so responses reach the GUI in the order they were asked.
+    Blocking work runs in per-stage single-thread executors: listening,
+    processing and speaking. Speech for one response therefore overlaps
+    processing of the next. A new request with the same ``key`` supersedes
+    queued and in-flight requests with that key; intents are keyed by their
+    name, so a second "next track" replaces the first but "pause" does not
+    cancel "play". Typed and spoken text has no key, so one message never
+    cancels another. When the queue is full the oldest pending request is
+    dropped; the user is told about dropped requests and cancelled text.
+
+    GUI updates are reported through ``emit(event, *args)`` from worker
+    threads; the GUI is expected to hand them to its own thread.
+    """
+    def __init__(self, assistant, emit, max_pending=16, stream=True):
+        self.assistant = assistant
+        self.emit = emit
+        self.max_pending = max_pending
+        self.stream = stream
+        self._seq = itertools.count(1)
+        self._pending = deque()
+        self._current = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="jarvis-pipeline", daemon=True)
+        self._executors = {
+            stage: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"jarvis-{stage}")
+            for stage in ("listen", "process", "speech")
+        }
+        self._started = threading.Event()
+
+    # ─── Lifecycle ─────────────────────────────────────────────────────────────
+    def start(self):
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self):
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._shutdown)
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._speech = asyncio.Queue()
+        self._tasks = [
+            self._loop.create_task(self._process_worker()),
+            self._loop.create_task(self._speech_worker()),
+        ]
+        self._loop.call_soon(self._started.set)
+        self._loop.run_forever()
+
+    def _shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        # Let the cancellations run before the loop stops
+        self._loop.call_soon(self._loop.stop)
+
+    # ─── Submission (any thread) ───────────────────────────────────────────────
+    def submit_text(self, text, key=None):
+        self._submit(Request("text", text, key))
+
+    def submit_intent(self, name, key=None, **slots):
+        self._submit(Request("intent", Intent(name, slots=slots), name if key is None else key))
+
+    def submit_listen(self, audio=None):
+        """Capture a voice command, or recognize audio already captured (after a wake word)."""
+        self._submit(Request("listen", audio, key="listen"))
+
+    def _submit(self, request):
+        request.seq = next(self._seq)
+        self._loop.call_soon_threadsafe(self._enqueue, request)
+
+    def _enqueue(self, request):
+        """Queue request on the loop thread, superseding older requests with the same key."""
+        if request.key is not None:
+            for queued in self._pending:
+                if queued.key == request.key:
+                    self._cancel(queued)
+            if self._current is not None and self._current.key == request.key:
+                self._cancel(self._current)
+        while len(self._pending) >= self.max_pending:
+            dropped = self._pending.popleft()
+            if not dropped.cancelled:
+                dropped.cancelled = True
+                self.emit("append", f"Too many requests; dropped {dropped.describe()}.\n", "system")
+        self._pending.append(request)
+        self._wakeup.set()
+
+    def _cancel(self, request):
+        """Mark request superseded; cancelled text is reported, since its reply will never come."""
+        if request.cancelled:
+            return
+        request.cancelled = True
+        if request.kind == "text":
+            self.emit("append", f"Cancelled {request.describe()}.\n", "system")
+
+    # ─── Stages ────────────────────────────────────────────────────────────────
+    async def _process_worker(self):
+        while True:
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            request = self._pending.popleft()
+            if request.cancelled:
+                continue
+            self._current = request
+            try:
+                await self._handle(request)
+            except Exception as e:
+                print(f"[Pipeline Error] {e}")
+                self.emit("append", f"Error while processing request: {e}\n", "system")
+            finally:
+                self._current = None
+
+    async def _handle(self, request):
+        loop = asyncio.get_running_loop()
+        if request.kind == "listen":
+            # Barge-in: the user is about to talk, so stop talking over them
+            self.assistant.stop_speaking()
+            self.emit("voice_state", True)
+            try:
+                text, resp = await loop.run_in_executor(
+                    self._executors["listen"], self.assistant.voice_command, 5, request.payload,
+                    lambda partial: self.emit("partial", partial))
+            finally:
+                self.emit("voice_state", False)
+            if text:
+                self.emit("append", f"You: {text}\n", "user")
+                if resp is not None:
+                    # Answered speculatively while the user was still talking
+                    self.emit("append", f"J.A.R.V.I.S.: {resp}\n\n", "jarvis")
+                    self._speech.put_nowait((request, resp))
+                else:
+                    self._enqueue(Request("text", text, None, next(self._seq)))
+            else:
+                self.emit("append", "Could not understand audio.\n", "system")
+        elif request.kind == "intent":
+            resp = await loop.run_in_executor(self._executors["process"], self.assistant.dispatch, request.payload)
+            if resp is not None and not request.cancelled:
+                self.emit("append", f"J.A.R.V.I.S.: {resp}\n\n", "jarvis")
+                self._speech.put_nowait((request, resp))
+        elif self.stream:
+            await loop.run_in_executor(self._executors["process"], self._stream_text, request)
+        else:
+            resp = await loop.run_in_executor(self._executors["process"], self.assistant.process_input, request.payload)
+            if not request.cancelled:
+                self.emit("append", f"J.A.R.V.I.S.: {resp}\n\n", "jarvis")
+                self._speech.put_nowait((request, resp))
+
+    def _stream_text(self, request):
+        """Stream a text response to the GUI and queue each finished sentence for speech (process thread)."""
+        splitter = SentenceSplitter()
+        self.emit("append", "J.A.R.V.I.S.: ", "jarvis")
+        fragments = self.assistant.stream_input(request.payload)
+        try:
+            for fragment in fragments:
+                if request.cancelled:
+                    self.emit("append", " [interrupted]", "system")
+                    return
+                self.emit("append", fragment, "jarvis")
+                for sentence in splitter.feed(fragment):
+                    self._loop.call_soon_threadsafe(self._speech.put_nowait, (request, sentence))
+            rest = splitter.flush()
+            if rest:
+                self._loop.call_soon_threadsafe(self._speech.put_nowait, (request, rest))
+        finally:
+            fragments.close()
+            self.emit("append", "\n\n", "jarvis")
+
+    async def _speech_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request, text = await self._speech.get()
+            if request.cancelled:
+                continue
+            try:
+                await loop.run_in_executor(self._executors["speech"], self._speak, request, text)
+            except Exception as e:
+                print(f"[Speech Error] {e}")
+
+    def _speak(self, request, text):
+        # Tagging speech with the request number lets the speech worker drop
+        # queued sentences of older responses once a newer one starts talking
+        self.assistant.speak(text, response_id=request.seq)
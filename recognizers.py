@@ -0,0 +1,278 @@
+# recognizers.py
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+# Handle vosk import
+try:
+    import vosk  # type: ignore
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+
+DEFAULT_VOSK_MODEL = os.path.join("models", "vosk-model-small-en-us-0.15")
+TRANSCRIPTS_DIR = "transcripts"
+
+
+class RecognitionSession:
+    """
+    One utterance fed to a backend in PCM chunks.
+
+    ``accept`` returns the partial transcript so far (or None when the backend
+    has no partials); ``finish`` returns the final transcript.
+    """
+    def __init__(self, backend, sample_rate):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self._chunks = []
+
+    def accept(self, chunk):
+        self._chunks.append(chunk)
+        return None
+
+    def finish(self):
+        return self.backend.transcribe(b"".join(self._chunks), self.sample_rate)
+
+
+class RecognizerBackend:
+    """
+    Speech-to-text engine behind Assistant.listen.
+
+    Subclasses implement ``transcribe(pcm, sample_rate)`` and may override
+    ``session`` to recognize while audio is still arriving. ``recognize``
+    and ``recognize_stream`` wrap either with timing: latency to the result
+    and the real-time factor (latency / audio duration).
+    """
+    name = "base"
+
+    def __init__(self):
+        self.timings = deque(maxlen=100)  # {"latency", "audio", "rtf"} in seconds
+
+    def load(self):
+        """Load models ahead of the first utterance."""
+
+    def transcribe(self, pcm, sample_rate):
+        raise NotImplementedError
+
+    def session(self, sample_rate):
+        return RecognitionSession(self, sample_rate)
+
+    def recognize(self, pcm, sample_rate, chunk_ms=100, on_partial=None):
+        """Recognize a whole utterance, feeding it in chunks, and record its timing."""
+        step = sample_rate * chunk_ms // 1000 * SAMPLE_WIDTH
+        chunks = (pcm[offset:offset + step] for offset in range(0, len(pcm), step))
+        start = time.perf_counter()
+        text = self.recognize_stream(chunks, sample_rate, on_partial, record=False)
+        self.record(time.perf_counter() - start, len(pcm) / SAMPLE_WIDTH / sample_rate)
+        return text
+
+    def recognize_stream(self, chunks, sample_rate, on_partial=None, record=True):
+        """
+        Recognize audio while it is still arriving. ``on_partial(text)`` is
+        called whenever the partial transcript changes. The recorded latency
+        runs from the last chunk to the final transcript.
+        """
+        session = self.session(sample_rate)
+        received = 0
+        last = ""
+        for chunk in chunks:
+            received += len(chunk)
+            partial = session.accept(chunk)
+            if partial and partial != last and on_partial is not None:
+                on_partial(partial)
+            last = partial or last
+        if not received:
+            return ""
+        start = time.perf_counter()
+        text = session.finish()
+        if record:
+            self.record(time.perf_counter() - start, received / SAMPLE_WIDTH / sample_rate)
+        return text
+
+    def record(self, latency, audio_seconds):
+        timing = {
+            "latency": latency,
+            "audio": audio_seconds,
+            "rtf": latency / audio_seconds if audio_seconds else 0.0,
+        }
+        self.timings.append(timing)
+        print(f"[ASR] {self.name}: {latency * 1000:.0f} ms for {audio_seconds:.1f} s of audio "
+              f"(RTF {timing['rtf']:.2f})")
+        return timing
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech through speech_recognition (needs network access)."""
+    name = "google"
+
+    def __init__(self):
+        super().__init__()
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate):
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH))  # type: ignore
+        except sr.UnknownValueError:
+            return ""
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, backend, sample_rate):
+        super().__init__(backend, sample_rate)
+        self._recognizer = vosk.KaldiRecognizer(backend.model, sample_rate)
+        self._final = []
+
+    def accept(self, chunk):
+        if self._recognizer.AcceptWaveform(chunk):
+            self._final.append(json.loads(self._recognizer.Result()).get("text", ""))
+            return " ".join(filter(None, self._final))
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(filter(None, self._final + [partial]))
+
+    def finish(self):
+        self._final.append(json.loads(self._recognizer.FinalResult()).get("text", ""))
+        return " ".join(filter(None, self._final))
+
+
+class VoskBackend(RecognizerBackend):
+    """
+    Offline recognition with a Vosk (Kaldi) model.
+
+    The model is loaded once on a background thread when the backend is
+    created and warmed with a short silent buffer, so the first command does
+    not pay for it. Audio is decoded while it is fed in.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path=DEFAULT_VOSK_MODEL, sample_rate=16000):
+        super().__init__()
+        if not VOSK_AVAILABLE:
+            raise RuntimeError("vosk is not installed")
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.model = None
+        self._loaded = threading.Event()
+        self._error = None
+        threading.Thread(target=self.load, name="jarvis-asr-load", daemon=True).start()
+
+    def load(self):
+        try:
+            vosk.SetLogLevel(-1)
+            self.model = vosk.Model(self.model_path)
+            warm = vosk.KaldiRecognizer(self.model, self.sample_rate)
+            warm.AcceptWaveform(b"\0" * (self.sample_rate // 5 * SAMPLE_WIDTH))
+            warm.FinalResult()
+        except Exception as e:
+            self._error = e
+            print(f"Vosk model error: {e}")
+        finally:
+            self._loaded.set()
+
+    def session(self, sample_rate):
+        self._loaded.wait()
+        if self.model is None:
+            raise RuntimeError(f"Vosk model unavailable: {self._error}")
+        return _VoskSession(self, sample_rate)
+
+    def transcribe(self, pcm, sample_rate):
+        session = self.session(sample_rate)
+        session.accept(pcm)
+        return session.finish()
+
+
+class _FileSession(RecognitionSession):
+    def accept(self, chunk):
+        super().accept(chunk)
+        return self.backend.partial(b"".join(self._chunks))
+
+
+class FileBackend(RecognizerBackend):
+    """
+    Deterministic stand-in for tests and benchmarks.
+
+    ``directory`` holds WAV files with a transcript beside each one
+    (``name.wav`` and ``name.txt``). Audio is matched by the hash of its PCM
+    data, so replaying a recorded file always yields its transcript. Audio
+    that went through the endpointer is matched by containment once digital
+    silence at either end is trimmed. Unknown audio yields "". Partials
+    reveal the transcript's words in proportion to the audio fed so far.
+    """
+    name = "file"
+
+    def __init__(self, directory=TRANSCRIPTS_DIR):
+        super().__init__()
+        self.directory = directory
+        self._recordings = []  # (pcm, text)
+        self._by_hash = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            text_path = os.path.splitext(path)[0] + ".txt"
+            if not os.path.exists(text_path):
+                continue
+            with wave.open(path, "rb") as f:
+                pcm = f.readframes(f.getnframes())
+            with open(text_path, encoding="utf-8") as f:
+                text = f.read().strip()
+            self._recordings.append((_trim_silence(pcm), text))
+            self._by_hash[hashlib.sha256(pcm).hexdigest()] = text
+
+    def find(self, received):
+        """Return (transcript, fraction of its recording heard) for received audio, or None."""
+        heard = _trim_silence(received)
+        if not heard:
+            return None
+        for pcm, text in self._recordings:
+            pos = pcm.find(heard)
+            while pos >= 0 and pos % SAMPLE_WIDTH:
+                pos = pcm.find(heard, pos + 1)
+            if pos >= 0:
+                return text, (pos + len(heard)) / len(pcm)
+            if pcm and pcm in heard:
+                return text, 1.0
+        return None
+
+    def partial(self, received):
+        """Words of the recording matching the audio received, cut to the fraction heard."""
+        found = self.find(received)
+        if found is None:
+            return ""
+        text, fraction = found
+        words = text.split()
+        return " ".join(words[:int(len(words) * fraction)])
+
+    def session(self, sample_rate):
+        return _FileSession(self, sample_rate)
+
+    def transcribe(self, pcm, sample_rate):
+        text = self._by_hash.get(hashlib.sha256(pcm).hexdigest())
+        if text is None:
+            found = self.find(pcm)
+            text = found[0] if found else ""
+        return text
+
+
+def _trim_silence(pcm):
+    """Drop all-zero samples from both ends of 16-bit PCM."""
+    return np.trim_zeros(np.frombuffer(pcm, dtype=np.int16)).tobytes()
+
+
+def create_backend(settings):
+    """Build the backend named by settings["speech_backend"], falling back to Google."""
+    name = settings.get("speech_backend", "google")
+    try:
+        if name == "vosk":
+            return VoskBackend(settings.get("vosk_model", DEFAULT_VOSK_MODEL))
+        if name == "file":
+            return FileBackend(settings.get("transcripts_dir", TRANSCRIPTS_DIR))
+    except Exception as e:
+        print(f"Speech backend '{name}' unavailable: {e}")
+    return GoogleBackend()
@@ -0,0 +1,222 @@
+# recorder.py
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+CLIP_DIR = "surveillance_clips"
+
+
+class _Clip:
+    def __init__(self, start, end, path):
+        self.start = start  # first frame sequence number
+        self.end = end      # one past the last; moved out by later triggers
+        self.path = path
+
+
+class ClipRecorder:
+    """
+    Keeps the last seconds of camera frames and saves clips around events.
+
+    A capture thread copies ``fps`` frames per second from the shared camera
+    straight into a preallocated (slots, H, W, 3) ring, so recording
+    allocates nothing per frame. The ring holds ``pre_seconds`` of history
+    plus ``slack_seconds`` of headroom for the writer. ``trigger`` starts a
+    clip with the buffered pre-event frames and ``post_seconds`` after the
+    trigger; a trigger during that window extends the same clip. A writer
+    thread copies each frame out of the ring into its own buffer under the
+    lock and encodes it with cv2.VideoWriter from there, so the capture
+    thread can never overwrite a frame mid-encode. Frames the capture thread
+    overwrote before the writer got to them are counted in
+    ``frames_dropped``. After each clip the oldest clips are deleted until
+    the directory is under ``max_bytes``.
+    """
+    def __init__(self, camera, directory=CLIP_DIR, fps=10.0, pre_seconds=5.0, post_seconds=10.0,
+                 slack_seconds=2.0, max_bytes=500 * 1024 * 1024, codec="mp4v", extension=".mp4"):
+        self.camera = camera
+        self.directory = directory
+        self.fps = fps
+        self.pre_frames = int(pre_seconds * fps)
+        self.post_frames = int(post_seconds * fps)
+        self.capacity = self.pre_frames + max(2, int(slack_seconds * fps))
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self.extension = extension
+        self.ring = None
+        self.head = 0  # sequence number of the next frame to capture
+        self._valid_from = 0  # older sequence numbers are not in the ring
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.clips_written = 0
+        self.clips_deleted = 0
+        self.write_seconds = 0.0
+        self._clips = deque()
+        self._frame = None  # writer thread's copy of the frame being encoded
+        self._cond = threading.Condition()
+        self._stop = None
+        os.makedirs(directory, exist_ok=True)
+
+    # ─── Lifecycle ─────────────────────────────────────────────────────────────
+    def is_running(self):
+        return self._stop is not None
+
+    def start(self):
+        if self._stop is not None:
+            return
+        self.camera.acquire()
+        with self._cond:
+            self._valid_from = self.head  # frames from a previous run are stale
+        self._stop = threading.Event()
+        threading.Thread(target=self._capture, args=(self._stop,), name="jarvis-clip-capture", daemon=True).start()
+        threading.Thread(target=self._write, args=(self._stop,), name="jarvis-clip-writer", daemon=True).start()
+
+    def stop(self):
+        """Stop recording; a clip in progress is closed with the frames captured so far."""
+        if self._stop is None:
+            return
+        self._stop.set()
+        self._stop = None
+        with self._cond:
+            self._cond.notify_all()
+        self.camera.release()
+
+    # ─── Triggering ────────────────────────────────────────────────────────────
+    def trigger(self, reason="event"):
+        """Save the pre-event frames and the next post_seconds; returns the clip path."""
+        with self._cond:
+            if self._clips and self._clips[-1].end >= self.head:
+                clip = self._clips[-1]
+                clip.end = self.head + self.post_frames
+                return clip.path
+            start = max(self._valid_from, self.head - self.pre_frames)
+            now = time.time()
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+            path = os.path.join(self.directory, f"{stamp}-{reason}{self.extension}")
+            clip = _Clip(start, self.head + self.post_frames, path)
+            self._clips.append(clip)
+            self._cond.notify_all()
+            return path
+
+    # ─── Capture thread ────────────────────────────────────────────────────────
+    def _capture(self, stop):
+        interval = 1.0 / self.fps
+        frame_id = None
+        while not stop.is_set():
+            started = time.monotonic()
+            slot = self.ring[self.head % self.capacity] if self.ring is not None else None
+            frame_id, frame = self.camera.read(timeout=1.0, after=frame_id, out=slot)
+            if frame is None:
+                stop.wait(0.5 if self.camera.error is not None else 0.0)
+                continue
+            if frame is not slot:
+                # First frame or a new resolution: (re)allocate the ring
+                with self._cond:
+                    self.ring = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                    self.ring[self.head % self.capacity] = frame
+                    self._valid_from = self.head
+            with self._cond:
+                self.head += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    # ─── Writer thread ─────────────────────────────────────────────────────────
+    def _next_frame(self, stop, seq):
+        """Wait until frame seq is captured; returns a copy of it, None if overwritten, or False on stop."""
+        with self._cond:
+            while self.head <= seq:
+                if stop.is_set():
+                    return False
+                self._cond.wait(0.5)
+            # Keep one slot of margin: the capture thread may be filling it now
+            if seq <= self.head - self.capacity + 1 or seq < self._valid_from or self.ring is None:
+                return None
+            # head cannot advance while the lock is held, so the slot stays put during the copy
+            slot = self.ring[seq % self.capacity]
+            if self._frame is None or self._frame.shape != slot.shape:
+                self._frame = slot.copy()
+            else:
+                np.copyto(self._frame, slot)
+            return self._frame
+
+    def _write(self, stop):
+        while not stop.is_set():
+            with self._cond:
+                while not self._clips and not stop.is_set():
+                    self._cond.wait(0.5)
+                if not self._clips:
+                    return
+                clip = self._clips[0]
+            self._write_clip(stop, clip)
+            with self._cond:
+                self._clips.popleft()
+            self._rotate()
+
+    def _write_clip(self, stop, clip):
+        writer = None
+        seq = clip.start
+        try:
+            while True:
+                with self._cond:
+                    if seq >= clip.end:
+                        break
+                frame = self._next_frame(stop, seq)
+                if frame is False:
+                    break
+                seq += 1
+                if frame is None:
+                    self.frames_dropped += 1
+                    continue
+                started = time.perf_counter()
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(clip.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+                    if not writer.isOpened():
+                        raise RuntimeError(f"cannot open video writer for {clip.path}")
+                writer.write(frame)
+                self.write_seconds += time.perf_counter() - started
+                self.frames_written += 1
+        except Exception as e:
+            print(f"Clip recorder error: {e}")
+        finally:
+            if writer is not None:
+                writer.release()
+                self.clips_written += 1
+
+    def _rotate(self):
+        """Delete the oldest clips until the directory fits in max_bytes."""
+        clips = []
+        for path in glob.glob(os.path.join(self.directory, f"*{self.extension}")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            clips.append((stat.st_mtime, stat.st_size, path))
+        clips.sort()
+        total = sum(size for _, size, _ in clips)
+        # Never delete the clip just written
+        for _, size, path in clips[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.clips_deleted += 1
+            except OSError as e:
+                print(f"Clip rotation error: {e}")
+
+    def stats(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "clips_written": self.clips_written,
+            "clips_deleted": self.clips_deleted,
+            "pending_clips": len(self._clips),
+            "write_fps": self.frames_written / self.write_seconds if self.write_seconds else 0.0,
+        }
@@ -0,0 +1,78 @@
+# speculation.py
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from intents import Intent
+
+
+@dataclass
+class Speculation:
+    intent: Intent
+    response: Optional[str]
+    undo: Optional[Callable[[], object]] = None
+
+
+class SpeculativeDispatcher:
+    """
+    Runs cheap local intents while the user is still speaking.
+
+    Each partial transcript goes through ``match``. When it names one of the
+    ``speculative`` intents, that intent is dispatched right away and its
+    response held. ``speculative`` maps intent names to an undo factory (or
+    None for intents without side effects); the factory is called just
+    before dispatch and returns a callable that restores the previous state.
+    When the final transcript arrives, ``resolve`` commits the held response
+    if the final intent is the same one, and otherwise rolls it back.
+    """
+    def __init__(self, match, dispatch, speculative):
+        self.match = match
+        self.dispatch = dispatch
+        self.speculative = speculative
+        self.current = None
+        self.committed = 0
+        self.rolled_back = 0
+        self._lock = threading.Lock()
+
+    def update(self, partial):
+        """Speculate on a partial transcript."""
+        intent = self.match(partial)
+        if intent is None or intent.name not in self.speculative:
+            return
+        with self._lock:
+            if self.current is not None:
+                if _same(self.current.intent, intent):
+                    return
+                self._rollback()
+            factory = self.speculative[intent.name]
+            undo = factory() if factory is not None else None
+            self.current = Speculation(intent, self.dispatch(intent), undo)
+
+    def resolve(self, intent):
+        """
+        Settle the speculation against the intent of the final transcript.
+        Returns the committed response, or None if nothing was committed.
+        """
+        with self._lock:
+            current, self.current = self.current, None
+            if current is None:
+                return None
+            if intent is not None and _same(current.intent, intent):
+                self.committed += 1
+                return current.response
+            self.current = current
+            self._rollback()
+            return None
+
+    def _rollback(self):
+        if self.current.undo is not None:
+            try:
+                self.current.undo()
+            except Exception as e:
+                print(f"Speculation rollback error: {e}")
+        self.rolled_back += 1
+        self.current = None
+
+
+def _same(a, b):
+    return a.name == b.name and a.slots == b.slots
@@ -0,0 +1,360 @@
+# speech.py
+import hashlib
+import heapq
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import pygame
+
+from gpt import SentenceSplitter
+
+TTS_CACHE_DIR = Path("tts_cache")
+
+# Lower values are spoken first and preempt higher values mid-utterance
+PRIORITY_ALERT = 0       # alarms and security alerts
+PRIORITY_CHATTER = 1     # responses and everything else
+PRIORITY_BACKGROUND = 2  # pre-rendering phrases while idle
+
+
+class _Utterance:
+    def __init__(self, text, priority, seq, response_id, render=False, parts=None):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.response_id = response_id
+        self.render = render
+        self.done = threading.Event()
+        # Sentence-by-sentence playback state
+        self.parts = parts or [text]
+        self.pipelined = False
+        self.next_part = 0        # next sentence to synthesize
+        self.synthesizing = None  # (index, path, started) while the engine renders
+        self.buffers = deque()    # (index, Sound, synth seconds) ready to play
+        self.started = 0.0
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def split_sentences(text):
+    """Split text into the sentences it is spoken as."""
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text)
+    rest = splitter.flush()
+    return sentences + [rest] if rest else sentences
+
+
+class PhraseCache:
+    """
+    Pre-rendered WAV clips of fixed phrases.
+
+    Clips are stored content-addressed under ``directory`` by a hash of the
+    voice, rate and text, so changing the voice or rate simply misses instead
+    of playing stale audio. Loaded clips are kept as pygame Sounds so playback
+    starts immediately.
+    """
+    def __init__(self, directory=TTS_CACHE_DIR):
+        self.directory = Path(directory)
+        self.voice = None
+        self.rate = None
+        self.hits = 0
+        self.misses = 0
+        self._sounds = {}
+
+    def configure(self, voice, rate):
+        if (voice, rate) != (self.voice, self.rate):
+            self.voice, self.rate = voice, rate
+            self._sounds = {}
+
+    def path(self, text):
+        digest = hashlib.sha256(f"{self.voice}|{self.rate}|{text.strip()}".encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.wav"
+
+    def get(self, text):
+        """Return a playable Sound for text, or None to synthesize it live."""
+        sound = self._sounds.get(text)
+        if sound is None:
+            path = self.path(text)
+            if not path.exists() or not pygame.mixer.get_init():
+                self.misses += 1
+                return None
+            try:
+                sound = pygame.mixer.Sound(str(path))
+            except pygame.error as e:
+                print(f"Cached phrase error: {e}")
+                self.misses += 1
+                return None
+            self._sounds[text] = sound
+        self.hits += 1
+        return sound
+
+
+class SpeechWorker:
+    """
+    Owns the text-to-speech engine on a dedicated thread.
+
+    pyttsx3 engines are not thread-safe, so every call into the engine happens
+    here. The engine is created on the worker thread by ``engine_factory``
+    and driven through its external event loop (startLoop(False)/iterate()),
+    which lets the worker stop an utterance part way through. Utterances are
+    queued by priority. A higher-priority utterance interrupts lower-priority
+    speech. Chatter tagged with an older ``response_id`` than the newest one
+    seen is dropped before it is spoken. Text found in ``phrase_cache`` is
+    played from its pre-rendered clip instead of being synthesized.
+
+    With ``pipeline_sentences`` enabled, text of several sentences is
+    synthesized one sentence at a time into in-memory buffers and played
+    through the pygame mixer, rendering sentence N+1 while sentence N plays.
+    Time to first audio then depends on the first sentence only. Per-sentence
+    timings are kept in ``sentence_timings``.
+    """
+    def __init__(self, engine_factory, phrase_cache=None, poll_interval=0.02,
+                 pipeline_sentences=True, lookahead=1):
+        self.engine_factory = engine_factory
+        self.phrase_cache = phrase_cache
+        self.poll_interval = poll_interval
+        self.pipeline_sentences = pipeline_sentences
+        self.lookahead = lookahead
+        self.spoken = 0
+        self.dropped = 0
+        # {"sentence", "chars", "synth", "wait", "play"} in seconds; "wait" is
+        # the silence before the sentence started (time to first audio for 0)
+        self.sentence_timings = deque(maxlen=200)
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._channel = None
+        self._playing = None  # (index, chars, synth, started, wait) of the sentence playing
+        self._silent_since = 0.0
+        self._scratch = None
+        self._interrupt = False
+        self._latest_response = 0
+        self._running = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="jarvis-tts", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def say(self, text, priority=PRIORITY_CHATTER, response_id=None):
+        """Queue text and return an Event that is set once it was spoken or dropped."""
+        parts = split_sentences(text) if self.pipeline_sentences else None
+        with self._cond:
+            utterance = _Utterance(text, priority, next(self._seq), response_id, parts=parts)
+            if priority == PRIORITY_CHATTER and response_id is not None:
+                if response_id < self._latest_response:
+                    self._drop(utterance)
+                    return utterance.done
+                self._latest_response = response_id
+            heapq.heappush(self._queue, utterance)
+            if self._current is not None and priority < self._current.priority:
+                self._interrupt = True
+            self._idle.clear()
+            self._cond.notify()
+            return utterance.done
+
+    def prerender(self, phrases):
+        """Render phrases missing from the phrase cache while the worker is idle."""
+        if self.phrase_cache is None:
+            return
+        with self._cond:
+            for text in dict.fromkeys(phrases):
+                heapq.heappush(self._queue, _Utterance(text, PRIORITY_BACKGROUND, next(self._seq), None, render=True))
+            self._cond.notify()
+
+    def interrupt(self, include_alerts=False):
+        """Stop the current utterance and drop queued chatter (and alerts, if asked)."""
+        with self._cond:
+            kept = []
+            for utterance in self._queue:
+                if utterance.render:
+                    kept.append(utterance)
+                elif include_alerts or utterance.priority == PRIORITY_CHATTER:
+                    self._drop(utterance)
+                else:
+                    kept.append(utterance)
+            heapq.heapify(kept)
+            self._queue = kept
+            if self._current is not None and (include_alerts or self._current.priority == PRIORITY_CHATTER):
+                self._interrupt = True
+
+    def is_speaking(self):
+        return not self._idle.is_set()
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or being spoken."""
+        return self._idle.wait(timeout)
+
+    def _drop(self, utterance):
+        self.dropped += 1
+        utterance.done.set()
+
+    def _next_utterance(self):
+        """Pop the next utterance, skipping chatter from superseded responses."""
+        while self._queue:
+            utterance = heapq.heappop(self._queue)
+            stale = (utterance.priority == PRIORITY_CHATTER and utterance.response_id is not None
+                     and utterance.response_id < self._latest_response)
+            if utterance.render and self.phrase_cache.path(utterance.text).exists():
+                utterance.done.set()
+                continue
+            if not stale:
+                return utterance
+            self._drop(utterance)
+        return None
+
+    def _on_finished(self, name=None, completed=True):
+        with self._cond:
+            # Ignore late callbacks for utterances that were already interrupted
+            if self._current is None or name is None:
+                return
+            if self._current.pipelined and name.startswith(f"{self._current.seq}."):
+                self._finish_sentence(self._current, completed)
+            elif name == str(self._current.seq):
+                if self._current.render:
+                    self._finish_render(self._current, completed)
+                elif completed:
+                    self.spoken += 1
+                self._current.done.set()
+                self._current = None
+                self._channel = None
+                self._playing = None
+
+    def _finish_sentence(self, utterance, completed):
+        """Load a synthesized sentence into memory so it is ready to play."""
+        index, path, started = utterance.synthesizing
+        utterance.synthesizing = None
+        try:
+            if completed:
+                with open(path, "rb") as f:
+                    sound = pygame.mixer.Sound(file=io.BytesIO(f.read()))
+                utterance.buffers.append((index, sound, time.perf_counter() - started))
+            os.remove(path)
+        except (OSError, pygame.error) as e:
+            print(f"Sentence synthesis error: {e}")
+
+    def _advance(self, engine, utterance):
+        """Keep sentences synthesized ahead of the one playing (worker thread)."""
+        if (utterance.synthesizing is None and utterance.next_part < len(utterance.parts)
+                and len(utterance.buffers) < self.lookahead):
+            index = utterance.next_part
+            utterance.next_part += 1
+            text = utterance.parts[index]
+            sound = self.phrase_cache.get(text) if self.phrase_cache is not None else None
+            if sound is not None:
+                utterance.buffers.append((index, sound, 0.0))
+            else:
+                path = os.path.join(self._scratch, f"{utterance.seq}-{index}.wav")
+                utterance.synthesizing = (index, path, time.perf_counter())
+                engine.save_to_file(text, path, f"{utterance.seq}.{index}")
+
+        if self._channel is not None and self._channel.get_busy():
+            return
+        now = time.perf_counter()
+        if self._playing is not None:
+            index, chars, synth, started, wait = self._playing
+            self.sentence_timings.append({"sentence": index, "chars": chars, "synth": synth,
+                                          "wait": wait, "play": now - started})
+            self._playing = None
+            self._silent_since = now
+        if utterance.buffers:
+            index, sound, synth = utterance.buffers.popleft()
+            self._channel = sound.play()
+            wait = now - (utterance.started if index == 0 else self._silent_since)
+            self._playing = (index, len(utterance.parts[index]), synth, now, wait)
+        elif utterance.synthesizing is None and utterance.next_part >= len(utterance.parts):
+            self._on_finished(str(utterance.seq), True)
+
+    def _finish_render(self, utterance, completed):
+        path = self.phrase_cache.path(utterance.text)
+        partial = path.with_suffix(".part")
+        try:
+            if completed and partial.exists() and partial.stat().st_size > 0:
+                os.replace(partial, path)
+            elif partial.exists():
+                partial.unlink()
+        except OSError as e:
+            print(f"Phrase render error: {e}")
+
+    def _start(self, engine, utterance):
+        """Begin rendering, playing or synthesizing utterance (worker thread)."""
+        name = str(utterance.seq)
+        utterance.started = time.perf_counter()
+        if utterance.render:
+            path = self.phrase_cache.path(utterance.text)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            engine.save_to_file(utterance.text, str(path.with_suffix(".part")), name)
+            return
+        if len(utterance.parts) > 1 and pygame.mixer.get_init():
+            utterance.pipelined = True
+            self._advance(engine, utterance)
+            return
+        if self.phrase_cache is not None:
+            sound = self.phrase_cache.get(utterance.text)
+            if sound is not None:
+                self._channel = sound.play()
+                if self._channel is not None:
+                    return
+        engine.say(utterance.text, name)
+
+    def _run(self):
+        engine = self.engine_factory()
+        engine.connect("finished-utterance", self._on_finished)
+        if self.phrase_cache is not None:
+            self.phrase_cache.configure(engine.getProperty("voice"), engine.getProperty("rate"))
+        self._scratch = tempfile.mkdtemp(prefix="jarvis-tts-")
+        engine.startLoop(False)
+        try:
+            while True:
+                with self._cond:
+                    if not self._running:
+                        break
+                    if self._interrupt:
+                        self._interrupt = False
+                        # Detach the utterance first: engine.stop() may report it
+                        # finished right away, and that callback must not settle it
+                        interrupted, self._current = self._current, None
+                        engine.stop()
+                        if self._channel is not None:
+                            self._channel.stop()
+                            self._channel = None
+                        self._playing = None
+                        if interrupted is not None and interrupted.render:
+                            # Speech preempted a render; finish it later
+                            self._finish_render(interrupted, False)
+                            heapq.heappush(self._queue, interrupted)
+                        elif interrupted is not None:
+                            self._drop(interrupted)
+                    if self._current is None:
+                        self._current = self._next_utterance()
+                        if self._current is None:
+                            self._idle.set()
+                            self._cond.wait()
+                            continue
+                        self._start(engine, self._current)
+                engine.iterate()
+                current = self._current
+                if current is not None and current.pipelined:
+                    self._advance(engine, current)
+                elif self._channel is not None and not self._channel.get_busy():
+                    self._on_finished(str(current.seq), True)
+                time.sleep(self.poll_interval)
+        finally:
+            engine.endLoop()
+            shutil.rmtree(self._scratch, ignore_errors=True)
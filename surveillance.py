@@ -0,0 +1,228 @@
+# surveillance.py
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from face_tracking import FacePipeline
+
+
+class MotionDetector:
+    """
+    Finds the parts of a frame that changed, cheaply.
+
+    Frames are shrunk to ``width`` pixels across, turned to grayscale and
+    blurred, then compared with a running-average background. The background
+    keeps adapting (``alpha`` per frame), so lighting drift and objects that
+    stay put fade out of the difference after a few seconds. Pixels that
+    differ by more than ``threshold`` grey levels form the motion mask, and
+    ``feed`` returns the bounding boxes of its blobs (at least ``min_area``
+    of the frame) in full-resolution (top, right, bottom, left) form.
+    """
+    def __init__(self, width=160, alpha=0.05, threshold=25, min_area=0.002, blur=5):
+        self.width = width
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_area = min_area
+        self.blur = blur
+        self.background = None
+        self.changed = 0.0  # fraction of the last frame that changed
+
+    def reset(self):
+        self.background = None
+        self.changed = 0.0
+
+    def feed(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.width / width
+        small = cv2.resize(frame, (self.width, max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (self.blur, self.blur), 0)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return []
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask, None, iterations=2)
+        self.changed = cv2.countNonZero(mask) / mask.size
+        if not self.changed:
+            return []
+
+        contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+        min_pixels = self.min_area * mask.size
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w * h >= min_pixels:
+                regions.append((int(y / scale), int((x + w) / scale), int((y + h) / scale), int(x / scale)))
+        return regions
+
+
+@dataclass
+class SurveillanceEvent:
+    kind: str  # "motion_start", "motion_stop" or "person_seen"
+    time: float = field(default_factory=time.time)
+    name: Optional[str] = None  # person_seen: identity, None if unknown
+    confidence: float = 0.0
+    box: Optional[tuple] = None  # person_seen: (top, right, bottom, left)
+    regions: int = 0  # motion_start: changed regions in the frame
+    duration: float = 0.0  # motion_stop: seconds of motion
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _merge(regions, shape, pad, max_regions):
+    """Pad regions, clip them to the frame, and fall back to their union when there are many."""
+    height, width = shape[:2]
+    padded = []
+    for top, right, bottom, left in regions:
+        dy, dx = int((bottom - top) * pad), int((right - left) * pad)
+        padded.append((max(0, top - dy), min(width, right + dx), min(height, bottom + dy), max(0, left - dx)))
+    if len(padded) > max_regions:
+        tops, rights, bottoms, lefts = zip(*padded)
+        padded = [(min(tops), max(rights), max(bottoms), min(lefts))]
+    return padded
+
+
+class SurveillanceMonitor:
+    """
+    Staged surveillance over the shared camera.
+
+    At ``fps`` analysis frames per second, a MotionDetector gates everything
+    else: a static scene costs one 160-pixel grayscale difference per frame.
+    Motion for ``start_frames`` frames in a row emits ``motion_start``;
+    ``stop_seconds`` without motion emits ``motion_stop``. While there is
+    motion, faces are detected and recognized only inside the changed
+    regions (padded, at most every ``recognize_interval`` seconds). Each
+    identity (unknown faces share one) emits ``person_seen`` once and then
+    again only after ``person_cooldown`` seconds out of sight.
+    ``on_event(SurveillanceEvent)`` is called on the monitor thread.
+    """
+    def __init__(self, camera, store, on_event, fps=5.0, start_frames=2, stop_seconds=3.0,
+                 recognize_interval=0.5, person_cooldown=30.0, pad=0.25, max_regions=3,
+                 detector=None, faces=None):
+        self.camera = camera
+        self.on_event = on_event
+        self.fps = fps
+        self.start_frames = start_frames
+        self.stop_seconds = stop_seconds
+        self.recognize_interval = recognize_interval
+        self.person_cooldown = person_cooldown
+        self.pad = pad
+        self.max_regions = max_regions
+        self.detector = detector or MotionDetector()
+        self.faces = faces or FacePipeline(store, scale=0.5)
+        self.events = deque(maxlen=200)
+        self.in_motion = False
+        self.frames = 0
+        self.motion_frames = 0
+        self.recognitions = 0
+        self._stop = None  # Event of the running monitor thread
+        self._buffer = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self.in_motion = False
+        self._streak = 0
+        self._motion_started = 0.0
+        self._last_motion = 0.0
+        self._last_recognition = float("-inf")
+        self._last_seen = {}
+        self.detector.reset()
+
+    def is_running(self):
+        return self._stop is not None
+
+    def start(self):
+        if self._stop is not None:
+            return
+        self._reset_state()
+        self.camera.acquire()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), name="jarvis-surveillance", daemon=True).start()
+
+    def stop(self):
+        if self._stop is None:
+            return
+        self._stop.set()
+        self._stop = None
+        self.camera.release()
+
+    def _run(self, stop):
+        interval = 1.0 / self.fps
+        frame_id = None
+        while not stop.is_set():
+            started = time.monotonic()
+            frame_id, frame = self.camera.read(timeout=1.0, after=frame_id, out=self._buffer)
+            if frame is None:
+                if self.camera.error is not None:
+                    print(f"Surveillance camera error: {self.camera.error}")
+                    stop.wait(1.0)
+                continue
+            self._buffer = frame
+            try:
+                self.step(frame, started)
+            except Exception as e:
+                print(f"Surveillance error: {e}")
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        if self.in_motion:
+            self._emit(SurveillanceEvent("motion_stop", duration=time.monotonic() - self._motion_started))
+            self.in_motion = False
+
+    def step(self, frame, now):
+        """Run one BGR frame taken at monotonic time now through the stages."""
+        self.frames += 1
+        regions = self.detector.feed(frame)
+        if regions:
+            self.motion_frames += 1
+            self._streak += 1
+            self._last_motion = now
+        else:
+            self._streak = 0
+
+        if not self.in_motion and self._streak >= self.start_frames:
+            self.in_motion = True
+            self._motion_started = now
+            self._emit(SurveillanceEvent("motion_start", regions=len(regions)))
+        elif self.in_motion and now - self._last_motion >= self.stop_seconds:
+            self.in_motion = False
+            self._emit(SurveillanceEvent("motion_stop", duration=now - self._motion_started))
+
+        if self.in_motion and regions and now - self._last_recognition >= self.recognize_interval:
+            self._last_recognition = now
+            self._recognize(frame, regions, now)
+
+    def _recognize(self, frame, regions, now):
+        self.recognitions += 1
+        for top, right, bottom, left in _merge(regions, frame.shape, self.pad, self.max_regions):
+            crop = np.ascontiguousarray(frame[top:bottom, left:right])
+            if crop.size == 0:
+                continue
+            for face in self.faces.detect(crop):
+                box = (face.box[0] + top, face.box[1] + left, face.box[2] + top, face.box[3] + left)
+                last = self._last_seen.get(face.name, float("-inf"))
+                self._last_seen[face.name] = now
+                if now - last >= self.person_cooldown:
+                    self._emit(SurveillanceEvent("person_seen", name=face.name,
+                                                 confidence=face.confidence, box=box))
+
+    def _emit(self, event):
+        self.events.append(event)
+        try:
+            self.on_event(event)
+        except Exception as e:
+            print(f"Surveillance event error: {e}")
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "motion_frames": self.motion_frames,
+            "recognitions": self.recognitions,
+            "in_motion": self.in_motion,
+        }
@@ -0,0 +1,16 @@
+# tests/conftest.py
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules imported at load time that the tests never call into (or replace
+# with monkeypatched stand-ins): pyautogui needs a display, dlib and
+# face_recognition a native build, speech_recognition a microphone stack and
+# pygame an audio device
+for name in ("pyautogui", "dlib", "face_recognition", "speech_recognition", "pygame"):
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = types.ModuleType(name)
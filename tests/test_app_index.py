@@ -0,0 +1,114 @@
+# tests/test_app_index.py
+import os
+
+import pytest
+
+import app_index
+from app_index import AppIndex, is_blocked
+from launcher import AppLauncher
+
+
+def write_desktop(directory, file, name, exec_line):
+    with open(os.path.join(directory, file), "w", encoding="utf-8") as f:
+        f.write(f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n")
+
+
+def write_executable(directory, file):
+    path = os.path.join(directory, file)
+    with open(path, "w") as f:
+        f.write("")
+    os.chmod(path, 0o755)
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    apps, bin_dir = tmp_path / "applications", tmp_path / "bin"
+    apps.mkdir()
+    bin_dir.mkdir()
+    write_desktop(apps, "firefox.desktop", "Firefox Web Browser", "firefox %u")
+    write_desktop(apps, "org.gimp.GIMP.desktop", "GNU Image Manipulation Program", "gimp-2.10 %U")
+    write_desktop(apps, "quick-exit.desktop", "Quick Exit", "systemctl poweroff")
+    for tool in ("shutdown", "poweroff", "reboot", "halt", "rm", "killall", "file", "mytool"):
+        write_executable(bin_dir, tool)
+    monkeypatch.setattr(app_index, "DESKTOP_DIRS", [str(apps)])
+    monkeypatch.setattr(app_index.platform, "system", lambda: "Linux")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return AppIndex(index_file=tmp_path / "app_index.json")
+
+
+def test_fuzzy_lookup(index):
+    assert index.lookup("fire fox") == ["firefox"]
+    assert index.lookup("Firefox Web Browser") == ["firefox"]
+    assert index.match("fire fox").score == 1.0
+
+
+def test_below_min_score(index):
+    match = index.match("fir fox")
+    assert match.name == "firefox"
+    assert index.min_score <= match.score < 1.0
+    assert index.lookup("spreadsheet") is None
+
+
+@pytest.mark.parametrize("query", ["shut down", "power off", "reboot", "halt", "rm", "kill all", "my file", "mytool"])
+def test_path_tools_not_indexed_on_linux(index, query):
+    assert index.lookup(query) is None
+
+
+def test_desktop_entry_running_system_tool_is_skipped(index):
+    assert index.lookup("quick exit") is None
+
+
+def test_windows_path_without_blocked_tools(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "System32"
+    bin_dir.mkdir()
+    for file in ("notepad.exe", "shutdown.exe", "taskkill.exe", "format.com", "cmd.exe"):
+        write_executable(bin_dir, file)
+    monkeypatch.setattr(app_index.platform, "system", lambda: "Windows")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("PATHEXT", ".COM;.EXE")
+    index = AppIndex(index_file=tmp_path / "app_index.json")
+    assert index.lookup("notepad") == [str(bin_dir / "notepad.exe")]
+    for query in ("shut down", "task kill", "format", "cmd"):
+        assert index.lookup(query) is None
+
+
+@pytest.mark.parametrize("program, blocked", [
+    ("rm", True), ("/usr/sbin/shutdown", True), ("Shutdown.exe", True), ("kill all", True),
+    ("mkfs.ext4", True), ("firefox", False), ("/usr/bin/gimp-2.10", False), ("notepad.exe", False),
+])
+def test_is_blocked(program, blocked):
+    assert is_blocked(program) == blocked
+
+
+@pytest.fixture
+def launcher(index, monkeypatch):
+    launcher = AppLauncher(app_commands={}, app_index=index)
+    launcher.system = "Linux"
+    launcher.spawned = []
+    monkeypatch.setattr(launcher, "spawn", lambda argv: launcher.spawned.append(argv) or FakeProcess())
+    return launcher
+
+
+class FakeProcess:
+    pid = 1
+
+    def poll(self):
+        return None
+
+
+def test_launch_confident_match(launcher):
+    assert launcher.launch("fire fox") == "Opening fire fox, sir."
+    assert launcher.spawned == [["firefox"]]
+
+
+def test_weak_match_asks_for_confirmation(launcher):
+    assert launcher.launch("fir fox").startswith("Did you mean firefox")
+    assert launcher.spawned == []
+
+
+def test_fallback_refuses_system_tools(launcher, monkeypatch):
+    monkeypatch.setattr("launcher.shutil.which", lambda name: f"/usr/sbin/{name}")
+    for name in ("shut down", "reboot", "rm"):
+        assert launcher.resolve(name) is None
+        assert launcher.launch(name).startswith("I couldn't find")
+    assert launcher.spawned == []
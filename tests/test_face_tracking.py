@@ -0,0 +1,144 @@
+# tests/test_face_tracking.py
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import face_tracking
+from face_tracking import FacePipeline
+
+
+class FakeRectangle:
+    def __init__(self, left, top, right, bottom):
+        self._box = (left, top, right, bottom)
+
+    def left(self):
+        return self._box[0]
+
+    def top(self):
+        return self._box[1]
+
+    def right(self):
+        return self._box[2]
+
+    def bottom(self):
+        return self._box[3]
+
+
+class Scene:
+    """
+    Stands in for face_recognition and dlib: ``boxes`` are the (top, right,
+    bottom, left) faces found on the detection image, trackers move their box
+    by ``shift`` pixels per update and report ``quality``.
+    """
+    def __init__(self):
+        self.boxes = []
+        self.names = []
+        self.shift = 0
+        self.quality = 20.0
+        self.detected_on = []
+        self.encoded = []
+        self.trackers = 0
+
+    def face_locations(self, image, upsample, model):
+        self.detected_on.append(image.shape)
+        return list(self.boxes)
+
+    def face_encodings(self, image, boxes):
+        self.encoded.append((image.shape, list(boxes)))
+        return [np.zeros(128, dtype=np.float32) for _ in boxes]
+
+    def match(self, encodings, tolerance):
+        return [(name, 0.3, 0.5) for name in self.names[:len(encodings)]]
+
+    def correlation_tracker(self):
+        scene = self
+        scene.trackers += 1
+
+        class Tracker:
+            def start_track(self, image, rect):
+                self.rect = rect
+
+            def update(self, image):
+                r = self.rect
+                self.rect = FakeRectangle(r.left() + scene.shift, r.top(), r.right() + scene.shift, r.bottom())
+                return scene.quality
+
+            def get_position(self):
+                return self.rect
+        return Tracker()
+
+
+@pytest.fixture
+def scene(monkeypatch):
+    scene = Scene()
+    monkeypatch.setattr(face_tracking.face_recognition, "face_locations", scene.face_locations, raising=False)
+    monkeypatch.setattr(face_tracking.face_recognition, "face_encodings", scene.face_encodings, raising=False)
+    monkeypatch.setattr(face_tracking.dlib, "correlation_tracker", scene.correlation_tracker, raising=False)
+    monkeypatch.setattr(face_tracking.dlib, "rectangle", FakeRectangle, raising=False)
+    return scene
+
+
+def pipeline(scene, **kwargs):
+    return FacePipeline(SimpleNamespace(gallery=scene), **kwargs)
+
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_boxes_are_scaled_up_to_the_frame(scene):
+    scene.boxes, scene.names = [(10, 40, 30, 20), (100, 170, 130, 150)], ["tony", None]
+    faces = pipeline(scene, scale=0.25).process(FRAME)
+    assert scene.detected_on == [(120, 160, 3)]
+    # Encoded at full resolution; the second box is clipped to the frame
+    assert scene.encoded == [((480, 640, 3), [(40, 160, 120, 80), (400, 640, 480, 600)])]
+    assert [(face.box, face.name) for face in faces] == [((40, 160, 120, 80), "tony"), ((400, 640, 480, 600), None)]
+
+
+def test_tracks_between_detections(scene):
+    scene.boxes, scene.names = [(10, 40, 30, 20)], ["tony"]
+    faces = pipeline(scene, scale=0.25, detect_every=5)
+    faces.process(FRAME)
+    scene.shift = 2
+    for _ in range(4):
+        tracked = faces.process(FRAME)
+    assert faces.detections == 1
+    assert tracked[0].box == (40, 160 + 4 * 8, 120, 80 + 4 * 8)
+    assert tracked[0].name == "tony"
+    faces.process(FRAME)
+    assert faces.detections == 2
+
+
+def test_redetection_keeps_track_ids_by_overlap(scene):
+    scene.boxes, scene.names = [(10, 40, 30, 20)], ["tony"]
+    faces = pipeline(scene, scale=0.25, detect_every=1)
+    first, = faces.process(FRAME)
+    scene.boxes = [(11, 42, 31, 22), (60, 120, 80, 100)]  # the same face moved a little, and a newcomer
+    scene.names = ["tony", "pepper"]
+    moved, newcomer = faces.process(FRAME)
+    assert moved.track_id == first.track_id
+    assert newcomer.track_id != first.track_id
+    scene.boxes, scene.names = [(60, 120, 80, 100)], ["pepper"]
+    only, = faces.process(FRAME)
+    assert only.track_id == newcomer.track_id
+
+
+def test_lost_track_triggers_detection(scene):
+    scene.boxes, scene.names = [(10, 40, 30, 20)], ["tony"]
+    faces = pipeline(scene, scale=0.25, detect_every=10, min_quality=7.0)
+    faces.process(FRAME)
+    faces.process(FRAME)
+    assert faces.detections == 1
+    scene.quality = 3.0  # below min_quality
+    faces.process(FRAME)
+    assert faces.detections == 2
+
+
+def test_one_shot_detect_starts_no_trackers(scene):
+    scene.boxes, scene.names = [(10, 40, 30, 20)], ["tony"]
+    faces = pipeline(scene, scale=1.0)
+    found, = faces.detect(FRAME)
+    assert found.box == (10, 40, 30, 20) and found.name == "tony"
+    assert found.tracker is None
+    assert scene.trackers == 0
+    assert faces.faces == []
@@ -0,0 +1,180 @@
+# tests/test_faces.py
+import os
+
+import numpy as np
+import pytest
+
+from faces import ENCODING_DIM, FaceGallery, FaceStore, IVFIndex
+
+
+def unit(i, scale=1.0):
+    """Encoding pointing along axis i; distinct axes are sqrt(2) apart."""
+    encoding = np.zeros(ENCODING_DIM, dtype=np.float32)
+    encoding[i] = scale
+    return encoding
+
+
+def test_gallery_matches_nearest_name():
+    gallery = FaceGallery()
+    gallery.add("tony", unit(0))
+    gallery.add("pepper", unit(1))
+    (name, distance, confidence), = gallery.match(unit(0) + unit(2, 0.3))
+    assert name == "tony"
+    assert distance == pytest.approx(0.3, abs=1e-6)
+    assert confidence == pytest.approx(0.5, abs=1e-6)
+
+
+def test_gallery_unknown_beyond_tolerance():
+    gallery = FaceGallery()
+    gallery.add("tony", unit(0))
+    assert gallery.match(unit(1))[0][0] is None
+    assert FaceGallery().match([unit(0), unit(1)]) == [(None, float("inf"), 0.0)] * 2
+
+
+def test_gallery_samples_set_and_remove():
+    gallery = FaceGallery()
+    for i in range(20):  # grows past the initial capacity
+        gallery.add("tony", unit(i))
+    gallery.add("pepper", unit(40))
+    assert len(gallery.samples("tony")) == 20
+    assert gallery.match(unit(7))[0][0] == "tony"
+
+    gallery.set("tony", unit(50))
+    assert gallery.names == ["pepper", "tony"]
+    assert gallery.match(unit(7))[0][0] is None
+
+    gallery.remove("pepper")
+    assert "pepper" not in gallery
+    assert gallery.match(unit(50))[0][0] == "tony"
+
+
+def test_gallery_over_read_only_matrix():
+    matrix = np.stack([unit(0), unit(1)])
+    matrix.flags.writeable = False
+    gallery = FaceGallery.from_matrix(["tony", "pepper"], matrix)
+    assert [m[0] for m in gallery.match([unit(1), unit(0)])] == ["pepper", "tony"]
+    gallery.add("happy", unit(2))  # copies the buffer instead of writing into it
+    assert gallery.match(unit(2))[0][0] == "happy"
+    assert matrix.shape == (2, ENCODING_DIM)
+
+
+
+def clustered(count, clusters=16, seed=0):
+    """Encodings scattered tightly around random centres, like samples of a few people."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, ENCODING_DIM)).astype(np.float32)
+    return (centres[rng.integers(clusters, size=count)]
+            + 0.05 * rng.normal(size=(count, ENCODING_DIM))).astype(np.float32)
+
+
+def brute_force(encodings, probes):
+    dist = np.linalg.norm(probes[:, None, :] - encodings[None, :, :], axis=2)
+    return dist.argmin(axis=1), dist.min(axis=1)
+
+
+def test_ivf_probing_every_cell_is_exact():
+    encodings = clustered(400)
+    probes = clustered(20, seed=1)
+    index = IVFIndex(encodings, lists=10, probes=10)
+    rows, best = index.search(probes)
+    expected_rows, expected_best = brute_force(encodings, probes)
+    assert rows.tolist() == expected_rows.tolist()
+    np.testing.assert_allclose(best, expected_best, rtol=1e-4)
+
+
+def test_ivf_finds_stored_rows():
+    encodings = clustered(1000)
+    index = IVFIndex(encodings)
+    assert len(index.centroids) == int(np.sqrt(1000))
+    assert sorted(index.rows.tolist()) == list(range(1000))
+    rows, best = index.search(encodings[::50])
+    assert rows.tolist() == list(range(0, 1000, 50))
+    np.testing.assert_allclose(best, 0.0, atol=1e-2)  # float32 |a|^2 + |b|^2 - 2ab
+
+
+def test_gallery_uses_index_and_searches_new_rows_exactly():
+    gallery = FaceGallery(index_threshold=200)
+    for i, encoding in enumerate(clustered(300)):
+        gallery.add(f"person{i}", encoding)
+    assert gallery.match(gallery.encodings[5])[0][0] == "person5"
+    assert gallery.index is not None and gallery.index.count == 300
+
+    gallery.add("newcomer", unit(0, 10.0))  # not in the index yet
+    assert gallery.match(unit(0, 10.0))[0][0] == "newcomer"
+    assert gallery.index.count == 300
+
+    gallery.remove("person5")
+    assert gallery.index is None
+    assert gallery.match(unit(0, 10.0))[0][0] == "newcomer"
+
+
+def test_store_replays_journal(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.add("tony", unit(0))
+    store.set_samples("pepper", [unit(1), unit(2)])
+    store.remove("tony")
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.gallery.names == ["pepper", "pepper"]
+    assert reopened.journal_records == 5
+    assert reopened.gallery.match(unit(2))[0][0] == "pepper"
+
+
+def test_store_truncates_torn_record(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.add("tony", unit(0))
+    valid = os.path.getsize(store.journal_path)
+    store.add("pepper", unit(1))
+    with open(store.journal_path, "r+b") as f:
+        f.truncate(os.path.getsize(store.journal_path) - 7)  # crash mid-write
+
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.gallery.names == ["tony"]
+    assert os.path.getsize(reopened.journal_path) == valid
+    reopened.add("happy", unit(2))  # appends after the last good record
+    assert FaceStore(str(tmp_path)).gallery.names == ["tony", "happy"]
+
+
+def test_store_drops_uncommitted_transaction(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.add("tony", unit(0))
+    valid = os.path.getsize(store.journal_path)
+    store.add_many([("pepper", unit(1)), ("happy", unit(2))], [("ab" * 32, "pepper")])
+    with open(store.journal_path, "r+b") as f:
+        f.truncate(os.path.getsize(store.journal_path) - 1)  # commit marker torn
+
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.gallery.names == ["tony"]
+    assert reopened.sources == {}
+    assert os.path.getsize(reopened.journal_path) == valid
+
+
+def test_store_compacts_into_snapshot(tmp_path):
+    store = FaceStore(str(tmp_path), compact_every=3)
+    # Two adds and a source: the third record triggers compaction
+    store.add_many([("tony", unit(0)), ("pepper", unit(1))], [("cd" * 32, "pepper")])
+    assert store.generation == 1
+    assert store.journal_records == 0
+    store.add("happy", unit(2))
+
+    reopened = FaceStore(str(tmp_path), compact_every=3)
+    assert reopened.generation == 1
+    assert reopened.journal_records == 1
+    assert reopened.gallery.names == ["tony", "pepper", "happy"]
+    assert reopened.sources == {"cd" * 32: "pepper"}
+    assert sorted(f for f in os.listdir(tmp_path) if f.startswith("encodings-")) == ["encodings-1.npy"]
+
+
+def test_store_ignores_journal_of_other_generation(tmp_path):
+    store = FaceStore(str(tmp_path))
+    store.add("tony", unit(0))
+    store.add("pepper", unit(1))
+    with open(store.journal_path, "rb") as f:
+        stale = f.read()
+    store.compact()
+    # A crash during compaction can leave the previous generation's journal
+    with open(store.journal_path, "wb") as f:
+        f.write(stale)
+
+    reopened = FaceStore(str(tmp_path))
+    assert reopened.gallery.names == ["tony", "pepper"]  # from the snapshot, not replayed twice
+    assert reopened.journal_records == 0
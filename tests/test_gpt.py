@@ -0,0 +1,160 @@
+# tests/test_gpt.py
+import pytest
+
+import gpt
+from gpt import MESSAGE_OVERHEAD_TOKENS, ConversationMemory, ResponseCache, SentenceSplitter
+
+
+def test_splitter_emits_complete_sentences():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Hello there") == []
+    assert splitter.feed(". How are") == ["Hello there."]
+    assert splitter.feed(" you?") == []  # no whitespace after "?" yet
+    assert splitter.feed(" I'm fine") == ["How are you?"]
+    assert splitter.flush() == "I'm fine"
+    assert splitter.flush() == ""
+
+
+def test_splitter_keeps_closing_quotes_and_breaks_lines():
+    splitter = SentenceSplitter()
+    assert splitter.feed('He said "stop!" Then left.\nNext line\n') == \
+        ['He said "stop!"', "Then left.", "Next line"]
+
+
+def test_splitter_ignores_decimal_points():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Pi is 3.14 roughly. ") == ["Pi is 3.14 roughly."]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gpt.time, "time", lambda: now[0])
+    return now
+
+
+def ask(text, *context):
+    return list(context) + [{"role": "user", "content": text}]
+
+
+def test_cache_key_normalizes_prompt_but_not_context(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    assert cache.key(ask("What is Python?")) == cache.key(ask("  what is   python"))
+    snakes = {"role": "user", "content": "Tell me about snakes"}
+    rust = {"role": "user", "content": "Tell me about Rust"}
+    assert cache.key(ask("Is it fast?", snakes)) != cache.key(ask("Is it fast?", rust))
+    persona = {"role": "system", "content": "Answer like a pirate"}
+    assert cache.key(ask("What is Python?")) != cache.key(ask("What is Python?", persona))
+
+
+@pytest.mark.parametrize("text, follow_up", [
+    ("What is the capital of France?", False),
+    ("Explain recursion simply", False),
+    ("What about Germany?", True),
+    ("Why is that?", True),
+    ("Tell me more about it", True),
+    ("and Spain", True),
+    ("why?", True),
+])
+def test_is_follow_up(text, follow_up):
+    assert gpt.is_follow_up(text) == follow_up
+
+
+def test_repeated_question_hits_after_unrelated_exchange(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    mem = ConversationMemory(system_prompt="You are JARVIS")
+    for question, answer in [("What is the capital of France?", "Paris."),
+                             ("Explain recursion simply", "A function calling itself."),
+                             ("What is the capital of France?", None)]:
+        key = cache.key(mem.build(question))
+        response = cache.get(key)
+        if response is None:
+            response = answer
+            cache.put(key, response)
+        mem.add("user", question)
+        mem.add("assistant", response)
+    assert response == "Paris."
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", "A")
+    clock[0] += 1
+    cache.put("b", "B")
+    clock[0] += 1
+    assert cache.get("a") == "A"  # a is now more recent than b
+    clock[0] += 1
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_expires_after_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.put("a", "A")
+    clock[0] += 59
+    assert cache.get("a") == "A"
+    clock[0] += 2  # reading does not extend the lifetime
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 0, "hit_rate": 0.5}
+
+
+def test_cache_persists(tmp_path):
+    ResponseCache(str(tmp_path / "cache.db")).put("a", "A")
+    assert ResponseCache(str(tmp_path / "cache.db")).get("a") == "A"
+
+
+def words(text):
+    return len(text.split())
+
+
+def memory(**kwargs):
+    memory = ConversationMemory(**kwargs)
+    memory.count_tokens = words  # exact budgets without depending on tiktoken
+    return memory
+
+
+def cost(messages):
+    return sum(words(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def test_memory_keeps_everything_within_budget():
+    mem = memory(token_budget=100, system_prompt="Be brief")
+    mem.add("user", "what is rust")
+    mem.add("assistant", "a language")
+    assert mem.build("and go") == [
+        {"role": "system", "content": "Be brief"},
+        {"role": "user", "content": "what is rust"},
+        {"role": "assistant", "content": "a language"},
+        {"role": "user", "content": "and go"},
+    ]
+
+
+def test_memory_drops_oldest_turns_into_summary():
+    mem = memory(token_budget=60, summary_tokens=15)
+    for topic in ("rust", "go", "zig", "nim"):
+        mem.add("user", f"what is {topic}")
+        mem.add("assistant", "a compiled programming language with its own toolchain")
+    messages = mem.build("which is fastest")
+    assert cost(messages) <= 60
+    assert messages[-1] == {"role": "user", "content": "which is fastest"}
+    assert messages[0] == {"role": "system", "content": "Earlier the user asked about: what is rust; what is go"}
+    # History resumes on a user turn, never an orphaned reply
+    assert messages[1]["role"] == "user"
+    assert messages[-3:-1] == [
+        {"role": "user", "content": "what is nim"},
+        {"role": "assistant", "content": "a compiled programming language with its own toolchain"},
+    ]
+
+
+def test_memory_ring_buffer_tracks_tokens():
+    mem = memory(max_turns=3)
+    for _ in range(5):
+        mem.add("user", "one two three")
+    assert len(mem) == 3
+    assert mem.total_tokens == 3 * (3 + MESSAGE_OVERHEAD_TOKENS)
+    mem.clear()
+    assert len(mem) == 0 and mem.total_tokens == 0
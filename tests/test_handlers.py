@@ -0,0 +1,47 @@
+# tests/test_handlers.py
+"""
+assistant.py needs Windows-only and device modules at import time, so its
+@INTENT_HANDLERS.handles registrations are read from the source instead.
+"""
+import ast
+import os
+
+from commands import COMMAND_HANDLERS, ROUTER
+
+ASSISTANT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assistant.py")
+
+
+def assistant_handlers():
+    """intent name -> [method names decorated with INTENT_HANDLERS.handles(name)]"""
+    with open(ASSISTANT, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    handlers = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr == "handles"
+                    and getattr(decorator.func.value, "id", None) == "INTENT_HANDLERS"):
+                for arg in decorator.args:
+                    handlers.setdefault(arg.value, []).append(node.name)
+    return handlers
+
+
+def test_brightness_handlers():
+    handlers = assistant_handlers()
+    assert handlers["dim_screen"] == ["dim_screen"]
+    assert handlers["brighten_screen"] == ["brighten_screen"]
+    assert handlers["reset_brightness"] == ["reset_display_brightness"]
+
+
+def test_each_intent_has_one_handler():
+    handlers = assistant_handlers()
+    assert {name: methods for name, methods in handlers.items() if len(methods) > 1} == {}
+    assert not [name for name in handlers if name in COMMAND_HANDLERS]
+
+
+def test_every_routed_intent_is_handled():
+    handlers = assistant_handlers()
+    routed = {rule.name for rule in ROUTER._rules}
+    assert sorted(name for name in routed if name not in handlers and name not in COMMAND_HANDLERS) == []
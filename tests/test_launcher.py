@@ -0,0 +1,61 @@
+# tests/test_launcher.py
+import platform
+import subprocess
+import sys
+import time
+
+import pytest
+
+import launcher
+from launcher import APP_COMMANDS, AppLauncher
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+# Waits on a child of its own, like a launcher script
+WRAPPER = [sys.executable, "-c", f"import subprocess; subprocess.run({SLEEP!r})"]
+
+
+@pytest.fixture
+def apps():
+    apps = AppLauncher(app_commands={
+        "sleeper": {platform.system(): SLEEP},
+        "wrapper": {platform.system(): WRAPPER},
+    })
+    yield apps
+    for procs in apps._launched.values():
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+def test_close_terminates_only_launched_instances(apps):
+    other = subprocess.Popen(SLEEP)  # the same program, not started by the launcher
+    try:
+        assert apps.launch("sleeper") == "Opening sleeper, sir."
+        proc = apps._launched["sleeper"][0]
+        assert apps.close("sleeper") == "Closed sleeper, sir."
+        assert proc.wait(5) is not None
+        assert other.poll() is None
+        assert apps.close("sleeper") == "sleeper is not running, sir."
+    finally:
+        other.kill()
+        other.wait()
+
+
+@pytest.mark.skipif(not launcher.PSUTIL_AVAILABLE, reason="needs psutil to find child processes")
+def test_close_terminates_children(apps):
+    import psutil
+    apps.launch("wrapper")
+    parent = psutil.Process(apps._launched["wrapper"][0].pid)
+    deadline = time.monotonic() + 5
+    while not parent.children() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    child, = parent.children()
+    assert apps.close("wrapper") == "Closed wrapper, sir."
+    child.wait(5)
+    assert not child.is_running()
+
+
+def test_process_names_are_not_shared_with_other_programs():
+    shared = {"cmd", "electron", "soffice.bin", "python", "java"}
+    for app, commands in APP_COMMANDS.items():
+        assert not shared & set(commands.get("process", [])), app
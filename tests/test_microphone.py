@@ -0,0 +1,108 @@
+# tests/test_microphone.py
+import numpy as np
+import pytest
+
+import microphone
+from microphone import Endpointer, frame_energy
+
+FRAME_SAMPLES = 480  # 30 ms at 16 kHz
+
+
+def frame(level):
+    """A 30 ms frame whose RMS energy is exactly ``level``."""
+    return np.full(FRAME_SAMPLES, level, dtype=np.int16).tobytes()
+
+
+@pytest.fixture
+def endpointer(monkeypatch):
+    monkeypatch.setattr(microphone, "WEBRTCVAD_AVAILABLE", False)
+    endpointer = Endpointer(frame_ms=30, threshold_ratio=2.5, min_energy=150.0, noise_alpha=0.5,
+                            start_ms=90, end_silence_ms=150, pre_roll_ms=60, calibration_ms=90)
+    for _ in range(3):
+        assert endpointer.feed(frame(100)) is None
+    return endpointer
+
+
+def test_frame_energy_is_rms():
+    assert frame_energy(frame(300)) == pytest.approx(300)
+    assert frame_energy(b"") == 0.0
+
+
+def test_calibration_seeds_noise(monkeypatch):
+    monkeypatch.setattr(microphone, "WEBRTCVAD_AVAILABLE", False)
+    endpointer = Endpointer(calibration_ms=90, frame_ms=30)
+    endpointer.feed(frame(100))
+    endpointer.feed(frame(200))
+    assert not endpointer.calibrated.is_set()
+    endpointer.feed(frame(200))
+    assert endpointer.calibrated.is_set()
+    assert endpointer.noise == pytest.approx(175)
+
+
+def test_utterance_starts_after_start_frames_and_keeps_pre_roll(endpointer):
+    assert endpointer.threshold == 250
+    before = [frame(101), frame(102), frame(103)]
+    for f in before:
+        assert endpointer.feed(f) is None
+    speech = [frame(1000 + i) for i in range(3)]
+    assert endpointer.feed(speech[0]) is None
+    assert endpointer.feed(speech[1]) is None
+    assert not endpointer.in_utterance
+    assert endpointer.feed(speech[2]) is None
+    assert endpointer.in_utterance
+    # Two frames of pre-roll from before the speech started
+    assert endpointer.utterance_frames() == before[1:] + speech
+
+
+def test_utterance_ends_after_silence_and_trims_it(endpointer):
+    speech = [frame(1000 + i) for i in range(6)]
+    silence = [frame(100 + i) for i in range(5)]
+    for f in speech:
+        assert endpointer.feed(f) is None
+    for f in silence[:-1]:
+        assert endpointer.feed(f) is None
+    audio = endpointer.feed(silence[-1])
+    # Pre-roll is the calibration audio; trailing silence is cut to start_frames
+    assert audio == b"".join([frame(100)] * 2 + speech + silence[:3])
+    assert not endpointer.in_utterance
+
+
+def test_short_pause_does_not_end_utterance(endpointer):
+    for f in [frame(1000)] * 3 + [frame(100)] * 4 + [frame(1000)] + [frame(100)] * 4:
+        assert endpointer.feed(f) is None
+    assert endpointer.in_utterance
+
+
+def test_max_phrase_ends_utterance(endpointer):
+    results = [endpointer.feed(frame(1000), max_phrase=0.3) for _ in range(10)]
+    # 0.3 s is ten frames, counting the two of pre-roll
+    assert results[:7] == [None] * 7
+    assert len(results[7]) == 10 * len(frame(0))
+
+
+def test_noise_tracks_room_between_utterances(endpointer):
+    assert endpointer.feed(frame(200)) is None  # below 250, so noise rises
+    assert endpointer.noise == pytest.approx(150)
+    for _ in range(20):
+        endpointer.feed(frame(200))
+    assert endpointer.noise == pytest.approx(200, abs=1)
+    assert endpointer.threshold == pytest.approx(500, abs=3)
+    for _ in range(5):
+        endpointer.feed(frame(400))  # would have been speech in the quieter room
+    assert not endpointer.in_utterance
+
+
+def test_noise_is_frozen_during_utterance(endpointer):
+    for _ in range(3):
+        endpointer.feed(frame(1000))
+    assert endpointer.in_utterance
+    endpointer.feed(frame(200))
+    assert endpointer.noise == pytest.approx(100)
+
+
+def test_reset_drops_partial_utterance(endpointer):
+    for _ in range(3):
+        endpointer.feed(frame(1000))
+    endpointer.reset()
+    assert not endpointer.in_utterance
+    assert endpointer.utterance_frames() == []
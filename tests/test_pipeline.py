@@ -0,0 +1,119 @@
+# tests/test_pipeline.py
+import threading
+import time
+
+import pytest
+
+from pipeline import RequestPipeline
+
+
+class FakeAssistant:
+    """Answers text and intents immediately, except while ``gate`` is closed."""
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.handled = []
+        self.spoken = []
+
+    def process_input(self, text):
+        self.gate.wait(5)
+        self.handled.append(text)
+        return f"did {text}"
+
+    def stream_input(self, text):
+        yield self.process_input(text)
+
+    def dispatch(self, intent):
+        self.gate.wait(5)
+        self.handled.append(intent.name)
+        return f"did {intent.name}"
+
+    def speak(self, text, response_id=None):
+        self.spoken.append(text)
+
+    def stop_speaking(self):
+        pass
+
+
+@pytest.fixture(params=[False, True], ids=["whole", "streamed"])
+def pipeline(request):
+    assistant = FakeAssistant()
+    events = []
+    pipeline = RequestPipeline(assistant, lambda *event: events.append(event), stream=request.param)
+    pipeline.assistant, pipeline.events = assistant, events
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def chat(pipeline):
+    return "".join(event[1] for event in pipeline.events if event[0] == "append")
+
+
+def test_rapid_messages_all_get_replies(pipeline):
+    assistant = pipeline.assistant
+    assistant.gate.clear()  # the first message is still being processed when the others arrive
+    for text in ("pause music", "set alarm 7:30", "what time is it"):
+        pipeline.submit_text(text)
+    time.sleep(0.1)
+    assistant.gate.set()
+    wait_for(lambda: len(assistant.spoken) == 3)
+    assert assistant.handled == ["pause music", "set alarm 7:30", "what time is it"]
+    assert all(f"did {text}" in chat(pipeline) for text in assistant.handled)
+    assert "Cancelled" not in chat(pipeline)
+
+
+def test_pause_does_not_cancel_play(pipeline):
+    assistant = pipeline.assistant
+    assistant.gate.clear()
+    pipeline.submit_intent("play_music")
+    pipeline.submit_intent("pause_music")
+    time.sleep(0.1)
+    assistant.gate.set()
+    wait_for(lambda: len(assistant.spoken) == 2)
+    assert assistant.handled == ["play_music", "pause_music"]
+
+
+def test_repeated_intent_supersedes_queued_one(pipeline):
+    assistant = pipeline.assistant
+    assistant.gate.clear()
+    for name in ("play_music", "next_track", "next_track"):
+        pipeline.submit_intent(name)
+    time.sleep(0.1)
+    assistant.gate.set()
+    wait_for(lambda: len(assistant.spoken) == 2)
+    time.sleep(0.1)
+    assert assistant.handled == ["play_music", "next_track"]
+
+
+def test_cancelled_text_is_reported(pipeline):
+    assistant = pipeline.assistant
+    assistant.gate.clear()
+    pipeline.submit_text("first")
+    pipeline.submit_text("draft one", key="draft")
+    pipeline.submit_text("draft two", key="draft")
+    time.sleep(0.1)
+    assistant.gate.set()
+    wait_for(lambda: len(assistant.spoken) == 2)
+    assert assistant.handled == ["first", "draft two"]
+    assert 'Cancelled "draft one".' in chat(pipeline)
+
+
+def test_overflow_drops_oldest_and_says_so(pipeline):
+    assistant = pipeline.assistant
+    pipeline.max_pending = 2
+    assistant.gate.clear()
+    for text in ("one", "two", "three", "four"):
+        pipeline.submit_text(text)
+        time.sleep(0.05)
+    assistant.gate.set()
+    wait_for(lambda: len(assistant.spoken) == 3)
+    assert assistant.handled == ["one", "three", "four"]
+    assert 'Too many requests; dropped "two".' in chat(pipeline)
@@ -0,0 +1,82 @@
+# tests/test_recognizers.py
+import wave
+
+import numpy as np
+import pytest
+
+import recognizers
+from recognizers import FileBackend, create_backend
+
+RATE = 16000
+
+
+def speech(seconds, seed):
+    """Non-zero noise standing in for recorded speech."""
+    samples = np.random.default_rng(seed).integers(1, 3000, int(RATE * seconds), dtype=np.int16)
+    return samples.tobytes()
+
+
+def silence(seconds):
+    return bytes(int(RATE * seconds) * 2)
+
+
+def record(directory, name, pcm, text=None):
+    with wave.open(str(directory / f"{name}.wav"), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(pcm)
+    if text is not None:
+        (directory / f"{name}.txt").write_text(text + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def lights(tmp_path):
+    pcm = silence(0.2) + speech(1.0, seed=1) + silence(0.2)
+    record(tmp_path, "lights", pcm, "turn on the lights")
+    record(tmp_path, "weather", speech(0.5, seed=2), "what is the weather")
+    record(tmp_path, "untranscribed", speech(0.5, seed=3))
+    return pcm
+
+
+def test_replayed_recording_yields_its_transcript(tmp_path, lights):
+    backend = FileBackend(str(tmp_path))
+    assert backend.transcribe(lights, RATE) == "turn on the lights"
+    assert backend.recognize(lights, RATE) == "turn on the lights"
+    timing = backend.timings[-1]
+    assert timing["audio"] == pytest.approx(1.4)
+    assert timing["rtf"] == pytest.approx(timing["latency"] / 1.4)
+
+
+def test_endpointed_audio_matches_by_containment(tmp_path, lights):
+    backend = FileBackend(str(tmp_path))
+    trimmed = lights[len(silence(0.2)):-len(silence(0.2))]
+    assert backend.transcribe(silence(0.05) + trimmed + silence(0.5), RATE) == "turn on the lights"
+    # Audio running past the recording still contains all of it
+    assert backend.transcribe(speech(0.1, seed=9) + lights + speech(0.1, seed=8), RATE) == "turn on the lights"
+
+
+def test_unknown_audio_and_untranscribed_files_yield_nothing(tmp_path, lights):
+    backend = FileBackend(str(tmp_path))
+    assert backend.transcribe(speech(0.5, seed=4), RATE) == ""
+    assert backend.transcribe(speech(0.5, seed=3), RATE) == ""
+    assert backend.transcribe(silence(0.5), RATE) == ""
+    assert len(backend._recordings) == 2
+
+
+def test_partials_reveal_words_as_audio_arrives(tmp_path, lights):
+    backend = FileBackend(str(tmp_path))
+    step = RATE // 10 * 2
+    chunks = [lights[offset:offset + step] for offset in range(0, len(lights), step)]
+    partials = []
+    text = backend.recognize_stream(iter(chunks), RATE, on_partial=partials.append)
+    assert text == "turn on the lights"
+    assert partials == ["turn", "turn on", "turn on the", "turn on the lights"]
+
+
+def test_create_backend_selects_file_backend(tmp_path, lights, monkeypatch):
+    backend = create_backend({"speech_backend": "file", "transcripts_dir": str(tmp_path)})
+    assert isinstance(backend, FileBackend)
+    assert backend.directory == str(tmp_path)
+    monkeypatch.setattr(recognizers, "GoogleBackend", lambda: "google")
+    assert create_backend({}) == "google"
@@ -0,0 +1,62 @@
+# tests/test_router.py
+import pytest
+
+from commands import handle_command
+from intents import IntentRouter
+
+
+@pytest.mark.parametrize("text, name", [
+    ("what time is it", "time"),
+    ("activate security mode", "activate_security_mode"),
+    ("security mode activate please", "activate_security_mode"),
+    ("deactivate security mode", "deactivate_security_mode"),
+    ("security mode stand down", "deactivate_security_mode"),
+    ("activate surveillance mode", "activate_surveillance"),
+    ("deactivate surveillance mode", "deactivate_surveillance"),
+    ("reset brightness", "reset_brightness"),
+    ("dim screen", "dim_screen"),
+    ("jarvis status", "jarvis_status"),
+    ("drone connect", "connect_drone"),
+])
+def test_routes(text, name):
+    assert handle_command(text).name == name
+
+
+@pytest.mark.parametrize("text", [
+    "sometimes I wonder",  # "time" only matches as a whole word
+    "card game",           # nor "car" inside "card"
+    "surveillance mode",   # multi-word rules need every group
+    "activate",
+    "open",                # open_app needs a name after "open"
+    "I like to search",    # web_search is anchored to the start
+    "what is love",        # not a math question
+    "",
+])
+def test_no_route(text):
+    assert handle_command(text) is None
+
+
+def test_none_input():
+    assert handle_command(None) is None
+
+
+def test_slots():
+    assert handle_command("open fire fox").slots == {"app_name": "fire fox"}
+    assert handle_command("search cats").slots == {"query": "cats"}
+    assert handle_command("what is 2 + 2").slots == {"problem": "2 + 2"}
+
+
+def test_enroll_directory_keeps_case():
+    intent = handle_command("Enroll faces from C:/Photos/Team")
+    assert intent.name == "enroll_faces"
+    assert intent.slots == {"directory": "C:/Photos/Team"}
+
+
+def test_most_specific_rule_wins():
+    router = IntentRouter()
+    router.add("music", "music")
+    router.add("stop_music", "stop music")
+    router.compile()
+    assert router.match("please stop the music now").name == "music"
+    assert router.match("stop music").name == "stop_music"
+    assert router.match("music please").name == "music"
@@ -0,0 +1,102 @@
+# tests/test_speculation.py
+import pytest
+
+from intents import Intent
+from speculation import SpeculativeDispatcher
+
+INTENTS = {
+    "volume up": Intent("volume", {"direction": "up"}),
+    "volume down": Intent("volume", {"direction": "down"}),
+    "what time": Intent("time"),
+    "open notepad": Intent("open", {"app": "notepad"}),
+}
+
+
+class Device:
+    """Volume control whose speculative changes can be undone."""
+    def __init__(self):
+        self.volume = 50
+        self.dispatched = []
+
+    def dispatch(self, intent):
+        self.dispatched.append(intent.name)
+        if intent.name == "volume":
+            self.volume += 10 if intent.slots["direction"] == "up" else -10
+            return f"Volume {self.volume}."
+        return f"{intent.name} done."
+
+    def snapshot(self):
+        volume = self.volume
+
+        def undo():
+            self.volume = volume
+        return undo
+
+
+@pytest.fixture
+def device():
+    return Device()
+
+
+@pytest.fixture
+def dispatcher(device):
+    return SpeculativeDispatcher(INTENTS.get, device.dispatch,
+                                 {"volume": device.snapshot, "time": None})
+
+
+def test_same_intent_commits_held_response(dispatcher, device):
+    dispatcher.update("volume")
+    dispatcher.update("volume up")
+    dispatcher.update("volume up")  # repeated partials do not dispatch again
+    assert device.dispatched == ["volume"]
+    assert dispatcher.resolve(Intent("volume", {"direction": "up"})) == "Volume 60."
+    assert device.volume == 60
+    assert (dispatcher.committed, dispatcher.rolled_back) == (1, 0)
+    assert dispatcher.current is None
+
+
+def test_different_final_intent_is_undone(dispatcher, device):
+    dispatcher.update("volume up")
+    assert device.volume == 60
+    assert dispatcher.resolve(Intent("volume", {"direction": "down"})) is None
+    assert device.volume == 50
+    assert (dispatcher.committed, dispatcher.rolled_back) == (0, 1)
+
+
+def test_no_final_intent_is_undone(dispatcher, device):
+    dispatcher.update("volume up")
+    assert dispatcher.resolve(None) is None
+    assert device.volume == 50
+
+
+def test_changed_partial_rolls_back_previous_speculation(dispatcher, device):
+    dispatcher.update("volume up")
+    dispatcher.update("volume down")
+    assert device.volume == 40
+    assert dispatcher.rolled_back == 1
+    assert dispatcher.resolve(Intent("volume", {"direction": "down"})) == "Volume 40."
+
+
+def test_only_speculative_intents_dispatch(dispatcher, device):
+    dispatcher.update("open notepad")
+    dispatcher.update("mumble")
+    assert device.dispatched == []
+    assert dispatcher.resolve(Intent("open", {"app": "notepad"})) is None
+
+
+def test_side_effect_free_intent_needs_no_undo(dispatcher, device):
+    dispatcher.update("what time")
+    assert dispatcher.resolve(Intent("volume", {"direction": "up"})) is None
+    assert dispatcher.rolled_back == 1
+    dispatcher.update("what time")
+    assert dispatcher.resolve(Intent("time")) == "time done."
+
+
+def test_failed_undo_is_reported(device, capsys):
+    def broken():
+        raise RuntimeError("mixer gone")
+    dispatcher = SpeculativeDispatcher(INTENTS.get, device.dispatch, {"volume": lambda: broken})
+    dispatcher.update("volume up")
+    assert dispatcher.resolve(None) is None
+    assert "Speculation rollback error: mixer gone" in capsys.readouterr().out
+    assert dispatcher.rolled_back == 1
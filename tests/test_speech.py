@@ -0,0 +1,130 @@
+# tests/test_speech.py
+import threading
+
+import pytest
+
+from speech import PRIORITY_ALERT, PhraseCache, SpeechWorker
+
+
+class FakeEngine:
+    """
+    pyttsx3 stand-in: an utterance runs until ``complete`` is called, and
+    ``stop`` reports the current one as not completed right away, as the
+    platform drivers do.
+    """
+    def __init__(self):
+        self.callback = None
+        self.current = None  # (name, path) of the utterance in progress
+        self.started = []
+        self.ready = threading.Event()
+        self._complete = threading.Event()
+
+    def connect(self, topic, callback):
+        self.callback = callback
+
+    def getProperty(self, name):
+        return {"voice": "test", "rate": 200}[name]
+
+    def startLoop(self, use_driver_loop):
+        pass
+
+    def endLoop(self):
+        pass
+
+    def say(self, text, name):
+        self._begin(text, name, None)
+
+    def save_to_file(self, text, path, name):
+        self._begin(text, name, path)
+
+    def _begin(self, text, name, path):
+        self.current = (name, path)
+        self.started.append(text)
+        self.ready.set()
+
+    def complete(self):
+        self._complete.set()
+
+    def iterate(self):
+        if self.current is not None and self._complete.is_set():
+            self._complete.clear()
+            name, path = self.current
+            self.current = None
+            if path is not None:
+                with open(path, "wb") as f:
+                    f.write(b"RIFF")
+            self.callback(name=name, completed=True)
+
+    def stop(self):
+        if self.current is not None:
+            name, _ = self.current
+            self.current = None
+            self.callback(name=name, completed=False)
+
+
+@pytest.fixture
+def engine():
+    return FakeEngine()
+
+
+def running(engine, phrase_cache=None):
+    worker = SpeechWorker(lambda: engine, phrase_cache=phrase_cache, poll_interval=0.001,
+                          pipeline_sentences=False)
+    worker.start()
+    return worker
+
+
+def wait_started(engine, count):
+    for _ in range(500):
+        if len(engine.started) >= count and engine.current is not None:
+            return
+        engine.ready.wait(0.01)
+        engine.ready.clear()
+    raise AssertionError(f"engine started {engine.started}")
+
+
+def test_completed_utterance_counts_as_spoken(engine):
+    worker = running(engine)
+    try:
+        done = worker.say("Hello.")
+        wait_started(engine, 1)
+        engine.complete()
+        assert done.wait(2)
+        assert (worker.spoken, worker.dropped) == (1, 0)
+    finally:
+        worker.stop()
+
+
+def test_interrupted_utterance_counts_as_dropped(engine):
+    worker = running(engine)
+    try:
+        done = worker.say("A long answer.")
+        wait_started(engine, 1)
+        worker.interrupt()
+        assert done.wait(2)
+        assert worker.wait_idle(2)
+        assert (worker.spoken, worker.dropped) == (0, 1)
+    finally:
+        worker.stop()
+
+
+def test_preempted_render_is_queued_again(engine, tmp_path):
+    cache = PhraseCache(tmp_path)
+    worker = running(engine, cache)
+    try:
+        worker.prerender(["Good morning, sir."])
+        wait_started(engine, 1)
+        alert = worker.say("Intruder.", priority=PRIORITY_ALERT)
+        wait_started(engine, 2)
+        assert engine.started == ["Good morning, sir.", "Intruder."]
+        assert worker.dropped == 0
+        engine.complete()
+        assert alert.wait(2)
+        wait_started(engine, 3)
+        assert engine.started[2] == "Good morning, sir."
+        engine.complete()
+        assert worker.wait_idle(2)
+        assert cache.path("Good morning, sir.").exists()
+        assert (worker.spoken, worker.dropped) == (1, 0)
+    finally:
+        worker.stop()
@@ -0,0 +1,111 @@
+# tests/test_surveillance.py
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from surveillance import MotionDetector, SurveillanceMonitor
+
+
+def frame(square=None, size=(240, 320)):
+    """Grey BGR frame, optionally with a white square (top, left, side)."""
+    image = np.full(size + (3,), 80, dtype=np.uint8)
+    if square:
+        top, left, side = square
+        image[top:top + side, left:left + side] = 255
+    return image
+
+
+def test_motion_detector_finds_changed_region():
+    detector = MotionDetector()
+    assert detector.feed(frame()) == []  # first frame seeds the background
+    assert detector.feed(frame()) == []
+    (top, right, bottom, left), = detector.feed(frame((100, 200, 60)))
+    # Full-resolution box around the square, grown a little by blur and dilation
+    assert 80 <= top <= 100 and 160 <= bottom <= 180
+    assert 180 <= left <= 200 and 260 <= right <= 280
+    assert detector.changed > 0
+
+
+def test_motion_detector_ignores_tiny_changes_and_adapts():
+    detector = MotionDetector(alpha=0.5)
+    detector.feed(frame())
+    assert detector.feed(frame((10, 10, 2))) == []
+    for _ in range(20):
+        detector.feed(frame((100, 200, 60)))  # the square stays put
+    assert detector.feed(frame((100, 200, 60))) == []
+
+
+class ScriptedDetector:
+    """Reports one changed region on every frame while motion is set."""
+    def __init__(self):
+        self.motion = False
+
+    def reset(self):
+        pass
+
+    def feed(self, frame):
+        return [(0, 10, 10, 0)] if self.motion else []
+
+
+class FakeFaces:
+    def __init__(self):
+        self.seen = []
+
+    def detect(self, crop):
+        return [SimpleNamespace(name=name, box=(1, 5, 5, 1), confidence=0.9) for name in self.seen]
+
+
+@pytest.fixture
+def monitor():
+    events = []
+    monitor = SurveillanceMonitor(camera=None, store=None, on_event=events.append,
+                                  detector=ScriptedDetector(), faces=FakeFaces())
+    monitor.kinds = lambda: [event.kind for event in events]
+    monitor.emitted = events
+    return monitor
+
+
+def run(monitor, motion, start, seconds, fps=5.0):
+    monitor.detector.motion = motion
+    now = start
+    while now < start + seconds - 1e-9:
+        monitor.step(frame(size=(20, 20)), now)
+        now += 1 / fps
+    return now
+
+
+def test_motion_start_needs_consecutive_frames(monitor):
+    monitor.detector.motion = True
+    monitor.step(frame(size=(20, 20)), 0.0)
+    monitor.detector.motion = False
+    monitor.step(frame(size=(20, 20)), 0.2)
+    monitor.detector.motion = True
+    monitor.step(frame(size=(20, 20)), 0.4)
+    assert monitor.kinds() == []
+    monitor.step(frame(size=(20, 20)), 0.6)
+    assert monitor.kinds() == ["motion_start"]
+
+
+def test_motion_stop_after_quiet_period(monitor):
+    run(monitor, True, 0.0, 1.0)    # motion at 0.0-0.8 s, started at 0.2
+    run(monitor, False, 1.0, 2.0)   # 2 s quiet after the last motion
+    assert monitor.kinds() == ["motion_start"]
+    run(monitor, True, 3.0, 0.4)    # motion again at 3.0-3.2 s
+    run(monitor, False, 3.4, 3.2)   # stop_seconds after 3.2
+    assert monitor.kinds() == ["motion_start", "motion_stop"]
+    assert monitor.emitted[-1].duration == pytest.approx(6.2 - 0.2, abs=1e-6)
+    assert not monitor.in_motion
+
+
+def test_person_seen_once_per_cooldown(monitor):
+    monitor.faces.seen = ["tony", None]
+    now = run(monitor, True, 0.0, 5.0)
+    people = [(e.name, e.box) for e in monitor.emitted if e.kind == "person_seen"]
+    assert people == [("tony", (1, 5, 5, 1)), (None, (1, 5, 5, 1))]
+    # Recognition runs at most every recognize_interval, not on every frame
+    assert 0 < monitor.recognitions <= 5.0 / monitor.recognize_interval < monitor.motion_frames
+
+    now = run(monitor, False, now, 40.0)  # out of sight for longer than the cooldown
+    run(monitor, True, now, 1.0)
+    assert [e.name for e in monitor.emitted if e.kind == "person_seen"] == ["tony", None, "tony", None]
@@ -13,7 +13,12 @@ def load_env():
 
 def load_settings():
     """Load appearance and font settings from a JSON file, or create defaults."""
-    default_settings = {"appearance_mode": "dark", "color_theme": "blue", "font_size": 16}
+    default_settings = {"appearance_mode": "dark", "color_theme": "blue", "font_size": 16, "stream_responses": True,
+                        "wake_word": False, "wake_templates": "wake_templates", "wake_cpu_budget": 0.05,
+                        "speech_backend": "google", "vosk_model": "models/vosk-model-small-en-us-0.15",
+                        "transcripts_dir": "transcripts", "camera_index": 0,
+                        "record_clips": True, "clip_dir": "surveillance_clips", "clip_max_mb": 500,
+                        "surveillance_fps": 15}
     try:
         if not SETTINGS_FILE.exists():
             with open(SETTINGS_FILE, "w") as f:
@@ -0,0 +1,200 @@
+# wakeword.py
+import glob
+import os
+import time
+import wave
+
+import numpy as np
+
+from microphone import SAMPLE_RATE
+
+WAKE_TEMPLATE_DIR = "wake_templates"
+
+
+def read_wav(path):
+    """Return the samples of a 16-bit mono WAV file as int16 and its sample rate."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2 or f.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16), f.getframerate()
+
+
+def _mel_filterbank(sample_rate, n_fft, n_mels, low=100.0, high=4000.0):
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(low), to_mel(high), n_mels + 2))
+    bins = np.floor((n_fft + 1) * edges / sample_rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        bank[m - 1, left:center] = (np.arange(left, center) - left) / max(1, center - left)
+        bank[m - 1, center:right] = (right - np.arange(center, right)) / max(1, right - center)
+    return bank
+
+
+class FeatureExtractor:
+    """Log-mel features (25 ms windows, 10 ms hop), each frame normalized for loudness."""
+    def __init__(self, sample_rate=SAMPLE_RATE, n_mels=20, n_fft=512):
+        self.sample_rate = sample_rate
+        self.win = int(0.025 * sample_rate)
+        self.hop = int(0.010 * sample_rate)
+        self.n_fft = n_fft
+        self.window = np.hamming(self.win).astype(np.float32)
+        self.bank = _mel_filterbank(sample_rate, n_fft, n_mels)
+
+    def __call__(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) < self.win:
+            samples = np.pad(samples, (0, self.win - len(samples)))
+        count = 1 + (len(samples) - self.win) // self.hop
+        idx = np.arange(self.win)[None, :] + self.hop * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(samples[idx] * self.window, self.n_fft)) ** 2
+        feats = np.log(spectrum @ self.bank.T + 1e-6)
+        return feats - feats.mean(axis=1, keepdims=True)
+
+
+def dtw_distance(template, segment):
+    """
+    Subsequence DTW: best match of template anywhere in segment.
+
+    Steps are (1,0), (1,1) and (1,2) so each template row is computed in one
+    vectorized pass. Returns (distance per template frame, segment frame where
+    the match ends).
+    """
+    cost = np.sqrt(((template[:, None, :] - segment[None, :, :]) ** 2).sum(axis=2))
+    acc = cost[0].copy()
+    for row in cost[1:]:
+        prev = acc.copy()
+        prev[1:] = np.minimum(prev[1:], acc[:-1])
+        prev[2:] = np.minimum(prev[2:], acc[:-2])
+        acc = row + prev
+    end = int(np.argmin(acc))
+    return acc[end] / len(template), end
+
+
+class KeywordSpotter:
+    """
+    Template-matching spotter for a single wake word.
+
+    Templates are short recordings of the keyword (16-bit mono WAV files in
+    ``template_dir``). A segment matches when its first ``lead`` seconds
+    plus the keyword length contain a stretch within ``threshold`` of the
+    closest template under DTW. Without an explicit threshold it is
+    calibrated from the spread between the templates.
+    """
+    def __init__(self, template_dir=WAKE_TEMPLATE_DIR, threshold=None, margin=2.0,
+                 lead=0.5, sample_rate=SAMPLE_RATE):
+        self.features = FeatureExtractor(sample_rate)
+        self.lead_frames = int(lead * sample_rate) // self.features.hop
+        self.templates = []
+        for path in sorted(glob.glob(os.path.join(template_dir, "*.wav"))):
+            try:
+                samples, rate = read_wav(path)
+            except (OSError, ValueError, wave.Error) as e:
+                print(f"Wake template error: {e}")
+                continue
+            if rate != sample_rate:
+                print(f"Wake template {path} is {rate} Hz, expected {sample_rate} Hz")
+                continue
+            self.templates.append(self.features(samples))
+        self.threshold = threshold if threshold is not None else self._calibrate(margin)
+
+    def __bool__(self):
+        return bool(self.templates)
+
+    def _calibrate(self, margin):
+        if len(self.templates) < 2:
+            return 8.0
+        distances = [dtw_distance(a, b)[0]
+                     for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        return float(np.mean(distances)) * margin
+
+    def spot(self, samples):
+        """Return the sample offset where the keyword ends, or None if it is absent."""
+        feats = self.features(samples)
+        best, best_end = np.inf, 0
+        for template in self.templates:
+            # The keyword sits near the start of the segment (after the
+            # endpointer's pre-roll); skip the tail
+            window = feats[:self.lead_frames + int(len(template) * 1.6)]
+            distance, end = dtw_distance(template, window)
+            if distance < best:
+                best, best_end = distance, end
+        if best > self.threshold:
+            return None
+        return (best_end + 1) * self.features.hop + self.features.win
+
+
+class WakeWordDetector:
+    """
+    Hands-free activation on top of MicrophoneStream.
+
+    The stream's endpointer acts as the energy gate: only voiced segments
+    reach ``__call__``, and the spotter ignores segments that are too short or
+    too long to start with the keyword. Spotting time is measured against
+    ``cpu_budget`` (fraction of one core over ``window`` seconds); over
+    budget, segments are skipped until the window rolls over. On a match
+    ``on_wake(audio)`` is called with the PCM that followed the keyword, or
+    None if nothing did.
+    """
+    def __init__(self, spotter, on_wake, cpu_budget=0.05, window=10.0,
+                 min_segment=0.3, max_segment=6.0, min_command=0.5, sample_rate=SAMPLE_RATE):
+        self.spotter = spotter
+        self.on_wake = on_wake
+        self.cpu_budget = cpu_budget
+        self.window = window
+        self.min_segment = min_segment
+        self.max_segment = max_segment
+        self.min_command = min_command
+        self.sample_rate = sample_rate
+        self.segments = 0
+        self.spotted = 0
+        self.skipped = 0
+        self.detections = 0
+        self.cpu_seconds = 0.0
+        self._window_start = time.monotonic()
+        self._window_cpu = 0.0
+
+    def over_budget(self):
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._window_start, self._window_cpu = now, 0.0
+        return self._window_cpu > self.cpu_budget * self.window
+
+    def __call__(self, audio):
+        """Handle one voiced segment of 16-bit PCM from the endpointer."""
+        self.segments += 1
+        samples = np.frombuffer(audio, dtype=np.int16)
+        duration = len(samples) / self.sample_rate
+        if not self.min_segment <= duration <= self.max_segment:
+            return False
+        if self.over_budget():
+            self.skipped += 1
+            return False
+        start = time.thread_time()
+        end = self.spotter.spot(samples)
+        spent = time.thread_time() - start
+        self.cpu_seconds += spent
+        self._window_cpu += spent
+        self.spotted += 1
+        if end is None:
+            return False
+        self.detections += 1
+        rest = audio[end * 2:]
+        command = rest if len(rest) / 2 / self.sample_rate >= self.min_command else None
+        self.on_wake(command)
+        return True
+
+    def stats(self):
+        return {
+            "segments": self.segments,
+            "spotted": self.spotted,
+            "skipped": self.skipped,
+            "detections": self.detections,
+            "cpu_seconds": self.cpu_seconds,
+        }